@@ -0,0 +1 @@
+"""AppTestを用いたフロントエンドの計測スクリプト群（python -m benchmarks.<name> で実行）"""
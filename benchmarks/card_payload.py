@@ -0,0 +1,119 @@
+"""研究者カード表示の送信量比較（要素ごとの描画 vs 1つのHTML断片）
+
+実行: python -m benchmarks.card_payload
+1ページの件数ごとに、再実行1回あたりの delta 数とシリアライズ後のバイト数を出力する。
+"""
+import json
+import os
+import sys
+
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.element_stats import run_and_measure  # noqa: E402
+
+PAGE_SIZES = [5, 10, 20, 50]
+
+
+def sample_researcher(i):
+    return {
+        "name": f"Researcher {i}",
+        "institution": "Harvard Medical School",
+        "classified_field": "Medical",
+        "works_count": 120 + i,
+        "cited_by_count": 4500 + i * 10,
+        "h_index": 30 + i % 20,
+        "orcid": f"0000-0002-1825-{i:04d}",
+        "paper_data_count": 12,
+        **{f"reason_title_{j}": f"Reason {j}" for j in range(1, 4)},
+        **{f"reason_body_{j}": "Detailed recommendation text. " * 40 for j in range(1, 4)},
+    }
+
+
+def legacy_cards(items, repo_root):
+    """変更前の描画方式（カードごとに20以上のdelta）"""
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, repo_root)
+    from kenq.i18n import get_translator
+
+    get_text = get_translator("search", "ja")
+
+    for item in items:
+        st.markdown('<div class="search-result-card">', unsafe_allow_html=True)
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.markdown(f'<h3 class="researcher-name">{get_text("researcher_name").format(name=item.get("name", "No Name"))}</h3>', unsafe_allow_html=True)
+            st.markdown(f'<p class="researcher-info"><strong>{get_text("institution")}:</strong> {item.get("institution", "N/A")}</p>', unsafe_allow_html=True)
+            st.markdown(f'<p class="researcher-info"><strong>{get_text("research_field")}:</strong> {item.get("classified_field", "N/A")}</p>', unsafe_allow_html=True)
+            orcid_url = f"https://orcid.org/{item['orcid']}"
+            st.markdown(f'<p class="researcher-info"><strong>{get_text("orcid")}:</strong> <a href="{orcid_url}" target="_blank">{orcid_url}</a></p>', unsafe_allow_html=True)
+        with col2:
+            st.markdown('<div style="margin-top: 10px;">', unsafe_allow_html=True)
+            st.markdown(f'<p class="metrics-header">{get_text("research_metrics")}</p>', unsafe_allow_html=True)
+            st.markdown(f'''
+            <div class="metric-container">
+                <div class="metric-title">{get_text('num_publications')}</div>
+                <div class="metric-value">{item["works_count"]:,}{get_text('papers_unit')}</div>
+            </div>
+            <div class="metric-container">
+                <div class="metric-title">{get_text('num_citations')}</div>
+                <div class="metric-value">{item["cited_by_count"]:,}{get_text('citations_unit')}</div>
+            </div>
+            <div class="metric-container">
+                <div class="metric-title">{get_text('h_index')}</div>
+                <div class="metric-value">{item["h_index"]}</div>
+                <div class="metric-sub">{get_text('db_records')}: {item["paper_data_count"]}{get_text('papers_unit')}</div>
+            </div>
+            ''', unsafe_allow_html=True)
+            st.markdown('</div>', unsafe_allow_html=True)
+        with st.expander(get_text('view_reasons'), expanded=False):
+            for j in range(1, 4):
+                st.markdown(f"**🎯 {item[f'reason_title_{j}']}**")
+                st.write(item[f"reason_body_{j}"])
+                if j < 3:
+                    st.markdown("---")
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.markdown("---")
+
+
+def fragment_cards(items, repo_root):
+    """変更後の描画方式（1ページ分を1つのHTML断片として送信）"""
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, repo_root)
+    from kenq.card_renderer import render_cards_html
+    from kenq.i18n import get_translator
+
+    get_text = get_translator("search", "ja")
+
+    st.markdown(render_cards_html(items, get_text), unsafe_allow_html=True)
+
+
+def measure(script, args):
+    at = AppTest.from_function(script, args=args, default_timeout=60)
+    return run_and_measure(at)
+
+
+def main():
+    rows = []
+    for page_size in PAGE_SIZES:
+        items = [sample_researcher(i) for i in range(page_size)]
+        before = measure(legacy_cards, (items, REPO_ROOT))
+        after = measure(fragment_cards, (items, REPO_ROOT))
+        rows.append({"page_size": page_size, "before": before, "after": after})
+        print(
+            f"{page_size:>3} cards: deltas {before['deltas']:>4} -> {after['deltas']:>2}, "
+            f"bytes {before['bytes']:>7,} -> {after['bytes']:>7,}"
+        )
+    print(json.dumps(rows))
+
+
+if __name__ == "__main__":
+    main()
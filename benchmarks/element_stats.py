@@ -0,0 +1,24 @@
+"""AppTestの1回の再実行で送信されるForwardMsg（delta）の数とバイト数を集計"""
+from streamlit.testing.v1 import local_script_runner
+
+
+def run_and_measure(at, **run_kwargs):
+    """at.run() を実行し、送信されたdeltaの数とシリアライズ後のバイト数を返す"""
+    captured = []
+    original = local_script_runner.parse_tree_from_messages
+
+    def capture(messages):
+        captured.extend(messages)
+        return original(messages)
+
+    local_script_runner.parse_tree_from_messages = capture
+    try:
+        at.run(**run_kwargs)
+    finally:
+        local_script_runner.parse_tree_from_messages = original
+
+    deltas = [msg for msg in captured if msg.WhichOneof("type") == "delta"]
+    return {
+        "deltas": len(deltas),
+        "bytes": sum(msg.ByteSize() for msg in deltas),
+    }
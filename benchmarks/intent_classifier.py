@@ -0,0 +1,92 @@
+"""動的プレースホルダーの意図判定の速度比較（変更前の部分文字列検索 vs kenq.intent の判定器）
+
+実行: python -m benchmarks.intent_classifier
+応答の長さ・言語ごとに、1回の判定にかかる時間（マイクロ秒）を出力する。
+「compiled」は kenq.intent の判定（日本語はコンパイル済みの正規表現、英語は平坦化した部分文字列検索）。
+どちらの言語も legacy より遅くならないこと。
+「cached」は再実行時（同じ応答に対してキャッシュ済みの結果を使う場合）の時間。
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from kenq.intent import INTENTS, INTENT_KEYWORDS, classify_intent  # noqa: E402
+
+REPLY_LENGTHS = [500, 2000, 8000, 32000]
+REPEAT = 200
+
+# 変更前の判定（言語ごとに意図の順にキーワードを部分文字列検索）
+LEGACY_RULES = {
+    language: [keywords["common"] + keywords[language] for _, keywords in INTENT_KEYWORDS]
+    for language in ("ja", "en")
+}
+
+FILLER = {
+    "ja": "ご連絡ありがとうございます。いただいた内容を確認しました。ハーバード大学の関連組織に所属する方々の実績をもとに整理しています。",
+    "en": "Thank you for sharing this information. We have reviewed the notes you sent and organised them against the Harvard profiles we index. ",
+}
+
+
+def legacy_classify(content, language):
+    content_lower = content.lower()
+    for intent, keywords in zip(INTENTS, LEGACY_RULES[language]):
+        if any(keyword in content_lower for keyword in keywords):
+            return intent
+    return None
+
+
+def sample_reply(language, length, keyword):
+    """length 文字程度の応答（keyword があれば末尾付近に含める）"""
+    filler = FILLER[language]
+    text = (filler * (length // len(filler) + 1))[:length]
+    return text + (f" {keyword}" if keyword else "")
+
+
+def check_equivalence(samples=2000):
+    """ランダムな応答で新旧の判定結果が一致することを確認"""
+    rng = random.Random(0)
+    for language in ("ja", "en"):
+        words = [k for keywords in LEGACY_RULES[language] for k in keywords] + ["x", " ", "研", "re"]
+        for _ in range(samples):
+            text = "".join(rng.choice(words) for _ in range(rng.randint(0, 12)))
+            if rng.random() < 0.3:
+                text = text.upper()
+            assert legacy_classify(text, language) == classify_intent(text, language), (language, text)
+
+
+def measure(func, *args):
+    return timeit.timeit(lambda: func(*args), number=REPEAT) / REPEAT * 1e6
+
+
+def main():
+    check_equivalence()
+    cache = {}
+    rows = []
+    for language, keyword in (("ja", "おすすめ"), ("en", "candidate"), ("ja", None), ("en", None)):
+        for length in REPLY_LENGTHS:
+            reply = sample_reply(language, length, keyword)
+            cache[("reply", language)] = classify_intent(reply, language)
+            row = {
+                "language": language,
+                "length": len(reply),
+                "match": keyword is not None,
+                "legacy_us": round(measure(legacy_classify, reply, language), 1),
+                "compiled_us": round(measure(classify_intent, reply, language), 1),
+                "cached_us": round(measure(cache.get, ("reply", language)), 3),
+            }
+            rows.append(row)
+            print(
+                f"{language} {row['length']:>6} chars (match={row['match']!s:<5}): "
+                f"legacy {row['legacy_us']:>8.1f}us, compiled {row['compiled_us']:>8.1f}us, "
+                f"cached {row['cached_us']:.3f}us"
+            )
+    print(json.dumps(rows))
+
+
+if __name__ == "__main__":
+    main()
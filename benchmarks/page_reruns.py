@@ -0,0 +1,210 @@
+"""各ページの再実行1回あたりの時間・メモリ（AppTest＋プロセス内の代替バックエンド）
+
+実行: python -m benchmarks.page_reruns [--repeat 20] [--output results.json] [--baseline base.json]
+tools/mock_backend.py を空きポートで起動し（遅延なし）、次の状態でページを再実行する。
+  - ホーム（main_app.py）
+  - 研究者検索: 検索結果 5 / 10 / 20 / 50 件を表示した状態
+  - チャット: 1 / 5 / 10 / 20 / 50 往復の会話履歴がある状態（実際に送信して積み上げる）
+結果ごとに、再実行時間（中央値・p95、ミリ秒）、送信した delta の数とバイト数、
+再実行中の割り当てメモリのピーク、セッション状態の概算サイズを出力する。
+--baseline を指定すると、中央値または割り当てピークが --tolerance を超えて増えた項目を表示し、
+終了コード1で終わる（デプロイ前の確認用）。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import ThreadingHTTPServer
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import kenq.backend_client as backend_client  # noqa: E402
+from benchmarks.element_stats import run_and_measure  # noqa: E402
+from kenq.profiler import estimate_size  # noqa: E402
+from tools.mock_backend import MockBackendHandler, parse_args as mock_args  # noqa: E402
+
+PAGE_SIZES = [5, 10, 20, 50]
+CHAT_TURNS = [1, 5, 10, 20, 50]
+REPEAT = 20
+TIMEOUT = 60
+CHAT_REPLY_WAIT = 10  # 1往復の応答を待つ上限（秒）
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 破棄されたクライアントの待機中の接続が切れるのは正常（計測結果の出力を乱さない）
+        if not isinstance(sys.exc_info()[1], ConnectionResetError):
+            super().handle_error(request, client_address)
+
+
+def start_mock_backend():
+    """遅延なしの代替バックエンドを空きポートで起動し、共通クライアントの接続先にする"""
+    MockBackendHandler.config = mock_args([
+        "--port", "0", "--researcher-delay", "0", "--reason-delay", "0",
+        "--token-delay", "0", "--reason-words", "60",
+    ])
+    server = QuietServer(("127.0.0.1", 0), MockBackendHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    backend_client.API_BASE_URL = f"http://127.0.0.1:{server.server_port}"
+    return server
+
+
+def check(at, scenario):
+    if at.exception:
+        raise RuntimeError(f"{scenario}: {at.exception[0].value}")
+
+
+def measure_reruns(at, scenario, repeat):
+    """入力を変えずに再実行し、時間・送信量・メモリを計測する"""
+    payload = run_and_measure(at)
+    check(at, scenario)
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        at.run()
+        times.append((time.perf_counter() - started) * 1000)
+    check(at, scenario)
+
+    # 割り当ての追跡は処理を遅くするので、時間の計測とは別の1回で測る
+    tracemalloc.start()
+    at.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seen = set()
+    state = at.session_state.filtered_state
+    times.sort()
+    return {
+        "scenario": scenario,
+        "rerun_ms_median": round(statistics.median(times), 2),
+        "rerun_ms_p95": round(times[max(0, -(-len(times) * 95 // 100) - 1)], 2),
+        "deltas": payload["deltas"],
+        "bytes": payload["bytes"],
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "session_state_kb": round(sum(estimate_size(value, seen) for value in state.values()) / 1024, 1),
+    }
+
+
+def bench_home(repeat):
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "main_app.py"), default_timeout=TIMEOUT)
+    at.run()
+    return [measure_reruns(at, "home", repeat)]
+
+
+def bench_search(repeat):
+    rows = []
+    for page_size in PAGE_SIZES:
+        MockBackendHandler.config.results = page_size
+        at = AppTest.from_file(os.path.join(REPO_ROOT, "pages", "1_Researcher_Search.py"), default_timeout=TIMEOUT)
+        at.run()
+        next(box for box in at.selectbox if box.options == [str(n) for n in PAGE_SIZES]).set_value(page_size)
+        # 検索結果のキャッシュはプロセス共通なので、件数ごとに別の検索語にする
+        at.text_input(key="research_query").input(f"machine learning {page_size}")
+        at.run()
+        next(button for button in at.button if button.proto.type == "primary").click()
+        at.run()
+        at.run()
+        scenario = f"search_{page_size}"
+        check(at, scenario)
+        if len(at.session_state.search_results) != page_size:
+            raise RuntimeError(f"{scenario}: got {len(at.session_state.search_results)} results")
+        rows.append(measure_reruns(at, scenario, repeat))
+    return rows
+
+
+def send_chat_message(at, text):
+    key = f"user_input_{at.session_state.message_counter}"
+    at.text_input(key=key).input(text)
+    at.run()
+    next(button for button in at.button if button.proto.type == "primary").click()
+    at.run()
+    # 送信後の st.rerun() で中断された実行の入力欄が AppTest の要素ツリーに残るため、
+    # 次の実行で参照されるウィジェットの値を補っておく（使われない値として次の実行で破棄される）
+    at.session_state[key] = ""
+    deadline = time.monotonic() + CHAT_REPLY_WAIT
+    while at.session_state.chat_request is not None and not at.session_state.chat_request.finished:
+        if time.monotonic() > deadline:
+            raise RuntimeError("chat reply timed out")
+        time.sleep(0.01)
+    at.run()
+
+
+def bench_chat(repeat):
+    rows = []
+    at = AppTest.from_file(os.path.join(REPO_ROOT, "pages", "2_Chat_Agent.py"), default_timeout=TIMEOUT)
+    at.run()
+    turns = 0
+    for target in CHAT_TURNS:
+        while turns < target:
+            turns += 1
+            send_chat_message(at, f"Question {turns}: collaborators for protein design")
+        rows.append(measure_reruns(at, f"chat_{target}_turns", repeat))
+    return rows
+
+
+def compare(rows, baseline_path, tolerance):
+    """基準の結果より悪化した項目（中央値・割り当てピーク）を返す"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["scenario"]: row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        base = baseline.get(row["scenario"])
+        if base is None:
+            continue
+        for field in ("rerun_ms_median", "peak_alloc_kb"):
+            if base[field] and row[field] > base[field] * (1 + tolerance):
+                regressions.append(f"{row['scenario']} {field}: {base[field]} -> {row[field]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="各ページの再実行1回あたりの時間・メモリ")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="計測する再実行の回数")
+    parser.add_argument("--output", help="結果のJSONを保存するパス")
+    parser.add_argument("--baseline", help="比較する以前の結果（--output で保存したJSON）")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="悪化とみなす増加率")
+    args = parser.parse_args(argv)
+
+    server = start_mock_backend()
+    try:
+        rows = bench_home(args.repeat) + bench_search(args.repeat) + bench_chat(args.repeat)
+    finally:
+        server.shutdown()
+    for row in rows:
+        print(
+            f"{row['scenario']:>16}: rerun {row['rerun_ms_median']:>7.1f}ms (p95 {row['rerun_ms_p95']:>7.1f}ms), "
+            f"deltas {row['deltas']:>4}, bytes {row['bytes']:>8,}, "
+            f"peak {row['peak_alloc_kb']:>8,.0f}KB, state {row['session_state_kb']:>6,.0f}KB"
+        )
+    result = {
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "repeat": args.repeat,
+        "results": rows,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    print(json.dumps(result))
+
+    if args.baseline:
+        regressions = compare(rows, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
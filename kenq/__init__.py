@@ -0,0 +1 @@
+"""研Q フロントエンド共通モジュール（各ページから共有して利用）"""
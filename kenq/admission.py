@@ -0,0 +1,130 @@
+"""バックエンドへの同時リクエスト数の制限（プロセス共通、到着順の順番待ち）
+
+全セッションのリクエストが一斉にバックエンドへ送られて全員がタイムアウトしないよう、
+検索・対話それぞれに同時実行数の上限を設ける。上限に達している間のリクエストは
+到着順（FIFO）に並び、待っている間は順番（何番目か）を呼び出し側に通知する。
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+from kenq.metrics import ADMISSION_WAIT_SECONDS
+
+QUEUE_POLL_INTERVAL = 0.5  # 秒（順番の通知間隔）
+ADMISSION_MAX_WAIT = 120  # 秒（これを超えて順番が来なければタイムアウト）
+
+
+class AdmissionTimeout(requests.exceptions.Timeout):
+    """順番待ちが ADMISSION_MAX_WAIT を超えた（通常のタイムアウトと同じ扱いで表示する）"""
+
+
+class Ticket:
+    """順番待ちの1件（admitted になったら実行してよい）"""
+
+    __slots__ = ("admitted", "queued_at")
+
+    def __init__(self):
+        self.admitted = False
+        self.queued_at = time.monotonic()
+
+
+class AdmissionQueue:
+    """同時実行数 limit のFIFOキュー（スレッドセーフ）"""
+
+    def __init__(self, name, limit):
+        self.name = name
+        self.limit = max(1, limit)
+        self._waiting = deque()
+        self._active = 0
+        self._cond = threading.Condition()
+        self.admitted = 0  # 実行を許可した件数
+        self.queued = 0  # 順番待ちになった件数
+        self.timeouts = 0
+        self.max_wait = 0.0  # 最長の待ち時間（秒）
+
+    def enter(self):
+        """列に並ぶ（空きがあればすぐに許可される）。必ず leave を呼ぶこと"""
+        ticket = Ticket()
+        with self._cond:
+            self._waiting.append(ticket)
+            self._admit()
+            if not ticket.admitted:
+                self.queued += 1
+        return ticket
+
+    def _admit(self):
+        while self._waiting and self._active < self.limit:
+            ticket = self._waiting.popleft()
+            ticket.admitted = True
+            self._active += 1
+            self.admitted += 1
+            waited = time.monotonic() - ticket.queued_at
+            self.max_wait = max(self.max_wait, waited)
+            ADMISSION_WAIT_SECONDS.observe(waited, queue=self.name)
+        self._cond.notify_all()
+
+    def leave(self, ticket):
+        """実行の終了（または順番待ちの取りやめ）"""
+        with self._cond:
+            if ticket.admitted:
+                ticket.admitted = False
+                self._active -= 1
+            else:
+                try:
+                    self._waiting.remove(ticket)
+                except ValueError:
+                    return
+            self._admit()
+
+    def waits(self, ticket, max_wait=ADMISSION_MAX_WAIT):
+        """順番が来るまで待つジェネレータ（待っている間、QUEUE_POLL_INTERVAL ごとに順番を返す）
+
+        呼び出し側は途中でジェネレータを閉じて待つのをやめられる（キャンセル時）。
+        """
+        deadline = ticket.queued_at + max_wait
+        timeout = 0  # 初回は待たずに確認する
+        while True:
+            with self._cond:
+                if self._cond.wait_for(lambda: ticket.admitted, timeout):
+                    return
+                if time.monotonic() >= deadline:
+                    self.timeouts += 1
+                    raise AdmissionTimeout(f"Waited more than {max_wait}s in the {self.name} queue")
+                position = self._waiting.index(ticket) + 1
+            yield position
+            timeout = min(QUEUE_POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+
+    @contextmanager
+    def slot(self, on_wait=None, max_wait=ADMISSION_MAX_WAIT):
+        """順番が来てから抜けるまでの間、実行枠を1つ確保する
+
+        on_wait: 待っている間、定期的に順番（1が先頭）を受け取るコールバック（順番が来たら0）
+        """
+        ticket = self.enter()
+        try:
+            waited = False
+            for position in self.waits(ticket, max_wait):
+                waited = True
+                if on_wait is not None:
+                    on_wait(position)
+            if waited and on_wait is not None:
+                on_wait(0)
+            yield
+        finally:
+            self.leave(ticket)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "name": self.name,
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": len(self._waiting),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "timeouts": self.timeouts,
+                "max_wait": self.max_wait,
+            }
@@ -0,0 +1,594 @@
+"""バックエンドAPI（Azure）への共通HTTPクライアント
+
+プロセスごとに1つだけ生成し、keep-aliveの接続プールを全セッション・全ページで共有する。
+"""
+import json
+import os
+import time
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from kenq.admission import ADMISSION_MAX_WAIT, AdmissionQueue
+from kenq.cache import TTLCache, make_key
+from kenq.health import CircuitBreaker, HealthMonitor
+from kenq.metrics import BACKEND_REQUEST_SECONDS, BACKEND_REQUESTS, JSON_DECODE_SECONDS, REGISTRY, start_metrics_server
+from kenq.researchers import REASON_KEYS, card_fields, is_profile_ref, researcher_id
+from kenq.single_flight import SingleFlight
+from kenq.streaming import STREAM_ACCEPT, iter_stream_events, stream_format
+
+# API設定（KENQ_API_BASE_URL で切り替え。負荷試験・開発では tools/mock_backend.py を指定する
+# 例: KENQ_API_BASE_URL=http://localhost:3000 streamlit run main_app.py）
+API_BASE_URL = os.environ.get(
+    "KENQ_API_BASE_URL", "https://app-kenq-4-hweychffaqhaf8a3.canadacentral-01.azurewebsites.net"
+)
+
+# 接続プール設定（同時に保持するソケット数の上限）
+POOL_MAXSIZE = 16
+
+SEARCH_TIMEOUT = 60
+CHAT_TIMEOUT = 45
+REASONS_TIMEOUT = 60
+PROFILES_TIMEOUT = 30
+HEALTH_TIMEOUT = 10
+
+# バックエンドへの同時リクエスト数の上限（全セッション共通、超えた分は到着順に待つ）
+SEARCH_CONCURRENCY = int(os.environ.get("KENQ_SEARCH_CONCURRENCY", "4"))
+CHAT_CONCURRENCY = int(os.environ.get("KENQ_CHAT_CONCURRENCY", "4"))
+
+# /api/search 応答キャッシュ設定（全セッション共通）
+SEARCH_CACHE_TTL = 600  # 秒
+SEARCH_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 検索結果のストリーミング受信（KENQ_SEARCH_STREAMING=0 で無効化）
+SEARCH_STREAMING = os.environ.get("KENQ_SEARCH_STREAMING", "1") != "0"
+
+# 対話応答のトークン単位ストリーミング受信（KENQ_CHAT_STREAMING=0 で無効化）
+CHAT_STREAMING = os.environ.get("KENQ_CHAT_STREAMING", "1") != "0"
+
+# おすすめ理由の遅延取得（KENQ_LAZY_REASONS=1 で有効化）
+# 検索時はカード項目のみを受け取り、理由は必要になった時に /api/reasons から取得する
+LAZY_REASONS = os.environ.get("KENQ_LAZY_REASONS", "0") == "1"
+REASONS_BATCH_SIZE = 10
+REASONS_CACHE_TTL = 3600  # 秒
+REASONS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# 研究者プロフィール（カード項目）のキャッシュ設定（研究者IDごと、全セッション共通）
+PROFILE_CACHE_TTL = 24 * 3600  # 秒
+PROFILE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# キャッシュ済みのプロフィールをIDのみの参照で受け取る（KENQ_PROFILE_REFS=1 で有効化）
+# リクエストに既知の研究者IDを添え、バックエンドはそれらのカード項目を省いて返す
+PROFILE_REFS = os.environ.get("KENQ_PROFILE_REFS", "0") == "1"
+PROFILE_REFS_MAX_KNOWN = 500  # 1リクエストに添える既知IDの上限（最近使われた順）
+# ストリーミング検索では研究者をまとめて補完する（/api/profiles の呼び出しを件数分に増やさない）
+PROFILE_RESOLVE_BATCH = 10  # 件（たまったら補完して表示）
+PROFILE_RESOLVE_WAIT = 0.25  # 秒（最初の1件からこの時間が過ぎたら、たまっていなくても補完して表示）
+
+# 一括エクスポート時に /api/search から1回で取得する件数（limit / offset でページ送り）
+EXPORT_PAGE_SIZE = 100
+
+
+def normalize_search_payload(payload):
+    """表記ゆれ（前後・連続空白、大文字小文字）を吸収した検索条件を返す"""
+    normalized = {}
+    for key, value in payload.items():
+        if isinstance(value, str):
+            value = " ".join(value.split())
+            if key == "query":
+                value = value.casefold()
+        normalized[key] = value
+    return normalized
+
+
+class BackendClient:
+    """requests.Session をラップし、/api/search・/api/chat・/api/health などを呼び出す"""
+
+    def __init__(self, base_url=None, pool_maxsize=POOL_MAXSIZE):
+        self.base_url = (base_url or API_BASE_URL).rstrip("/")
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self.search_cache = TTLCache(SEARCH_CACHE_TTL, SEARCH_CACHE_MAX_BYTES)
+        self.reasons_cache = TTLCache(REASONS_CACHE_TTL, REASONS_CACHE_MAX_BYTES)
+        self.profile_cache = TTLCache(PROFILE_CACHE_TTL, PROFILE_CACHE_MAX_BYTES)
+        # 同じ条件の検索が同時に実行中なら、バックエンドへの問い合わせを1回にまとめる
+        self.search_flight = SingleFlight()
+        # 検索（/api/search・/api/reasons）と対話（/api/chat）で別々の同時実行枠を持つ
+        self.search_queue = AdmissionQueue("search", SEARCH_CONCURRENCY)
+        self.chat_queue = AdmissionQueue("chat", CHAT_CONCURRENCY)
+        # バックエンドの停止中はリクエストを送らずにすぐ失敗させる（死活監視の結果も反映）
+        self.breaker = CircuitBreaker()
+        self.monitor = HealthMonitor(self.health, self.breaker)
+
+    def url(self, path):
+        return f"{self.base_url}{path}"
+
+    def post(self, path, payload, timeout):
+        return self._measured(path, self.session.post, self.url(path), json=payload, timeout=timeout)
+
+    def get(self, path, timeout):
+        return self._measured(path, self.session.get, self.url(path), timeout=timeout)
+
+    @staticmethod
+    def _measured(path, send, *args, **kwargs):
+        """リクエストの所要時間と結果（ok / http_4xx / http_5xx / error）を記録"""
+        started = time.perf_counter()
+        try:
+            response = send(*args, **kwargs)
+        except requests.exceptions.RequestException:
+            BACKEND_REQUESTS.inc(endpoint=path, outcome="error")
+            raise
+        finally:
+            BACKEND_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=path, mode="json")
+        outcome = "ok" if response.status_code < 400 else f"http_{response.status_code // 100}xx"
+        BACKEND_REQUESTS.inc(endpoint=path, outcome=outcome)
+        return response
+
+    @staticmethod
+    def _measured_stream(path, events):
+        """ストリーミング受信の所要時間（最後のイベントまで）と結果を記録"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            for event in events:
+                if event["type"] == "done":
+                    outcome = "ok"
+                yield event
+        except GeneratorExit:
+            # done を受け取った後に受信をやめるのは正常な終了
+            if outcome != "ok":
+                outcome = "cancelled"
+            raise
+        finally:
+            BACKEND_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=path, mode="stream")
+            BACKEND_REQUESTS.inc(endpoint=path, outcome=outcome)
+
+    @staticmethod
+    def decode_json(response, path):
+        """応答のJSONを読み込む（読み込みにかかった時間を記録）"""
+        with JSON_DECODE_SECONDS.time(endpoint=path):
+            return response.json()
+
+    def search(self, payload, timeout=SEARCH_TIMEOUT, use_cache=True, on_queue=None):
+        """研究者検索（/api/search）
+
+        同一条件の結果はキャッシュから返し、同じ条件の検索が他のセッションで実行中なら
+        その結果を待って共有する。
+        on_queue: 同時実行数の上限で順番待ちになった場合に、順番（1が先頭）を受け取るコールバック
+        """
+        key = make_key(normalize_search_payload(payload))
+        if use_cache:
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                # セッション側での書き換えがキャッシュに波及しないようコピーを返す
+                return [dict(item) for item in cached]
+
+        try:
+            results = self.search_flight.do(
+                key, lambda: self._post_search(payload, key, timeout, on_queue), timeout + ADMISSION_MAX_WAIT
+            )
+        except TimeoutError:
+            raise requests.exceptions.Timeout("Timed out waiting for an identical in-flight search") from None
+        if results is None:
+            # 同じ検索を受信していたストリーミングが途中で終了した場合は自分で問い合わせる
+            results = self._post_search(payload, key, timeout, on_queue)
+        return [dict(item) for item in results]
+
+    def _post_search(self, payload, key, timeout, on_queue=None):
+        with self.breaker.guard(), self.search_queue.slot(on_queue):
+            response = self.post("/api/search", self.with_profile_refs(payload), timeout)
+            response.raise_for_status()
+            results = self.decode_json(response, "/api/search")
+        # 参照の補完（/api/profiles）は実行枠を取り直して行う
+        results = self.resolve_profiles(results)
+        if results:
+            self.search_cache.set(key, results, len(response.content))
+        return results
+
+    def search_stream(self, payload, timeout=SEARCH_TIMEOUT, use_cache=True):
+        """研究者検索をストリーミングで受信し、イベントを順に返すジェネレータ
+
+        イベント:
+          {"type": "researcher", "index": i, "researcher": {...}}  研究者カードの項目
+          {"type": "reasons", "index": i, "reasons": {...}}        おすすめ理由（後から届く）
+          {"type": "done", "results": [...]}                        完了（全件の結果）
+          {"type": "queued", "position": n}                         同時実行数の上限で順番待ち中
+        バックエンドが従来の単一JSONを返した場合も同じイベント列に変換する。
+        同じ条件の検索が実行中の場合は、その完了を待って結果をまとめて返す。
+        """
+        key = make_key(normalize_search_payload(payload))
+        if use_cache:
+            cached = self.search_cache.get(key)
+            if cached is not None:
+                yield from self._events_from_results([dict(item) for item in cached])
+                return
+
+        flight, leader = self.search_flight.begin(key)
+        if not leader:
+            try:
+                results = self.search_flight.wait(flight, timeout + ADMISSION_MAX_WAIT)
+            except TimeoutError:
+                raise requests.exceptions.Timeout("Timed out waiting for an identical in-flight search") from None
+            if results is not None:
+                yield from self._events_from_results([dict(item) for item in results])
+            else:
+                yield from self._search_events(payload, key, timeout)
+            return
+
+        try:
+            for event in self._search_events(payload, key, timeout):
+                if event["type"] == "done":
+                    # 待機中のセッションには画面の描画を待たずに結果を渡す
+                    self.search_flight.finish(key, flight, result=[dict(item) for item in event["results"]])
+                yield event
+        except Exception as error:
+            if not flight.done.is_set():
+                self.search_flight.finish(key, flight, error=error)
+            raise
+        finally:
+            # 途中で受信をやめた場合（再実行・キャンセル）は待機中のセッションが自分で問い合わせる
+            if not flight.done.is_set():
+                self.search_flight.finish(key, flight)
+
+    def _search_events(self, payload, key, timeout):
+        """順番待ち・所要時間の記録を含めたストリーミング検索のイベント列"""
+        return self._admitted(
+            self.search_queue, self._measured_stream("/api/search", self._stream_search(payload, key, timeout))
+        )
+
+    def _stream_search(self, payload, key, timeout):
+        response = self.session.post(
+            self.url("/api/search"),
+            json={**self.with_profile_refs(payload), "stream": True},
+            timeout=timeout,
+            stream=True,
+            headers={"Accept": STREAM_ACCEPT},
+        )
+        with response:
+            response.raise_for_status()
+            if stream_format(response) == "json":
+                results = self.resolve_profiles(self.decode_json(response, "/api/search"), guarded=True)
+                size = len(response.content)
+            else:
+                results = []
+                pending = []  # (バックエンド側の位置, 補完前の研究者)
+                positions = {}  # バックエンド側の位置 -> results の位置（補完できなかった研究者は除く）
+                received = 0
+                pending_since = None
+                for event in iter_stream_events(response):
+                    event_type = event.get("type")
+                    if event_type == "researcher":
+                        pending.append((received, event["researcher"]))
+                        received += 1
+                        if pending_since is None:
+                            pending_since = time.monotonic()
+                        if (len(pending) < PROFILE_RESOLVE_BATCH
+                                and time.monotonic() - pending_since < PROFILE_RESOLVE_WAIT):
+                            continue
+                    elif event_type not in ("reasons", "done"):
+                        continue
+                    # 🔧 たまった研究者を1回の補完でまとめて返す（reasons は補完後の結果の位置を指すので先に返す）
+                    yield from self._resolved_events(pending, results, positions)
+                    pending_since = None
+                    if event_type == "reasons":
+                        index = positions.get(event["index"])
+                        if index is None:
+                            continue
+                        reasons = {k: v for k, v in event.get("reasons", {}).items() if k in REASON_KEYS}
+                        results[index].update(reasons)
+                        yield {"type": "reasons", "index": index, "reasons": reasons}
+                    elif event_type == "done":
+                        break
+                yield from self._resolved_events(pending, results, positions)
+                # 呼び出し側は done を受け取った時点で受信をやめるため、キャッシュへの登録は先に行う
+                if results:
+                    size = len(json.dumps(results, ensure_ascii=False).encode("utf-8"))
+                    self.search_cache.set(key, [dict(item) for item in results], size)
+                yield {"type": "done", "results": results}
+                return
+
+        if results:
+            self.search_cache.set(key, results, size)
+            results = [dict(item) for item in results]
+        yield from self._events_from_results(results)
+
+    def _resolved_events(self, pending, results, positions):
+        """バッファした研究者を1回の補完でまとめて results に追加し、researcher イベントを返す
+
+        ストリーミングの受信中（実行枠の中）に呼ぶ。補完できなかった参照は results に含めない。
+        """
+        if not pending:
+            return
+        resolved = self._resolve_items([item for _, item in pending], PROFILES_TIMEOUT, guarded=True)
+        for (position, _), researcher in zip(pending, resolved):
+            if researcher is None:
+                continue
+            positions[position] = len(results)
+            results.append(researcher)
+            yield {"type": "researcher", "index": len(results) - 1, "researcher": researcher}
+        pending.clear()
+
+    def _admitted(self, queue, events):
+        """queue で順番待ちの間は queued イベントを返し、順番が来てから events を受信する
+
+        呼び出し側は done を受け取った時点で受信をやめる（ジェネレータが閉じられる）ため、
+        バックエンドの成功は done を受信した時点で記録する。
+        """
+        with self.breaker.guard():
+            ticket = queue.enter()
+            try:
+                for position in queue.waits(ticket):
+                    yield {"type": "queued", "position": position}
+                for event in events:
+                    if event["type"] == "done":
+                        self.breaker.record_success()
+                    yield event
+            finally:
+                queue.leave(ticket)
+
+    @staticmethod
+    def _events_from_results(results):
+        """一括取得済みの結果をストリーミングと同じイベント列に変換"""
+        for index, researcher in enumerate(results):
+            yield {"type": "researcher", "index": index, "researcher": researcher}
+        yield {"type": "done", "results": results}
+
+    def iter_search_pages(self, payload, page_size=EXPORT_PAGE_SIZE, max_results=None, timeout=SEARCH_TIMEOUT):
+        """検索結果全体を limit / offset でページ送りしながら1ページずつ返すジェネレータ
+
+        一括エクスポート用。結果は保持せずキャッシュにも入れないため、件数によらず
+        メモリ使用量は1ページ分に収まる。limit / offset に未対応のバックエンドでは
+        1回目の応答を全件として扱う。
+        """
+        offset = 0
+        previous_first = None
+        while max_results is None or offset < max_results:
+            limit = page_size if max_results is None else min(page_size, max_results - offset)
+            page_payload = {**self.with_profile_refs(payload), "limit": limit, "offset": offset}
+            # ページごとに実行枠を取り直し、一括エクスポート中も他のセッションの検索を待たせない
+            with self.breaker.guard(), self.search_queue.slot():
+                response = self.post("/api/search", page_payload, timeout)
+                response.raise_for_status()
+                received = self.decode_json(response, "/api/search")
+            if not received:
+                return
+            # ページ送りは受信した件数で判定する（補完できなかった参照は page から除かれる）
+            page = self.resolve_profiles(received)
+            # limit を無視して全件が返ってきた場合
+            if len(received) > limit:
+                yield page if max_results is None else page[:max_results - offset]
+                return
+            # offset を無視して同じページが返ってきた場合
+            first = make_key(received[0])
+            if first == previous_first:
+                return
+            previous_first = first
+            if page:
+                yield page
+            if len(received) < limit:
+                return
+            offset += len(received)
+
+    def with_profile_refs(self, payload):
+        """PROFILE_REFS 有効時、キャッシュ済みの研究者IDをリクエストに添える"""
+        if not PROFILE_REFS:
+            return payload
+        known = self.profile_cache.recent_keys(PROFILE_REFS_MAX_KNOWN)
+        return {**payload, "profile_refs": True, "known_profiles": known}
+
+    def resolve_profiles(self, items, timeout=PROFILES_TIMEOUT, guarded=False):
+        """IDのみの参照をキャッシュ済みのプロフィールで補完した研究者dictのリストを返す
+
+        期限切れなどでキャッシュにないプロフィールは /api/profiles からまとめて取得する。
+        受け取ったプロフィールはキャッシュに登録し、以降の検索・対話で再利用する。
+        /api/profiles も返さなかった参照はカードを表示できないため除く。
+        guarded: 呼び出し側が breaker.guard() と実行枠の中で呼ぶ場合は True（二重に取らない）
+        """
+        return [item for item in self._resolve_items(items, timeout, guarded) if item is not None]
+
+    def _resolve_items(self, items, timeout, guarded):
+        """resolve_profiles の本体（items と同じ並びで返し、補完できなかった参照は None）"""
+        profiles = {}
+        missing = []
+        for item in items:
+            if is_profile_ref(item):
+                profile = self.profile_cache.get(item["id"])
+                if profile is None:
+                    missing.append(item["id"])
+                else:
+                    profiles[item["id"]] = profile
+            else:
+                self.remember_profile(item)
+
+        if missing:
+            if guarded:
+                response = self.post("/api/profiles", {"ids": missing}, timeout)
+                response.raise_for_status()
+            else:
+                with self.breaker.guard(), self.search_queue.slot():
+                    response = self.post("/api/profiles", {"ids": missing}, timeout)
+                    response.raise_for_status()
+            for rid, profile in self.decode_json(response, "/api/profiles").get("profiles", {}).items():
+                profiles[rid] = self.remember_profile(profile)
+
+        resolved = []
+        for item in items:
+            if not is_profile_ref(item):
+                resolved.append(dict(item))
+            elif item["id"] in profiles:
+                resolved.append({
+                    **profiles[item["id"]], **{k: v for k, v in item.items() if k not in ("id", "profile_ref")}
+                })
+            else:
+                resolved.append(None)
+        return resolved
+
+    def remember_profile(self, item):
+        """研究者dictのカード項目をプロフィールキャッシュに登録し、登録した項目を返す"""
+        profile = card_fields(item)
+        if profile.get("name"):
+            size = sum(len(str(value)) for value in profile.values())
+            self.profile_cache.set(researcher_id(profile), profile, size)
+        return profile
+
+    def fetch_reasons(self, query, language, researchers, timeout=REASONS_TIMEOUT):
+        """おすすめ理由を研究者ごとに取得（/api/reasons）
+
+        キャッシュにない研究者のみを REASONS_BATCH_SIZE 件ずつまとめて問い合わせる。
+        戻り値: {研究者ID: {"reason_title_1": ..., ...}}
+        """
+        context = normalize_search_payload({"query": query, "language": language})
+        reasons_by_id = {}
+        missing = []
+        seen = set()
+        for researcher in researchers:
+            rid = researcher_id(researcher)
+            # 同じ研究者が複数回含まれていても1回だけ問い合わせる
+            if rid in seen:
+                continue
+            seen.add(rid)
+            cached = self.reasons_cache.get(make_key({**context, "id": rid}))
+            if cached is not None:
+                reasons_by_id[rid] = cached
+            else:
+                missing.append(researcher)
+
+        for start in range(0, len(missing), REASONS_BATCH_SIZE):
+            batch = missing[start:start + REASONS_BATCH_SIZE]
+            payload = {
+                "query": query,
+                "language": language,
+                "researchers": [{"id": researcher_id(r), **card_fields(r)} for r in batch],
+            }
+            with self.breaker.guard(), self.search_queue.slot():
+                response = self.post("/api/reasons", payload, timeout)
+                response.raise_for_status()
+            for rid, reasons in self.decode_json(response, "/api/reasons").get("reasons", {}).items():
+                reasons = {k: v for k, v in reasons.items() if k in REASON_KEYS}
+                size = sum(len(v.encode("utf-8")) for v in reasons.values())
+                self.reasons_cache.set(make_key({**context, "id": rid}), reasons, size)
+                reasons_by_id[rid] = reasons
+        return reasons_by_id
+
+    def chat(self, payload, timeout=CHAT_TIMEOUT, on_queue=None):
+        """対話応答（/api/chat）
+
+        on_queue: 同時実行数の上限で順番待ちになった場合に、順番（1が先頭）を受け取るコールバック
+        """
+        with self.breaker.guard(), self.chat_queue.slot(on_queue):
+            response = self.post("/api/chat", self.with_profile_refs(payload), timeout)
+            response.raise_for_status()
+            result = self.decode_json(response, "/api/chat")
+        result["researchers"] = self.resolve_profiles(result.get("researchers") or [])
+        return result
+
+    def chat_stream(self, payload, timeout=CHAT_TIMEOUT, on_response=None):
+        """対話応答をストリーミングで受信し、イベントを順に返すジェネレータ
+
+        イベント:
+          {"type": "token", "text": "..."}                 応答本文の断片
+          {"type": "researchers", "researchers": [...]}    おすすめ研究者（本文の後に届く）
+          {"type": "context_update", "context_update": {...}}
+          {"type": "done", "result": {...}}                 chat() と同じ形式の最終結果
+          {"type": "queued", "position": n}                 同時実行数の上限で順番待ち中
+        バックエンドが従来の単一JSONを返した場合も同じイベント列に変換する。
+        on_response: 応答ヘッダー受信後に response を受け取るコールバック（キャンセル用）
+        """
+        return self._admitted(
+            self.chat_queue, self._measured_stream("/api/chat", self._stream_chat(payload, timeout, on_response))
+        )
+
+    def _stream_chat(self, payload, timeout, on_response):
+        response = self.session.post(
+            self.url("/api/chat"),
+            json={**self.with_profile_refs(payload), "stream": True},
+            timeout=timeout,
+            stream=True,
+            headers={"Accept": STREAM_ACCEPT},
+        )
+        if on_response is not None:
+            on_response(response)
+        with response:
+            response.raise_for_status()
+            if stream_format(response) == "json":
+                result = self.decode_json(response, "/api/chat")
+                if result.get("response"):
+                    yield {"type": "token", "text": result["response"]}
+            else:
+                tokens = []
+                result = {"researchers": [], "context_update": {}}
+                for event in iter_stream_events(response):
+                    event_type = event.get("type")
+                    if event_type == "token":
+                        tokens.append(event.get("text", ""))
+                        yield {"type": "token", "text": event.get("text", "")}
+                    elif event_type == "researchers":
+                        result["researchers"] = event.get("researchers", [])
+                    elif event_type == "context_update":
+                        result["context_update"] = event.get("context_update", {})
+                    elif event_type == "done":
+                        break
+                result["response"] = "".join(tokens)
+
+        result["researchers"] = self.resolve_profiles(result.get("researchers") or [], guarded=True)
+        result.setdefault("context_update", {})
+        yield {"type": "researchers", "researchers": result["researchers"]}
+        yield {"type": "context_update", "context_update": result["context_update"]}
+        yield {"type": "done", "result": result}
+
+    def health(self, timeout=HEALTH_TIMEOUT):
+        """ヘルスチェック（/api/health）。ステータス判定は呼び出し側（HealthMonitor）で行う"""
+        return self.get("/api/health", timeout)
+
+
+def register_metrics(client):
+    """キャッシュ・順番待ち・遮断状態などの現在値を計測値として公開"""
+    caches = {"search": client.search_cache, "reasons": client.reasons_cache, "profiles": client.profile_cache}
+    queues = (client.search_queue, client.chat_queue)
+    REGISTRY.gauge(
+        "kenq_cache_entries", "Entries held in each process-wide cache", ["cache"],
+        collect=lambda: [({"cache": name}, len(cache)) for name, cache in caches.items()],
+    )
+    REGISTRY.gauge(
+        "kenq_cache_hit_ratio", "Hit ratio of each process-wide cache since start", ["cache"],
+        collect=lambda: [({"cache": name}, cache.stats()["hit_rate"]) for name, cache in caches.items()],
+    )
+    REGISTRY.gauge(
+        "kenq_admission_requests", "Backend calls running or waiting in each admission queue", ["queue", "state"],
+        collect=lambda: [
+            ({"queue": stats["name"], "state": state}, stats[state])
+            for stats in (queue.stats() for queue in queues)
+            for state in ("active", "waiting")
+        ],
+    )
+    REGISTRY.gauge(
+        "kenq_search_coalesced", "Searches sent to the backend vs. shared with an identical in-flight search",
+        ["result"],
+        collect=lambda: [
+            ({"result": "executed"}, client.search_flight.executed),
+            ({"result": "shared"}, client.search_flight.shared),
+        ],
+    )
+    REGISTRY.gauge(
+        "kenq_circuit_open", "1 while the circuit breaker rejects backend calls",
+        collect=lambda: [({}, int(client.breaker.state == "open"))],
+    )
+    REGISTRY.gauge(
+        "kenq_health_latency_seconds", "Latency of the latest /api/health poll",
+        collect=lambda: [] if client.monitor.latency_ms is None else [({}, client.monitor.latency_ms / 1000)],
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_backend_client():
+    """プロセス共通のバックエンドクライアントを取得（初回のみ生成・死活監視を開始）"""
+    client = BackendClient()
+    # 初回表示をブロックしないよう、監視はバックグラウンドで行う（初回の確認が事前接続を兼ねる）
+    client.monitor.start()
+    register_metrics(client)
+    start_metrics_server()
+    return client
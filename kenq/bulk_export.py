@@ -0,0 +1,141 @@
+"""検索結果全体の一括エクスポート（CSV / JSONL / Parquet）
+
+表示中のページに関係なく、バックエンドから limit / offset で1ページずつ取得し、
+ジェネレータで順に書き出す。書き出し中に保持するのは1ページ分の研究者のみで、
+出力先は一定サイズを超えると一時ファイルに退避されるため、件数が増えても
+作業メモリは一定に保たれる。完成したファイルは st.download_button に渡すため
+一度だけメモリに読み出すので、大きさは BULK_EXPORT_MAX_BYTES までに制限する。
+"""
+import csv
+import io
+import json
+import tempfile
+
+from kenq.csv_export import iter_rows, search_csv_columns, search_metadata_row
+from kenq.researchers import CARD_KEYS, REASON_KEYS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet出力は pyarrow がある環境のみ
+    pa = pq = None
+
+BULK_EXPORT_DEFAULT_RESULTS = 1000
+BULK_EXPORT_MAX_RESULTS = 5000
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # これを超えた出力は一時ファイルに書き出す
+BULK_EXPORT_MAX_BYTES = 32 * 1024 * 1024  # 出力ファイルの上限（超えた場合は中止）
+
+EXPORT_FORMATS = {
+    "csv": {"mime": "text/csv", "extension": "csv"},
+    "jsonl": {"mime": "application/x-ndjson", "extension": "jsonl"},
+    "parquet": {"mime": "application/vnd.apache.parquet", "extension": "parquet"},
+}
+
+# JSONL / Parquet の列（分析で扱いやすいようバックエンドと同じキー名を使う）
+EXPORT_FIELDS = CARD_KEYS + REASON_KEYS
+INT_FIELDS = {"works_count", "cited_by_count", "h_index", "paper_data_count"}
+
+
+class ExportTooLarge(ValueError):
+    """出力が BULK_EXPORT_MAX_BYTES を超えた"""
+
+    def __init__(self, max_bytes):
+        super().__init__(f"Export exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def available_formats():
+    """この環境で選択できる出力形式"""
+    return [fmt for fmt in EXPORT_FORMATS if fmt != "parquet" or pq is not None]
+
+
+def _to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def export_record(item):
+    """研究者dictを列と型を揃えたレコードに変換（JSONL / Parquet 用）"""
+    record = {}
+    for key in EXPORT_FIELDS:
+        value = item.get(key)
+        if key in INT_FIELDS:
+            record[key] = _to_int(value)
+        else:
+            record[key] = "" if value is None else str(value)
+    return record
+
+
+def iter_csv_chunks(pages, query, language):
+    """CSVをページ単位のバイト列で順に返す（列は検索結果CSVと同じ、先頭のみBOM付き）"""
+    columns = search_csv_columns(language)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _, _ in columns])
+    writer.writerow(search_metadata_row(query, None, language))
+    yield buffer.getvalue().encode("utf-8-sig")
+    for page in pages:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(iter_rows(page, columns))
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_jsonl_chunks(pages):
+    """JSONL（1行1研究者）をページ単位のバイト列で順に返す"""
+    for page in pages:
+        yield "".join(
+            json.dumps(export_record(item), ensure_ascii=False) + "\n" for item in page
+        ).encode("utf-8")
+
+
+def write_parquet(pages, sink):
+    """1ページを1つの行グループとしてParquetを書き出す"""
+    schema = pa.schema([(key, pa.int64() if key in INT_FIELDS else pa.string()) for key in EXPORT_FIELDS])
+    with pq.ParquetWriter(sink, schema) as writer:
+        for page in pages:
+            writer.write_table(pa.Table.from_pylist([export_record(item) for item in page], schema=schema))
+
+
+def export_search_results(backend, payload, fmt, language, max_results=BULK_EXPORT_DEFAULT_RESULTS, on_progress=None,
+                          max_bytes=BULK_EXPORT_MAX_BYTES):
+    """検索条件に一致する結果全体を指定形式で書き出す
+
+    on_progress: 1ページ取得するごとにそれまでの件数を受け取るコールバック
+    戻り値: (出力のバイト列, 件数)。出力が max_bytes を超えた場合は ExportTooLarge
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+    # おすすめ理由の遅延取得モードでも、一括エクスポートには理由を含める
+    payload = {key: value for key, value in payload.items() if key != "include_reasons"}
+    count = 0
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as sink:
+        def pages():
+            nonlocal count
+            for page in backend.iter_search_pages(payload, max_results=max_results):
+                # 書き出し済みの大きさを次のページの取得前に確認する
+                if sink.tell() > max_bytes:
+                    raise ExportTooLarge(max_bytes)
+                count += len(page)
+                if on_progress is not None:
+                    on_progress(count)
+                yield page
+
+
+        if fmt == "parquet":
+            write_parquet(pages(), sink)
+        else:
+            if fmt == "csv":
+                chunks = iter_csv_chunks(pages(), payload.get("query", ""), language)
+            else:
+                chunks = iter_jsonl_chunks(pages())
+            for chunk in chunks:
+                sink.write(chunk)
+        if sink.tell() > max_bytes:
+            raise ExportTooLarge(max_bytes)
+        # st.download_button はバイト列を受け取るため、最後に一度だけ読み出す
+        sink.seek(0)
+        return sink.read(), count
@@ -0,0 +1,94 @@
+"""プロセス共通のTTL付きLRUキャッシュ（スレッドセーフ）"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_key(payload):
+    """dictなどのJSON化可能な値から安定したキャッシュキーを生成"""
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """有効期限（TTL）と合計バイト数の上限を持つLRUキャッシュ
+
+    上限を超えた場合は最も長く参照されていないエントリから削除する。
+    """
+
+    def __init__(self, ttl_seconds, max_bytes):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, size):
+        """sizeは呼び出し側で見積もったバイト数（上限を超える値は保存しない）"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def recent_keys(self, limit=None):
+        """有効期限内のキーを最近使われた順に返す（limit 件まで）"""
+        now = time.monotonic()
+        keys = []
+        with self._lock:
+            for key in reversed(self._entries):
+                if limit is not None and len(keys) >= limit:
+                    break
+                if self._entries[key][0] >= now:
+                    keys.append(key)
+        return keys
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
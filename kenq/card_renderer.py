@@ -0,0 +1,90 @@
+"""研究者カードのHTML生成
+
+1ページ分のカードを1つのHTML断片にまとめ、st.markdown 1回で送信する。
+バックエンド由来の文字列はすべてエスケープする。
+"""
+from html import escape
+
+
+def _orcid_html(orcid):
+    orcid_url = (orcid or "").strip()
+    if not orcid_url or orcid_url == "N/A":
+        return "N/A"
+    if not orcid_url.startswith("http"):
+        orcid_url = f"https://orcid.org/{orcid_url}"
+    safe_url = escape(orcid_url, quote=True)
+    return f'<a href="{safe_url}" target="_blank">{safe_url}</a>'
+
+
+def _text_html(text):
+    """改行を保持したまま本文をエスケープ（空行でMarkdown処理に戻らないよう<br>に置換）"""
+    return "<br>".join(escape(line) for line in text.strip().splitlines())
+
+
+def _metric_html(title, value, sub=""):
+    return (
+        f'<div class="metric-container"><div class="metric-title">{title}</div>'
+        f'<div class="metric-value">{value}</div>{sub}</div>'
+    )
+
+
+def _reasons_html(item, get_text, reasons_note="no_reasons"):
+    """おすすめ理由（<details>で折りたたみ、開閉はブラウザ側のみで完結）
+
+    reasons_note: 理由が無い場合に表示する文言のキー（受信中・未取得などで切り替える）
+    """
+    parts = []
+    for j in range(1, 4):
+        title = (item.get(f"reason_title_{j}") or "").strip()
+        body = (item.get(f"reason_body_{j}") or "").strip()
+        if not (title or body):
+            continue
+        reason = ""
+        if title:
+            reason += f'<p class="reason-title">🎯 {escape(title)}</p>'
+        if body:
+            reason += f'<p class="reason-body">{_text_html(body)}</p>'
+        parts.append(reason)
+    if parts:
+        inner = "<hr>".join(parts)
+    else:
+        inner = f"<p>{escape(get_text(reasons_note))}</p>"
+    return (
+        f'<details class="reasons"><summary>{escape(get_text("view_reasons"))}</summary>'
+        f'{inner}</details>'
+    )
+
+
+def render_card_html(item, get_text, reasons_note="no_reasons"):
+    """研究者1名分のカードHTMLを生成"""
+    name = escape(item.get("name") or "No Name")
+    papers_unit = escape(get_text("papers_unit"))
+    works_count = item.get("works_count", item.get("paper_count", 0)) or 0
+    cited_by_count = item.get("cited_by_count", 0) or 0
+    h_index = item.get("h_index", 0) or 0
+    paper_data_count = item.get("paper_data_count")
+    db_sub = (
+        f'<div class="metric-sub">{escape(get_text("db_records"))}: {paper_data_count}{papers_unit}</div>'
+        if paper_data_count else ""
+    )
+
+    return (
+        '<div class="search-result-card"><div class="card-body"><div class="card-main">'
+        f'<h3 class="researcher-name">{get_text.format("researcher_name", name=name)}</h3>'
+        f'<p class="researcher-info"><strong>{escape(get_text("institution"))}:</strong> {escape(item.get("institution") or "N/A")}</p>'
+        f'<p class="researcher-info"><strong>{escape(get_text("research_field"))}:</strong> {escape(item.get("classified_field") or "N/A")}</p>'
+        f'<p class="researcher-info"><strong>{escape(get_text("orcid"))}:</strong> {_orcid_html(item.get("orcid"))}</p>'
+        '</div><div class="card-metrics">'
+        f'<p class="metrics-header">{escape(get_text("research_metrics"))}</p>'
+        + _metric_html(escape(get_text("num_publications")), f"{works_count:,}{papers_unit}")
+        + _metric_html(escape(get_text("num_citations")), f"{cited_by_count:,}{escape(get_text('citations_unit'))}")
+        + _metric_html(escape(get_text("h_index")), f"{h_index}", db_sub)
+        + '</div></div>'
+        + _reasons_html(item, get_text, reasons_note)
+        + '</div>'
+    )
+
+
+def render_cards_html(items, get_text, reasons_note="no_reasons"):
+    """複数カードを1つのHTML断片に連結"""
+    return "".join(render_card_html(item, get_text, reasons_note) for item in items)
@@ -0,0 +1,91 @@
+"""対話履歴の保持と表示範囲の管理
+
+セッション状態には直近 CHAT_HISTORY_MAX_MESSAGES 件のみを保持し、それより古い
+メッセージは研究者の参照を除いた軽量な形でプロセス共通のアーカイブに退避する。
+アーカイブはTTLと合計サイズの上限を持つため、古いものから順に消える。
+"""
+import json
+import os
+
+import streamlit as st
+
+from kenq.cache import TTLCache
+
+# 全文を表示する直近のメッセージ数（それより前は「以前のメッセージを表示」で読み込む）
+CHAT_WINDOW_MESSAGES = int(os.environ.get("KENQ_CHAT_WINDOW", "10"))
+# セッション状態に保持するメッセージ数の上限（KENQ_CHAT_HISTORY_MAX で変更）
+CHAT_HISTORY_MAX_MESSAGES = max(int(os.environ.get("KENQ_CHAT_HISTORY_MAX", "40")), CHAT_WINDOW_MESSAGES)
+
+CHAT_ARCHIVE_TTL = 6 * 3600  # 秒
+CHAT_ARCHIVE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def archived_message(message):
+    """退避用の軽量なメッセージ（研究者リストは件数のみ残す）"""
+    return {
+        "role": message["role"],
+        "content": message["content"],
+        "timestamp": message.get("timestamp"),
+        "researcher_count": len(message.get("researcher_ids") or []),
+    }
+
+
+class ChatArchive:
+    """セッションから退避した古いメッセージ（通し番号で参照）"""
+
+    def __init__(self, ttl_seconds=CHAT_ARCHIVE_TTL, max_bytes=CHAT_ARCHIVE_MAX_BYTES):
+        self.cache = TTLCache(ttl_seconds, max_bytes)
+
+    def put(self, archive_id, index, message):
+        size = len(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+        self.cache.set(f"{archive_id}:{index}", message, size)
+
+    def get(self, archive_id, index):
+        """退避済みのメッセージ（期限切れ・削除済みは None）"""
+        return self.cache.get(f"{archive_id}:{index}")
+
+
+@st.cache_resource(show_spinner=False)
+def get_chat_archive():
+    """プロセス共通の対話履歴アーカイブを取得"""
+    return ChatArchive()
+
+
+def spill_history(history, archive, archive_id, spilled, max_messages=CHAT_HISTORY_MAX_MESSAGES, on_spill=None):
+    """上限を超えた古いメッセージをアーカイブへ移し、history から取り除く
+
+    spilled: これまでに退避したメッセージ数（history[0] の通し番号）
+    on_spill: 退避するメッセージごとに呼び出すコールバック（研究者データの参照解除など）
+    戻り値: 退避後のメッセージ数
+    """
+    excess = len(history) - max_messages
+    if excess <= 0:
+        return spilled
+    for offset, message in enumerate(history[:excess]):
+        archive.put(archive_id, spilled + offset, archived_message(message))
+        if on_spill is not None:
+            on_spill(message)
+    del history[:excess]
+    return spilled + excess
+
+
+def visible_messages(history, archive, archive_id, spilled, earlier):
+    """表示するメッセージを古い順に返す
+
+    earlier: 直近 CHAT_WINDOW_MESSAGES 件に加えて表示する古いメッセージ数
+    戻り値: (メッセージのリスト, 表示していない古いメッセージ数, 期限切れで表示できない件数)
+    """
+    total = spilled + len(history)
+    start = max(0, total - CHAT_WINDOW_MESSAGES - earlier)
+    messages = []
+    expired = 0
+    for index in range(start, total):
+        if index >= spilled:
+            messages.append(history[index - spilled])
+            continue
+        message = archive.get(archive_id, index)
+        if message is None:
+            expired += 1
+        else:
+            messages.append(message)
+    return messages, start, expired
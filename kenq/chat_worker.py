@@ -0,0 +1,127 @@
+"""対話リクエストのバックグラウンド実行（キャンセル・新しいメッセージによる置き換えに対応）
+
+スクリプトスレッドはリクエストを投入するだけで待たずに戻り、進捗はセッション状態に
+保存した ChatRequest をポーリングして表示する。
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from kenq.metrics import CHAT_FIRST_TOKEN_SECONDS, CHAT_REPLY_SECONDS, CHAT_REQUESTS
+
+CHAT_MAX_WORKERS = 8
+
+# ChatRequest.status
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+
+class ChatRequest:
+    """1回分の /api/chat 呼び出しの状態（ワーカースレッドが更新し、ページが読み取る）"""
+
+    def __init__(self, message):
+        self.id = uuid.uuid4().hex
+        self.message = message
+        self.status = RUNNING
+        self.tokens = []
+        self.queue_position = 0  # 同時実行数の上限で順番待ち中の順番（0は待ちなし）
+        self.result = None
+        self.error = None
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self._cancel_event = threading.Event()
+        self._response = None
+        self._lock = threading.Lock()
+
+    @property
+    def text(self):
+        """ここまでに受信した応答本文"""
+        return "".join(self.tokens)
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def finished(self):
+        return self.status != RUNNING
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def attach_response(self, response):
+        """受信中のHTTP応答を登録（キャンセル時に接続を閉じるため）"""
+        with self._lock:
+            self._response = response
+            if self.cancelled:
+                response.close()
+
+    def cancel(self):
+        """キャンセル要求。受信中であれば接続を閉じてバックエンドでの処理も打ち切る"""
+        self._cancel_event.set()
+        with self._lock:
+            if self._response is not None:
+                self._response.close()
+
+    def _finish(self, status, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.finished_at = time.monotonic()
+        self.status = status
+        CHAT_REQUESTS.inc(status=status)
+        if status == DONE:
+            CHAT_REPLY_SECONDS.observe(self.elapsed)
+
+
+class ChatWorker:
+    """プロセス共通のスレッドプールで対話リクエストを実行する"""
+
+    def __init__(self, max_workers=CHAT_MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kenq-chat")
+
+    def submit(self, client, payload, streaming=True):
+        request = ChatRequest(payload.get("message", ""))
+        self.executor.submit(self._run, request, client, payload, streaming)
+        return request
+
+    @staticmethod
+    def _run(request, client, payload, streaming):
+        if request.cancelled:
+            request._finish(CANCELLED)
+            return
+        try:
+            if not streaming:
+                # 一括応答の受信中は接続を閉じられないため、受信後にキャンセルを確認して結果を破棄する
+                result = client.chat(payload, on_queue=lambda position: setattr(request, "queue_position", position))
+                if request.cancelled:
+                    request._finish(CANCELLED)
+                    return
+                request.tokens.append(result.get("response", ""))
+            else:
+                result = None
+                for event in client.chat_stream(payload, on_response=request.attach_response):
+                    if request.cancelled:
+                        break
+                    request.queue_position = event["position"] if event["type"] == "queued" else 0
+                    if event["type"] == "token":
+                        if not request.tokens:
+                            CHAT_FIRST_TOKEN_SECONDS.observe(request.elapsed)
+                        request.tokens.append(event["text"])
+                    elif event["type"] == "done":
+                        result = event["result"]
+        except Exception as e:  # 例外の種類に応じたメッセージはページ側で表示する
+            request._finish(CANCELLED if request.cancelled else FAILED, error=e)
+            return
+        request._finish(CANCELLED if request.cancelled else DONE, result=result)
+
+
+@st.cache_resource(show_spinner=False)
+def get_chat_worker():
+    """プロセス共通の対話ワーカーを取得"""
+    return ChatWorker()
@@ -0,0 +1,137 @@
+"""検索結果・チャットのおすすめ研究者のCSVエクスポート（両ページ共通）
+
+CSVのバイト列は結果セットごとに一度だけ生成し、プロセス共通のキャッシュに保持する。
+"""
+import csv
+import io
+from datetime import datetime
+
+import streamlit as st
+
+from kenq.cache import TTLCache, make_key
+
+EXPORT_CACHE_TTL = 1800  # 秒
+EXPORT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# 研究者検索ページのCSV列
+SEARCH_BASE_COLUMNS = [
+    ('Researcher Name / 研究者名', 'name', 'N/A'),
+    ('Institution / 所属', 'institution', 'N/A'),
+    ('Research Field / 研究分野', 'classified_field', 'N/A'),
+    ('ORCID', 'orcid', 'N/A'),
+    ('Publications / 論文数', 'works_count', 0),
+    ('Citations / 被引用数', 'cited_by_count', 0),
+    ('h-index / h指数', 'h_index', 0),
+    ('DB Records / DBデータ', 'paper_data_count', 0),
+]
+
+# チャットページのCSV列
+CHAT_COLUMNS = [
+    ("Name / 研究者名", 'name', 'N/A'),
+    ("Institution / 所属", 'institution', 'N/A'),
+    ("Research Field / 研究分野", 'classified_field', 'N/A'),
+    ("Papers / 論文数", 'works_count', 0),
+    ("Citations / 被引用数", 'cited_by_count', 0),
+    ("h-index / h指数", 'h_index', 0),
+    ("ORCID", 'orcid', 'N/A'),
+] + [
+    (f"Reason {i} {part.title()} / 理由{i} {label}", f"reason_{part}_{i}", '')
+    for i in range(1, 4)
+    for part, label in (("title", "タイトル"), ("body", "詳細"))
+]
+
+
+def search_reason_columns(language):
+    """おすすめ理由の列（言語によって列名が異なる）"""
+    columns = []
+    for i in range(1, 4):
+        if language == 'en':
+            columns.append((f'Recommendation Reason {i} Title', f'reason_title_{i}', ''))
+            columns.append((f'Recommendation Reason {i} Details', f'reason_body_{i}', ''))
+        else:
+            columns.append((f'おすすめ理由{i}タイトル', f'reason_title_{i}', ''))
+            columns.append((f'おすすめ理由{i}詳細', f'reason_body_{i}', ''))
+    return columns
+
+
+def search_csv_columns(language):
+    return SEARCH_BASE_COLUMNS + search_reason_columns(language)
+
+
+def search_metadata_row(query, total, language):
+    """CSV先頭に入れるメタデータ行（検索クエリ・生成日時・件数・言語）
+
+    total: 結果件数（一括エクスポートのように書き出し前に件数が分からない場合は None）
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if language == 'en':
+        total_text = 'Total Results: Bulk Export' if total is None else f'Total Results: {total}'
+        values = [f'Search Query: {query}', f'Generated: {timestamp}', total_text, 'Language: English']
+    else:
+        total_text = '総結果数: 一括エクスポート' if total is None else f'総結果数: {total}件'
+        values = [f'検索クエリ: {query}', f'生成日時: {timestamp}', total_text, '言語: 日本語']
+    return values + [''] * (len(search_csv_columns(language)) - len(values))
+
+
+def iter_rows(items, columns):
+    """研究者dictを列定義に沿った値のリストとして順に返す"""
+    for item in items:
+        yield [item.get(key, default) for _, key, default in columns]
+
+
+def rows_to_csv(header, rows):
+    """行をCSVのバイト列（Excelで開けるようBOM付きUTF-8）に変換"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8-sig')
+
+
+@st.cache_resource(show_spinner=False)
+def get_export_cache():
+    """プロセス共通のCSVキャッシュ"""
+    return TTLCache(EXPORT_CACHE_TTL, EXPORT_CACHE_MAX_BYTES)
+
+
+def cached_export(key_parts, build):
+    """key_parts に対応するエクスポート済みバイト列を返す（無ければ build() で生成して保持）"""
+    cache = get_export_cache()
+    key = make_key(key_parts)
+    data = cache.get(key)
+    if data is None:
+        data = build()
+        cache.set(key, data, len(data))
+    return data
+
+
+def search_results_csv(results, query, language='ja', content_key=None):
+    """研究者検索ページのCSV（メタデータ行 + 検索結果）
+
+    content_key: 結果セットの内容を表すキー（省略時は内容から計算）
+    """
+    if not results:
+        return None
+    columns = search_csv_columns(language)
+
+    def build():
+        rows = [search_metadata_row(query, len(results), language)]
+        rows.extend(iter_rows(results, columns))
+        return rows_to_csv([name for name, _, _ in columns], rows)
+
+    return cached_export(
+        {"kind": "search", "content": content_key or make_key(results), "query": query, "language": language},
+        build,
+    )
+
+
+def chat_researchers_csv(researchers, content_key=None):
+    """チャットページのおすすめ研究者CSV（通し番号付き）"""
+    if not researchers:
+        return None
+
+    def build():
+        rows = ([i] + row for i, row in enumerate(iter_rows(researchers, CHAT_COLUMNS), 1))
+        return rows_to_csv(["No."] + [name for name, _, _ in CHAT_COLUMNS], rows)
+
+    return cached_export({"kind": "chat", "content": content_key or make_key(researchers)}, build)
@@ -0,0 +1,201 @@
+"""バックエンドの死活監視とサーキットブレーカー
+
+HealthMonitor はバックグラウンドで /api/health を定期的に呼び出し、状態と応答時間を
+記録する。ページ（ホームの状態表示・接続テスト）はリクエストを送らずにこの記録を読む。
+CircuitBreaker は監視結果と実際のリクエストの成否から、バックエンドが停止していると
+判断した間はリクエストを送らずにすぐ失敗させる（タイムアウトまで待たせない）。
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+from kenq.admission import AdmissionTimeout
+
+# 監視間隔（KENQ_HEALTH_INTERVAL で変更）。異常時は短い間隔で確認する
+HEALTH_POLL_INTERVAL = float(os.environ.get("KENQ_HEALTH_INTERVAL", "30"))
+HEALTH_POLL_INTERVAL_UNHEALTHY = 5
+HEALTH_SLOW_MS = 2000  # これを超える応答時間は「遅延」
+HEALTH_HISTORY = 20  # 平均応答時間の計算に使う直近の回数
+
+BREAKER_FAILURE_THRESHOLD = 3  # 連続でこの回数失敗したら遮断
+BREAKER_RESET_TIMEOUT = 30  # 秒（遮断中もこの間隔で1回だけ試す）
+
+# HealthMonitor.status
+HEALTHY = "healthy"
+DEGRADED = "degraded"
+DOWN = "down"
+UNKNOWN = "unknown"
+
+
+class BackendUnavailable(requests.exceptions.ConnectionError):
+    """サーキットブレーカーが遮断中のため、リクエストを送らずに失敗した"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Backend is unavailable; retrying in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """連続した失敗で遮断し、一定時間ごとに1回だけ試行を通す（成功すれば復旧）"""
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0  # 連続した失敗の回数
+        self.opened_at = None  # 遮断（または直近の試行）の時刻。None は通常状態
+        self.opens = 0  # 遮断した回数
+        self.rejected = 0  # 遮断中に送らずに失敗させた回数
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.retry_after() == 0 else "open"
+
+    def retry_after(self):
+        """次の試行までの秒数（通常状態・試行可能なら0）"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self):
+        """リクエストを送ってよいか（遮断中でも reset_timeout ごとに1回は試行として通す）"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.reset_timeout:
+                self.opened_at = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None:
+                # 試行が失敗した場合は遮断を延長する
+                self.opened_at = time.monotonic()
+            elif self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.opens += 1
+
+    @contextmanager
+    def guard(self):
+        """囲んだ処理の成否を記録する（遮断中は BackendUnavailable）
+
+        接続エラー・タイムアウト・5xx を失敗として数える。順番待ちのタイムアウトや
+        4xx はバックエンドの停止ではないため数えない。ストリーミングの受信を途中でやめた
+        場合（GeneratorExit）は成否が分からないため、どちらとしても記録しない。
+        """
+        if not self.allow():
+            raise BackendUnavailable(self.retry_after())
+        try:
+            yield
+        except (AdmissionTimeout, GeneratorExit):
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.record_failure()
+            raise
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code >= 500:
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        else:
+            self.record_success()
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+        }
+
+
+class HealthMonitor:
+    """/api/health を定期的に呼び出し、直近の状態を保持するバックグラウンドスレッド"""
+
+    def __init__(self, check, breaker, interval=HEALTH_POLL_INTERVAL):
+        self.check = check  # 呼び出すと /api/health の response を返す関数
+        self.breaker = breaker
+        self.interval = interval
+        self.status = UNKNOWN
+        self.latency_ms = None
+        self.checked_at = None  # time.time()
+        self.error = None
+        self.details = {}
+        self.latencies = deque(maxlen=HEALTH_HISTORY)
+        self.checks = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="kenq-health", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval if self.status == HEALTHY else HEALTH_POLL_INTERVAL_UNHEALTHY)
+
+    def poll(self):
+        """1回確認して状態を更新（最初の確認は接続プールの事前接続も兼ねる）"""
+        started = time.monotonic()
+        status, details, error = DOWN, {}, None
+        try:
+            with self.check() as response:
+                latency_ms = (time.monotonic() - started) * 1000
+                if response.status_code == 200:
+                    status = DEGRADED if latency_ms > HEALTH_SLOW_MS else HEALTHY
+                    details = response.json()
+                else:
+                    error = f"HTTP {response.status_code}"
+                    status = DOWN if response.status_code >= 500 else DEGRADED
+        except (requests.exceptions.RequestException, ValueError) as e:
+            latency_ms = None
+            error = str(e)
+
+        self.checks += 1
+        if status == DOWN:
+            self.failures += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if latency_ms is not None:
+            self.latencies.append(latency_ms)
+        self.status, self.latency_ms, self.details, self.error = status, latency_ms, details, error
+        self.checked_at = time.time()
+
+    def snapshot(self):
+        """ページ表示用の直近の状態"""
+        return {
+            "status": self.status,
+            "latency_ms": self.latency_ms,
+            "avg_latency_ms": sum(self.latencies) / len(self.latencies) if self.latencies else None,
+            "checked_at": self.checked_at,
+            "age_seconds": time.time() - self.checked_at if self.checked_at else None,
+            "error": self.error,
+            "details": self.details,
+            "checks": self.checks,
+            "failures": self.failures,
+            "breaker": self.breaker.stats(),
+        }
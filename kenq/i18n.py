@@ -0,0 +1,728 @@
+"""画面表示文言のカタログ（日本語・英語、全ページ共通）
+
+文言はプロセスごとに一度だけ読み込み、(画面, 言語) ごとのフラットな辞書に展開する。
+各ページは get_translator() で現在の言語に固定した参照関数を受け取り、get_text として使う。
+欠落・書式の不一致は `python -m kenq.i18n` で確認できる。
+"""
+import logging
+import string
+import threading
+
+logger = logging.getLogger(__name__)
+
+LANGUAGES = ("ja", "en")
+DEFAULT_LANGUAGE = "ja"
+
+# 各ページが st.session_state.language に保存する値 → 言語コード
+LANGUAGE_ALIASES = {"ja": "ja", "日本語": "ja", "en": "en", "English": "en"}
+
+CATALOG = {
+    # トップページ（main_app.py）
+    "home": {
+        'ja': {
+            'page_title': '研Q - 海外研究者マッチング',
+            'navigation': '### ナビゲーション',
+            'nav_access': '**主要機能にアクセス:**',
+            'search_help': 'キーワードベースの高精度研究者検索',
+            'chat_help': 'AI対話型研究者マッチング',
+            'about_title': '## 🎓 研Q について',
+            'about_lines': (
+                '海外研究者マッチングプラットフォーム\n'
+                '- **対象**: Harvard University関連研究者\n'
+                '- **データソース**: 論文データベース + 研究者情報\n'
+                '- **AI技術**: Azure OpenAI + Azure AI Search'
+            ),
+            'features_title': '## 🌟 主要機能',
+            'features_lines': (
+                '✅ **高精度ベクトル検索**\n'
+                '✅ **AI推薦理由生成**\n'
+                '✅ **多言語対応**\n'
+                '✅ **CSVエクスポート**\n'
+                '✅ **対話型エージェント**\n'
+                '✅ **リアルタイム検索**'
+            ),
+            'data_title': '## 📊 検索対象データ',
+            'data_lines': (
+                '- **研究者数**: 数千名以上\n'
+                '- **論文データ**: 最新の研究成果\n'
+                '- **所属機関**: Harvard関連組織\n'
+                '- **更新頻度**: 定期的に更新'
+            ),
+            'support_title': '## 🔗 サポート',
+            'support_lines': '技術的な質問やフィードバックは\nシステム管理者までお問い合わせください。',
+            'header_title': '🎓 研Q - 海外研究者マッチングプラットフォーム',
+            'header_subtitle': 'Harvard Edition - 企業の研究ニーズに最適な海外研究者を見つける',
+            'available_features': '## 🌟 利用可能な機能',
+            'search_card': """
+        <h3>🔍 研究者検索</h3>
+        <p>キーワードベースの高精度検索で、Harvard大学関連の研究者を効率的に発見できます。</p>
+        <ul>
+            <li>ベクトル検索による意味的マッチング</li>
+            <li>詳細フィルタリング機能</li>
+            <li>研究実績メトリクス表示</li>
+            <li>おすすめ理由の自動生成</li>
+            <li>CSVエクスポート機能</li>
+            <li>多言語対応（日本語・英語）</li>
+        </ul>
+        <p><strong>👈 左サイドバーから「🔍 Researcher Search」を選択してください</strong></p>
+    """,
+            'chat_card': """
+        <h3>🤖 対話型エージェント</h3>
+        <p>AIエージェントとの対話を通じて、最適な研究者を発見できる新機能です。</p>
+        <ul>
+            <li>自然言語での要求定義</li>
+            <li>コンテキスト理解による提案</li>
+            <li>段階的な情報収集</li>
+            <li>パーソナライズされた推薦</li>
+            <li>リアルタイム対話</li>
+            <li>多言語対応（日本語・英語）</li>
+        </ul>
+        <p><strong>👈 左サイドバーから「🤖 Chat Agent」を選択してください</strong></p>
+    """,
+            'system_info': '## 📊 システム情報',
+            'status_system': '🚀 システム状態',
+            'status_running': '運用中',
+            'status_degraded': '応答遅延',
+            'status_down': '停止中',
+            'status_unknown': '確認中',
+            'status_breaker_open': '一時停止中',
+            'status_latency': '（{latency:.0f}ms）',
+            'status_checked': '🩺 システム状態は{seconds:.0f}秒前に確認しました',
+            'status_search_engine': '🔍 検索エンジン',
+            'status_ai_engine': '🤖 AI エンジン',
+            'status_languages': '🌍 言語対応',
+            'version_info': """
+    <h4>📋 最新バージョン情報</h4>
+    <ul>
+        <li><strong>Version 4.4.0</strong> - 多言語対応 & CSVダウンロード機能</li>
+        <li><strong>新機能:</strong> 日本語・英語の切り替え対応</li>
+        <li><strong>改善:</strong> 研究者数選択機能（1-10名）</li>
+        <li><strong>改善:</strong> 詳細な推薦理由表示（400ワード程度）</li>
+        <li><strong>新機能:</strong> 動的プレースホルダー対応</li>
+        <li><strong>新機能:</strong> 完全なCSVエクスポート機能</li>
+    </ul>
+""",
+            'usage_title': '## 🎯 利用手順',
+            'usage_search': """
+    **🔍 研究者を検索する**
+    1. 左サイドバーから「Researcher Search」を選択
+    2. 研究トピックまたはキーワードを入力
+    3. 必要に応じてフィルターを設定
+    4. 検索実行して結果を確認
+    5. CSVでデータをダウンロード
+    """,
+            'usage_chat': """
+    **🤖 AIエージェントと対話する**
+    1. 左サイドバーから「Chat Agent」を選択
+    2. 自然言語で研究ニーズを入力
+    3. AIとの対話で要件を明確化
+    4. 最適な研究者の提案を受け取る
+    5. 詳細な推薦理由を確認
+    """,
+            'usage_customize': """
+    **⚙️ 機能をカスタマイズする**
+    1. 言語を選択（日本語・English）
+    2. 表示する研究者数を調整
+    3. 詳細フィルターを活用
+    4. 結果をCSVでエクスポート
+    5. 推薦理由の詳細を確認
+    """
+        },
+        'en': {
+            'page_title': 'KenQ - Overseas Researcher Matching',
+            'navigation': '### Navigation',
+            'nav_access': '**Go to a feature:**',
+            'search_help': 'High-precision keyword-based researcher search',
+            'chat_help': 'Conversational AI researcher matching',
+            'about_title': '## 🎓 About KenQ',
+            'about_lines': (
+                'Overseas researcher matching platform\n'
+                '- **Scope**: Harvard University researchers\n'
+                '- **Data sources**: Publication database + researcher profiles\n'
+                '- **AI**: Azure OpenAI + Azure AI Search'
+            ),
+            'features_title': '## 🌟 Key Features',
+            'features_lines': (
+                '✅ **High-precision vector search**\n'
+                '✅ **AI-generated recommendation reasons**\n'
+                '✅ **Multilingual support**\n'
+                '✅ **CSV export**\n'
+                '✅ **Conversational agent**\n'
+                '✅ **Real-time search**'
+            ),
+            'data_title': '## 📊 Searchable Data',
+            'data_lines': (
+                '- **Researchers**: several thousand\n'
+                '- **Publications**: latest research output\n'
+                '- **Institutions**: Harvard-affiliated organizations\n'
+                '- **Updates**: refreshed regularly'
+            ),
+            'support_title': '## 🔗 Support',
+            'support_lines': 'For technical questions or feedback,\nplease contact the system administrator.',
+            'header_title': '🎓 KenQ - Overseas Researcher Matching Platform',
+            'header_subtitle': 'Harvard Edition - Find the best overseas researchers for your corporate research needs',
+            'available_features': '## 🌟 Available Features',
+            'search_card': """
+        <h3>🔍 Researcher Search</h3>
+        <p>Efficiently discover Harvard-affiliated researchers with high-precision keyword search.</p>
+        <ul>
+            <li>Semantic matching with vector search</li>
+            <li>Advanced filters</li>
+            <li>Research metrics</li>
+            <li>Automatically generated recommendation reasons</li>
+            <li>CSV export</li>
+            <li>Japanese and English</li>
+        </ul>
+        <p><strong>👈 Select "🔍 Researcher Search" in the left sidebar</strong></p>
+    """,
+            'chat_card': """
+        <h3>🤖 Chat Agent</h3>
+        <p>Find the right researchers through a conversation with an AI agent.</p>
+        <ul>
+            <li>Describe your needs in natural language</li>
+            <li>Context-aware suggestions</li>
+            <li>Step-by-step requirement gathering</li>
+            <li>Personalized recommendations</li>
+            <li>Real-time conversation</li>
+            <li>Japanese and English</li>
+        </ul>
+        <p><strong>👈 Select "🤖 Chat Agent" in the left sidebar</strong></p>
+    """,
+            'system_info': '## 📊 System Information',
+            'status_system': '🚀 System Status',
+            'status_running': 'Operational',
+            'status_degraded': 'Slow',
+            'status_down': 'Down',
+            'status_unknown': 'Checking',
+            'status_breaker_open': 'Paused',
+            'status_latency': ' ({latency:.0f} ms)',
+            'status_checked': '🩺 System status checked {seconds:.0f}s ago',
+            'status_search_engine': '🔍 Search Engine',
+            'status_ai_engine': '🤖 AI Engine',
+            'status_languages': '🌍 Languages',
+            'version_info': """
+    <h4>📋 Latest Release</h4>
+    <ul>
+        <li><strong>Version 4.4.0</strong> - Multilingual support & CSV download</li>
+        <li><strong>New:</strong> Switch between Japanese and English</li>
+        <li><strong>Improved:</strong> Choose the number of researchers (1-10)</li>
+        <li><strong>Improved:</strong> Detailed recommendation reasons (about 400 words)</li>
+        <li><strong>New:</strong> Context-aware input placeholders</li>
+        <li><strong>New:</strong> Full CSV export</li>
+    </ul>
+""",
+            'usage_title': '## 🎯 How to Use',
+            'usage_search': """
+    **🔍 Search for researchers**
+    1. Select "Researcher Search" in the left sidebar
+    2. Enter a research topic or keywords
+    3. Set filters if needed
+    4. Run the search and review the results
+    5. Download the data as CSV
+    """,
+            'usage_chat': """
+    **🤖 Talk with the AI agent**
+    1. Select "Chat Agent" in the left sidebar
+    2. Describe your research needs in natural language
+    3. Clarify requirements through the conversation
+    4. Receive researcher recommendations
+    5. Review the detailed reasons
+    """,
+            'usage_customize': """
+    **⚙️ Customize**
+    1. Choose a language (日本語・English)
+    2. Adjust the number of researchers shown
+    3. Use the advanced filters
+    4. Export results as CSV
+    5. Review the recommendation details
+    """
+        }
+    },
+    # 研究者検索ページ
+    "search": {
+        'ja': {
+            'title': '海外研究者マッチング - Harvard Edition',
+            'select_country': 'Select Country / 国を選んでください',
+            'select_institution': 'Select Institution / 所属を選んでください',
+            'research_topic': 'Research Topic / 研究トピックを入力',
+            'detailed_filter': '🔍 詳細フィルター（オプション）',
+            'min_papers': 'Number of publications / 最小論文数',
+            'min_citations': 'Number of citations / 最小被引用数',
+            'min_h_index': 'h-index / 最小h指数',
+            'research_fields': '研究分野',
+            'num_results': 'Results per page / 1ページの表示件数',
+            'search_button': 'Search',
+            'enter_topic': '研究トピックを入力してください。',
+            'searching': '検索中...',
+            'queue_position': '⏳ 順番待ち中です（{position}番目）。順番が来ると検索を開始します...',
+            'search_results': '🔎検索結果（{count}件 / 全{total}件中）を表示します。',
+            'page_number': 'ページ',
+            'page_prev': '◀ 前へ',
+            'page_next': '次へ ▶',
+            'page_info': '{start}〜{end}件目を表示（{page} / {pages}ページ）',
+            'search_stats': '📊 検索結果統計',
+            'avg_papers': '平均論文数',
+            'avg_citations': '平均被引用数',
+            'avg_h_index': '平均h指数',
+            'stats_metric': '指標',
+            'stats_scope_all': '全件',
+            'stats_scope_filtered': '絞り込み後',
+            'stat_mean': '平均',
+            'stat_p25': '25%点',
+            'stat_median': '中央値',
+            'stat_p75': '75%点',
+            'stat_p90': '90%点',
+            'papers_unit': '件',
+            'citations_unit': '回',
+            'researcher_name': '👨‍🔬 {name}',
+            'institution': 'Institution',
+            'research_field': 'Research Field',
+            'orcid': 'ORCID',
+            'research_metrics': '📈 Research Metrics',
+            'num_publications': 'Number of publications / 論文数',
+            'num_citations': 'Number of citations / 被引用数',
+            'h_index': 'h-index / h指数',
+            'db_records': 'DBデータ',
+            'view_reasons': '💡 おすすめする理由を見る',
+            'no_reasons': '理由は見つかりませんでした。',
+            'reasons_loading': 'おすすめ理由を生成中です...',
+            'reasons_not_loaded': 'おすすめ理由はまだ読み込まれていません。下の「おすすめ理由を読み込む」を押してください。',
+            'load_reasons': '💡 このページのおすすめ理由を読み込む',
+            'load_more': '⬇️ さらに{count}件読み込む',
+            'loading_more': '続きの研究者を取得中...',
+            'more_available': '続きの検索結果があります。最後のページの「さらに読み込む」で取得できます。',
+            'loading_reasons': 'おすすめ理由を取得中...',
+            'streaming_progress': '検索中... {count}名の研究者を受信しました',
+            'no_filter_results': 'フィルター条件に一致する研究者は見つかりませんでした。条件を緩めてください。',
+            'apply_filters': 'フィルターを適用',
+            'filter_before': 'フィルター適用前は{count}件の結果がありました。',
+            'no_results': '該当する研究者は見つかりませんでした。',
+            'timeout_error': '⏰ 検索がタイムアウトしました。しばらく待ってから再度お試しください。',
+            'debug_info': '🐛 デバッグ情報',
+            'backend_unavailable': '🔌 APIサーバーが応答していないため、検索を一時停止しています（約{seconds:.0f}秒後に再試行します）。',
+            'api_error': '❌ APIリクエストに失敗しました: {error}',
+            'localhost_info': '💡 ローカルサーバーが起動しているか確認してください。',
+            'unexpected_error': '❌ 予期しないエラーが発生しました: {error}',
+            'system_info': '## 📊 システム情報',
+            'database': '**データベース**: Harvardデータ',
+            'index': '**インデックス**: harvard-index-v6',
+            'search_engine': '**検索エンジン**: Azure AI Search',
+            'ai': '**AI**: Azure OpenAI',
+            'search_tips': '## 🔍 検索のコツ',
+            'search_tip1': '- 英語・日本語どちらでも検索可能',
+            'search_tip2': '- 具体的なキーワードを使用',
+            'search_tip3': '- 詳細フィルターで絞り込み可能',
+            'metrics_info': '## 📈 表示される指標',
+            'metrics_info1': '- **論文数**: 研究者の総論文数',
+            'metrics_info2': '- **被引用数**: 論文の被引用回数',
+            'metrics_info3': '- **h指数**: 研究影響力の指標',
+            'performance': '## ⚡ パフォーマンス改善',
+            'performance1': '- 多層キャッシュシステム導入',
+            'performance2': '- バッチ処理で高速化',
+            'performance3': '- タイムアウト時間最適化',
+            'performance4': '- AI理由生成の簡潔化',
+            'cache_stats': '- **検索キャッシュ**: ヒット {hits}回 / ミス {misses}回（{entries}件保持）',
+            'flight_stats': '- **同時検索の集約**: 実行 {executed}回 / 共有 {shared}回（問い合わせを{shared}回削減）',
+            'store_stats': '- **研究者データ（このセッション）**: {researchers}名 / 参照{references}件（約{kb:.0f}KB）',
+            'profile_cache_stats': '- **プロフィールキャッシュ（全体）**: {entries}名 / ヒット {hits}回 / ミス {misses}回',
+            'download_csv': '📥 CSVダウンロード',
+            'download_button': 'Download CSV',
+            'download_filename': 'harvard_researchers_{timestamp}.csv',
+            'download_success': '✅ CSVファイルをダウンロードしました',
+            'download_error': '❌ CSVダウンロードに失敗しました: {error}',
+            'no_data_download': '⚠️ ダウンロードするデータがありません。まず検索を実行してください。',
+            'bulk_export': '📦 一括エクスポート（表示中の結果以外も含む全件）',
+            'bulk_export_format': 'ファイル形式',
+            'bulk_export_max': '最大件数',
+            'bulk_export_button': 'エクスポートを作成',
+            'bulk_export_progress': '📦 {count}件を書き出しました...',
+            'bulk_export_done': '✅ {count}件をエクスポートしました',
+            'bulk_export_too_large': '⚠️ 出力が上限（{mb:.0f}MB）を超えたため中止しました。最大件数を減らしてお試しください。',
+            'bulk_export_filename': 'harvard_researchers_all_{timestamp}.{extension}'
+        },
+        'en': {
+            'title': 'International Researcher Matching - Harvard Edition',
+            'select_country': 'Select Country',
+            'select_institution': 'Select Institution',
+            'research_topic': 'Research Topic',
+            'detailed_filter': '🔍 Advanced Filters (Optional)',
+            'min_papers': 'Minimum publications',
+            'min_citations': 'Minimum citations',
+            'min_h_index': 'Minimum h-index',
+            'research_fields': 'Research Fields',
+            'num_results': 'Results per page',
+            'search_button': 'Search',
+            'enter_topic': 'Please enter a research topic.',
+            'searching': 'Searching...',
+            'queue_position': '⏳ Waiting in line (position {position}). Your search will start shortly...',
+            'search_results': '🔎Search Results ({count} of {total} total)',
+            'page_number': 'Page',
+            'page_prev': '◀ Prev',
+            'page_next': 'Next ▶',
+            'page_info': 'Showing {start}-{end} (page {page} of {pages})',
+            'search_stats': '📊 Search Statistics',
+            'avg_papers': 'Avg Publications',
+            'avg_citations': 'Avg Citations',
+            'avg_h_index': 'Avg h-index',
+            'stats_metric': 'Metric',
+            'stats_scope_all': 'All',
+            'stats_scope_filtered': 'Filtered',
+            'stat_mean': 'Mean',
+            'stat_p25': 'P25',
+            'stat_median': 'Median',
+            'stat_p75': 'P75',
+            'stat_p90': 'P90',
+            'papers_unit': 'papers',
+            'citations_unit': 'times',
+            'researcher_name': '👨‍🔬 {name}',
+            'institution': 'Institution',
+            'research_field': 'Research Field',
+            'orcid': 'ORCID',
+            'research_metrics': '📈 Research Metrics',
+            'num_publications': 'Publications',
+            'num_citations': 'Citations',
+            'h_index': 'h-index',
+            'db_records': 'DB Records',
+            'view_reasons': '💡 Why We Recommend This Researcher',
+            'no_reasons': 'No reasons found.',
+            'reasons_loading': 'Generating recommendation reasons...',
+            'reasons_not_loaded': 'Recommendation reasons are not loaded yet. Press "Load reasons" below.',
+            'load_reasons': '💡 Load reasons for this page',
+            'load_more': '⬇️ Load {count} more',
+            'loading_more': 'Loading more researchers...',
+            'more_available': 'More results are available. Use "Load more" on the last page to fetch them.',
+            'loading_reasons': 'Fetching recommendation reasons...',
+            'streaming_progress': 'Searching... received {count} researchers',
+            'no_filter_results': 'No researchers match the filter criteria. Please relax the conditions.',
+            'apply_filters': 'Apply Filters',
+            'filter_before': 'There were {count} results before applying filters.',
+            'no_results': 'No matching researchers found.',
+            'timeout_error': '⏰ Search timed out. Please wait and try again.',
+            'debug_info': '🐛 Debug Information',
+            'backend_unavailable': '🔌 The API server is not responding, so searches are paused (retrying in about {seconds:.0f}s).',
+            'api_error': '❌ API request failed: {error}',
+            'localhost_info': '💡 Please check if the local server is running.',
+            'unexpected_error': '❌ An unexpected error occurred: {error}',
+            'system_info': '## 📊 System Information',
+            'database': '**Database**: Harvard Data',
+            'index': '**Index**: harvard-index-v6',
+            'search_engine': '**Search Engine**: Azure AI Search',
+            'ai': '**AI**: Azure OpenAI',
+            'search_tips': '## 🔍 Search Tips',
+            'search_tip1': '- Search in English or Japanese',
+            'search_tip2': '- Use specific keywords',
+            'search_tip3': '- Use advanced filters to narrow results',
+            'metrics_info': '## 📈 Displayed Metrics',
+            'metrics_info1': '- **Publications**: Total number of papers',
+            'metrics_info2': '- **Citations**: Citation count',
+            'metrics_info3': '- **h-index**: Research impact indicator',
+            'performance': '## ⚡ Performance Improvements',
+            'performance1': '- Multi-layer caching system',
+            'performance2': '- Batch processing optimization',
+            'performance3': '- Optimized timeout settings',
+            'performance4': '- Streamlined AI reasoning',
+            'cache_stats': '- **Search cache**: {hits} hits / {misses} misses ({entries} entries)',
+            'flight_stats': '- **Concurrent search coalescing**: {executed} executed / {shared} shared ({shared} backend calls saved)',
+            'store_stats': '- **Researcher data (this session)**: {researchers} researchers / {references} references (~{kb:.0f} KB)',
+            'profile_cache_stats': '- **Profile cache (shared)**: {entries} researchers / {hits} hits / {misses} misses',
+            'download_csv': '📥 CSV Download',
+            'download_button': 'Download CSV',
+            'download_filename': 'harvard_researchers_{timestamp}.csv',
+            'download_success': '✅ CSV file downloaded successfully',
+            'download_error': '❌ CSV download failed: {error}',
+            'no_data_download': '⚠️ No data to download. Please run a search first.',
+            'bulk_export': '📦 Bulk Export (all matches, not only the displayed results)',
+            'bulk_export_format': 'File format',
+            'bulk_export_max': 'Maximum results',
+            'bulk_export_button': 'Create export',
+            'bulk_export_progress': '📦 Exported {count} researchers...',
+            'bulk_export_done': '✅ Exported {count} researchers',
+            'bulk_export_too_large': '⚠️ The export exceeded the {mb:.0f} MB limit and was stopped. Please lower the maximum results.',
+            'bulk_export_filename': 'harvard_researchers_all_{timestamp}.{extension}'
+        }
+    },
+    # 対話型エージェントページ
+    "chat": {
+        "ja": {
+            "title": "🤖 研Q対話型エージェント",
+            "description": "**企業の研究ニーズに最適な海外研究者を見つけるAIエージェントです。**  \nチャット形式で質問にお答えしながら、候補研究者をご提案いたします。",
+            "chat_history": "💬 会話履歴",
+            "recommended_researchers": "🎯 おすすめ研究者",
+            "input_placeholder": "メッセージを入力してください:",
+            "send_button": "送信",
+            "test_connection": "接続テスト",
+            "connection_success": "✅ APIサーバーとの接続に成功しました！",
+            "connection_failed": "❌ 接続テストに失敗しました:",
+            "connection_checking": "🩺 接続状態を確認しています。しばらくしてから再度お試しください。",
+            "connection_checked": "{seconds:.0f}秒前に確認（応答時間 {latency:.0f}ms、遮断状態: {breaker}）",
+            "researcher_count": "表示する研究者数:",
+            "current_setting": "現在の設定:",
+            "researchers_display": "名の研究者を表示",
+            "csv_download": "📥 CSVダウンロード",
+            "download_csv": "Download CSV",
+            "system_info": "🔧 システム情報",
+            "display_settings": "⚙️ 表示設定",
+            "context_info": "📋 現在の会話コンテキスト",
+            "reset_chat": "🔄 会話をリセット",
+            "placeholder_function": "💡 プレースホルダー機能",
+            "usage_tips": "💡 使い方のヒント",
+            "debug_info": "🐛 デバッグ情報",
+            "institution": "所属:",
+            "research_field": "研究分野:",
+            "orcid": "ORCID:",
+            "papers": "論文数",
+            "citations": "被引用数",
+            "h_index": "h指数",
+            "reason_title": "🎯 おすすめする理由",
+            "reason_generating": "おすすめ理由は現在生成中です。しばらくお待ちください。",
+            "waiting_response": "応答を待っています...（{seconds:.0f}秒経過）",
+            "queue_position": "⏳ 順番待ち中です（{position}番目）。順番が来ると応答の生成を開始します...",
+            "cancel_request": "⏹️ キャンセル",
+            "request_cancelled": "リクエストをキャンセルしました",
+            "show_earlier": "⬆️ 以前のメッセージを表示（あと{count}件）",
+            "store_stats": "- **研究者データ（このセッション）**: {researchers}名 / 参照{references}件（約{kb:.0f}KB）",
+            "profile_cache_stats": "- **プロフィールキャッシュ（全体）**: {entries}名 / ヒット {hits}回 / ミス {misses}回",
+            "earlier_expired": "保存期間を過ぎた古いメッセージ{count}件は表示できません",
+            "initial_message": "こんにちは！研Q対話型エージェントです。🎓\n\n企業様の研究ニーズに最適な海外研究者をお探しいたします。以下についてお聞かせください：\n\n• どのような研究分野に興味がありますか？\n• 具体的な技術課題はありますか？\n• 協業の目的（共同研究、技術移転、コンサルティングなど）\n• 予算規模や期間のご希望\n\n何でもお気軽にご質問ください！",
+            "placeholder_first": "例：機械学習を使った医療診断の研究者を探しています",
+            "placeholder_research_field": "例：人工知能、バイオテクノロジー、材料科学など",
+            "placeholder_technical_challenge": "例：画像認識の精度向上、新材料の開発、診断アルゴリズムの改善など",
+            "placeholder_budget": "例：年間500万円、プロジェクト全体で2000万円など",
+            "placeholder_timeline": "例：2年間、2025年まで、来年度中にはなど",
+            "placeholder_collaboration": "例：共同研究、技術移転、コンサルティング、ライセンス契約など",
+            "placeholder_application": "例：医療診断、自動運転、創薬、製造業での品質管理など",
+            "placeholder_technology": "例：深層学習を用いた画像解析、自然言語処理による文書分析など",
+            "placeholder_medical": "例：CT画像診断、病理画像解析、遺伝子解析など",
+            "placeholder_details": "例：具体的な技術要件、想定する精度、対象となるデータサイズなど",
+            "placeholder_search": "例：はい、お願いします / もう少し条件を絞りたいです",
+            "placeholder_researchers": "例：詳細を教えてください / 他の候補も見たいです / 連絡方法を教えてください",
+            "placeholder_default": "続きをお聞かせください"
+        },
+        "en": {
+            "title": "🤖 KenQ Chat Agent",
+            "description": "**AI agent to find the best overseas researchers for your corporate research needs.**  \nWe will suggest candidate researchers while answering your questions in a chat format.",
+            "chat_history": "💬 Chat History",
+            "recommended_researchers": "🎯 Recommended Researchers",
+            "input_placeholder": "Enter your message:",
+            "send_button": "Send",
+            "test_connection": "Test Connection",
+            "connection_success": "✅ Successfully connected to API server!",
+            "connection_failed": "❌ Connection test failed:",
+            "connection_checking": "🩺 Checking the connection. Please try again in a moment.",
+            "connection_checked": "Checked {seconds:.0f}s ago (response time {latency:.0f} ms, circuit: {breaker})",
+            "researcher_count": "Number of researchers to display:",
+            "current_setting": "Current setting:",
+            "researchers_display": " researchers to display",
+            "csv_download": "📥 CSV Download",
+            "download_csv": "Download CSV",
+            "system_info": "🔧 System Information",
+            "display_settings": "⚙️ Display Settings",
+            "context_info": "📋 Current Context",
+            "reset_chat": "🔄 Reset Chat",
+            "placeholder_function": "💡 Placeholder Function",
+            "usage_tips": "💡 Usage Tips",
+            "debug_info": "🐛 Debug Information",
+            "institution": "Institution:",
+            "research_field": "Research Field:",
+            "orcid": "ORCID:",
+            "papers": "Papers",
+            "citations": "Citations",
+            "h_index": "h-index",
+            "reason_title": "🎯 Reasons for Recommendation",
+            "reason_generating": "Recommendation reasons are currently being generated. Please wait.",
+            "waiting_response": "Waiting for response... ({seconds:.0f}s elapsed)",
+            "queue_position": "⏳ Waiting in line (position {position}). Your reply will start shortly...",
+            "cancel_request": "⏹️ Cancel",
+            "request_cancelled": "Request cancelled",
+            "show_earlier": "⬆️ Show earlier messages ({count} more)",
+            "store_stats": "- **Researcher data (this session)**: {researchers} researchers / {references} references (~{kb:.0f} KB)",
+            "profile_cache_stats": "- **Profile cache (shared)**: {entries} researchers / {hits} hits / {misses} misses",
+            "earlier_expired": "{count} older messages have expired and can no longer be shown",
+            "initial_message": "Hello! Welcome to KenQ Chat Agent. 🎓\n\nWe help you find the best overseas researchers for your corporate research needs. Please tell us about:\n\n• What research fields are you interested in?\n• What specific technical challenges do you have?\n• Collaboration objectives (joint research, technology transfer, consulting, etc.)\n• Budget and timeline preferences\n\nFeel free to ask any questions!",
+            "placeholder_first": "Example: Looking for researchers in machine learning for medical diagnosis",
+            "placeholder_research_field": "Example: artificial intelligence, biotechnology, materials science, etc.",
+            "placeholder_technical_challenge": "Example: improving image recognition accuracy, developing new materials, etc.",
+            "placeholder_budget": "Example: $500K annually, $2M for the entire project, etc.",
+            "placeholder_timeline": "Example: 2 years, by 2025, within this fiscal year, etc.",
+            "placeholder_collaboration": "Example: joint research, technology transfer, consulting, licensing, etc.",
+            "placeholder_application": "Example: medical diagnosis, autonomous driving, drug discovery, etc.",
+            "placeholder_technology": "Example: deep learning for image analysis, NLP for document analysis, etc.",
+            "placeholder_medical": "Example: CT image diagnosis, pathology image analysis, genetic analysis, etc.",
+            "placeholder_details": "Example: specific technical requirements, expected accuracy, data size, etc.",
+            "placeholder_search": "Example: Yes, please proceed / I'd like to narrow down the criteria",
+            "placeholder_researchers": "Example: Please tell me more details / I'd like to see other candidates",
+            "placeholder_default": "Please continue..."
+        }
+    },
+
+    "debug": {
+        "ja": {
+            "profile_summary": "- **この実行**: {ms:.0f}ms / 送信した要素 {elements}件\n- **セッション状態**: {keys}キー（約{kb:.0f}KB）",
+            "profile_functions": "**⏱️ 累積時間の長い関数**",
+            "profile_session_state": "**🗂️ セッション状態のサイズ（KB、概算）**",
+            "profile_unavailable": "プロファイルを取得できませんでした（別のセッションで計測中の可能性があります）: {error}",
+            "profile_note": "KENQ_PROFILE=1 または URL の ?profile=1 で表示しています。計測中は処理が遅くなります。",
+        },
+        "en": {
+            "profile_summary": "- **This run**: {ms:.0f} ms / {elements} elements sent\n- **Session state**: {keys} keys (~{kb:.0f} KB)",
+            "profile_functions": "**⏱️ Top functions by cumulative time**",
+            "profile_session_state": "**🗂️ Session state size (KB, approximate)**",
+            "profile_unavailable": "Profiling is unavailable (another session may be profiling): {error}",
+            "profile_note": "Shown because KENQ_PROFILE=1 or ?profile=1 is set. Pages run slower while profiling.",
+        },
+    },
+
+    "metrics": {
+        "ja": {
+            "page_title": "研Q - 計測値",
+            "unavailable": "このページは現在利用できません。",
+            "title": "📈 計測値（フロントエンド）",
+            "description": "このプロセスで記録した処理時間と件数です。分位点は系列ごとに直近{window}件の実測値から計算しています。",
+            "uptime": "記録開始から {minutes:.0f} 分",
+            "refresh": "🔄 更新",
+            "latency_title": "## ⏱️ 処理時間（ミリ秒）",
+            "counters_title": "## 🔢 件数",
+            "gauges_title": "## 📊 現在値",
+            "prometheus_title": "## 🧾 Prometheus 形式",
+            "prometheus_endpoint": "`KENQ_METRICS_PORT` が設定されているため http://127.0.0.1:{port}/metrics でも取得できます。",
+            "prometheus_download": "📥 Prometheus 形式でダウンロード",
+            "no_data": "まだ記録がありません。",
+            "column_metric": "計測値",
+            "column_count": "件数",
+            "column_value": "値",
+        },
+        "en": {
+            "page_title": "KenQ - Metrics",
+            "unavailable": "This page is not available.",
+            "title": "📈 Frontend Metrics",
+            "description": "Durations and counts recorded by this process. Quantiles are computed per series from the latest {window} samples.",
+            "uptime": "Recording for {minutes:.0f} min",
+            "refresh": "🔄 Refresh",
+            "latency_title": "## ⏱️ Durations (ms)",
+            "counters_title": "## 🔢 Counters",
+            "gauges_title": "## 📊 Current Values",
+            "prometheus_title": "## 🧾 Prometheus Format",
+            "prometheus_endpoint": "`KENQ_METRICS_PORT` is set, so these are also served at http://127.0.0.1:{port}/metrics.",
+            "prometheus_download": "📥 Download in Prometheus format",
+            "no_data": "Nothing recorded yet.",
+            "column_metric": "Metric",
+            "column_count": "Count",
+            "column_value": "Value",
+        },
+    },
+}
+
+
+def normalize_language(language):
+    """ページごとの言語設定の値を言語コード（ja / en）に変換"""
+    return LANGUAGE_ALIASES.get(language, DEFAULT_LANGUAGE)
+
+
+def _field_names(template):
+    """書式文字列の置換フィールド名（置換なしなら空）"""
+    return frozenset(name for _, name, _, _ in string.Formatter().parse(template) if name is not None)
+
+
+def _compile_catalog(catalog):
+    """カタログを (画面, 言語) ごとの辞書に展開する
+
+    訳がないキーは他の言語の文言で補い、置換フィールドのある文言だけを
+    str.format として事前に登録する。欠落と置換フィールドの不一致は一覧にして返す。
+    """
+    tables = {}
+    formatters = {}
+    issues = []
+    for namespace, languages in catalog.items():
+        keys = sorted(set().union(*(languages.get(language, {}) for language in LANGUAGES)))
+        for language in LANGUAGES:
+            table = {}
+            formats = {}
+            for key in keys:
+                if key in languages.get(language, {}):
+                    text = languages[language][key]
+                else:
+                    issues.append(("untranslated", namespace, language, key))
+                    text = next(languages[other][key] for other in LANGUAGES if key in languages.get(other, {}))
+                table[key] = text
+                if _field_names(text):
+                    formats[key] = text.format
+            tables[(namespace, language)] = table
+            formatters[(namespace, language)] = formats
+        for key in keys:
+            fields = {_field_names(languages[language][key]) for language in LANGUAGES if key in languages.get(language, {})}
+            if len(fields) > 1:
+                issues.append(("placeholder_mismatch", namespace, None, key))
+    return tables, formatters, issues
+
+
+class Translator:
+    """画面と言語を固定した文言参照（各ページの get_text として使う）
+
+    get_text(key) で文言を、get_text.format(key, **kwargs) で置換済みの文言を返す。
+    """
+
+    __slots__ = ("namespace", "language", "_texts", "_formats")
+
+    def __init__(self, namespace, language, texts, formats):
+        self.namespace = namespace
+        self.language = language
+        self._texts = texts
+        self._formats = formats
+
+    def __call__(self, key):
+        try:
+            return self._texts[key]
+        except KeyError:
+            return self._missing(key)
+
+    def format(self, key, **kwargs):
+        formatter = self._formats.get(key)
+        if formatter is None:
+            return self(key)
+        return formatter(**kwargs)
+
+    def _missing(self, key):
+        """カタログにないキーはキー自体を表示し、初回のみ警告を記録"""
+        lookup = (self.namespace, self.language, key)
+        with _missing_lock:
+            first = lookup not in _missing_lookups
+            _missing_lookups.add(lookup)
+        if first:
+            logger.warning("Missing i18n key: %s/%s/%s", *lookup)
+        return key
+
+
+_TABLES, _FORMATTERS, _CATALOG_ISSUES = _compile_catalog(CATALOG)
+_TRANSLATORS = {
+    (namespace, language): Translator(namespace, language, _TABLES[(namespace, language)], _FORMATTERS[(namespace, language)])
+    for namespace, language in _TABLES
+}
+_missing_lookups = set()
+_missing_lock = threading.Lock()
+
+
+def get_translator(namespace, language):
+    """画面（home / search / chat / metrics / debug）と現在の言語設定に対応する文言参照を取得"""
+    return _TRANSLATORS[(namespace, normalize_language(language))]
+
+
+def missing_key_report():
+    """欠落キーの一覧
+
+    untranslated: 一方の言語にしかないキー（他の言語の文言で表示）
+    placeholder_mismatch: 言語間で置換フィールドが異なるキー
+    unknown: 実行中に参照されたがカタログにないキー
+    """
+    report = {"untranslated": [], "placeholder_mismatch": [], "unknown": []}
+    for kind, namespace, language, key in _CATALOG_ISSUES:
+        report[kind].append(f"{namespace}/{language}/{key}" if language else f"{namespace}/{key}")
+    with _missing_lock:
+        report["unknown"] = sorted("/".join(lookup) for lookup in _missing_lookups)
+    return report
+
+
+if __name__ == "__main__":
+    for kind, entries in missing_key_report().items():
+        print(f"{kind}: {len(entries)}")
+        for entry in entries:
+            print(f"  {entry}")
@@ -0,0 +1,108 @@
+"""対話エージェントの応答内容から、次にユーザーが答える内容（意図）を判定する
+
+動的プレースホルダー用。日本語はキーワード表を1つの正規表現（キーワードを
+トライ木の形にまとめたもの）にコンパイルしておき、応答本文を1回の走査で判定する。
+英語は短いキーワード（ai, use など）が頻繁に一致して正規表現の方が遅くなるため、
+意図の順にキーワードを部分文字列検索する（benchmarks/intent_classifier.py で確認）。
+"""
+import re
+
+# 意図（優先度の高い順）と、それを示すキーワード
+# common は日本語・英語の両方で使い、ja / en はそれぞれの言語のみで使う
+INTENT_KEYWORDS = [
+    ("research_field", {"common": ["research field"], "ja": ["研究分野", "分野", "どのような研究"], "en": ["field", "what kind of research"]}),
+    ("technical_challenge", {"common": ["challenge"], "ja": ["技術課題", "課題", "問題"], "en": ["technical challenge", "problem"]}),
+    ("budget", {"common": ["budget", "cost"], "ja": ["予算", "費用", "コスト"], "en": ["funding"]}),
+    ("timeline", {"common": ["timeline"], "ja": ["期間", "時間", "いつまで", "期限"], "en": ["period", "deadline", "when"]}),
+    ("collaboration", {"common": ["collaboration"], "ja": ["協業", "共同研究", "連携"], "en": ["partnership", "cooperation"]}),
+    ("application", {"common": ["application"], "ja": ["応用", "活用", "使用", "適用"], "en": ["use", "implementation"]}),
+    ("technology", {"common": ["ai"], "ja": ["機械学習", "人工知能"], "en": ["machine learning", "artificial intelligence"]}),
+    ("medical", {"common": [], "ja": ["医療", "診断", "医学"], "en": ["medical", "diagnosis", "healthcare"]}),
+    ("details", {"common": [], "ja": ["詳しく", "具体的", "詳細", "more detail"], "en": ["details", "specific", "more information"]}),
+    ("search", {"common": ["search"], "ja": ["検索", "探し", "お探し"], "en": ["find", "look for"]}),
+    ("researchers", {"common": [], "ja": ["研究者", "候補", "おすすめ"], "en": ["researcher", "candidate", "recommendation"]}),
+]
+
+INTENTS = [intent for intent, _ in INTENT_KEYWORDS]
+
+
+def _trie_pattern(words):
+    """キーワード群を共通の接頭辞でまとめた正規表現（1文字ごとの分岐が少なくなる）"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node):
+        branches = [re.escape(char) + emit(child) for char, child in node.items() if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return emit(trie)
+
+
+class IntentMatcher:
+    """1言語分のキーワード表をコンパイルした判定器"""
+
+    def __init__(self, language):
+        priorities = {}
+        for priority, (_, keywords) in enumerate(INTENT_KEYWORDS):
+            for keyword in keywords["common"] + keywords[language]:
+                priorities.setdefault(keyword, priority)
+        # 同じ位置から始まる短いキーワードの方が優先度が高い場合は、長い方の一致にもその優先度を使う
+        self.priorities = {
+            keyword: min(p for other, p in priorities.items() if keyword.startswith(other))
+            for keyword in priorities
+        }
+        self.pattern = re.compile(_trie_pattern(self.priorities))
+
+    def classify(self, text):
+        """最も優先度の高い意図を返す（該当なしは None）
+
+        一致した位置の次の文字から探索を再開するため、重なり合うキーワードも見落とさない。
+        """
+        text = text.lower()
+        search = self.pattern.search
+        best = None
+        match = search(text)
+        while match:
+            priority = self.priorities[match.group()]
+            if best is None or priority < best:
+                best = priority
+                if best == 0:
+                    break
+            match = search(text, match.start() + 1)
+        return None if best is None else INTENTS[best]
+
+
+class KeywordScanMatcher:
+    """1言語分のキーワード表を、意図の順に部分文字列検索する判定器"""
+
+    def __init__(self, language):
+        # 優先度の高い順に並べたキーワードと意図の組（最初に見つかったものが答え）
+        self.rules = [
+            (keyword, intent)
+            for intent, keywords in INTENT_KEYWORDS
+            for keyword in keywords["common"] + keywords[language]
+        ]
+
+    def classify(self, text):
+        """最も優先度の高い意図を返す（該当なしは None）"""
+        text = text.lower()
+        for keyword, intent in self.rules:
+            if keyword in text:
+                return intent
+        return None
+
+
+# ✅ 言語ごとに速い方の判定器を使う
+MATCHERS = {"ja": IntentMatcher("ja"), "en": KeywordScanMatcher("en")}
+
+
+def classify_intent(text, language):
+    """応答本文の意図を判定（language: ja / en）"""
+    return MATCHERS[language].classify(text)
@@ -0,0 +1,274 @@
+"""フロントエンドの計測値（カウンター・処理時間のヒストグラム）
+
+プロセス共通の REGISTRY に記録し、管理ページ（pages/3_Metrics.py）で p50/p95/p99 を表示する。
+管理ページは KENQ_METRICS_PAGE=1 の場合のみ表示する（既定は無効。本番での収集は KENQ_METRICS_PORT を使う）。
+Prometheus のテキスト形式でも出力でき、KENQ_METRICS_PORT を指定すると
+http://127.0.0.1:<port>/metrics で公開する（Streamlit とは別のローカル専用サーバー）。
+"""
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 秒単位のバケット境界（Prometheus の histogram_quantile 用）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 管理ページの分位点は系列ごとに直近この件数の実測値から計算する
+QUANTILE_WINDOW = 1024
+QUANTILES = (0.5, 0.95, 0.99)
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.environ.get("KENQ_METRICS_PORT", "0"))  # 0 は公開しない
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PAGE_ENABLED = os.environ.get("KENQ_METRICS_PAGE", "0") == "1"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """ラベルの組ごとに系列を持つ計測値の基底クラス"""
+
+    kind = None
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = registry.lock
+        self.series = {}  # ラベル値のタプル -> 系列
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _labels(self, key):
+        return dict(zip(self.labels, key))
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.series[key] = self.series.get(key, 0) + amount
+
+    def samples(self):
+        """[(ラベルのdict, 値), ...]"""
+        with self._lock:
+            return [(self._labels(key), value) for key, value in sorted(self.series.items())]
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class HistogramSeries:
+    __slots__ = ("counts", "sum", "count", "recent")
+
+    def __init__(self, bucket_count):
+        self.counts = [0] * bucket_count
+        self.sum = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=QUANTILE_WINDOW)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = HistogramSeries(len(self.buckets))
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series.counts[index] += 1
+            series.sum += value
+            series.count += 1
+            series.recent.append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        """囲んだ処理の経過時間（秒）を記録する"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self):
+        """系列ごとの件数・平均・分位点（直近 QUANTILE_WINDOW 件から計算）"""
+        rows = []
+        with self._lock:
+            items = [(key, series.count, series.sum, sorted(series.recent)) for key, series in self.series.items()]
+        for key, count, total, recent in sorted(items):
+            row = {**self._labels(key), "count": count, "mean": total / count if count else 0.0}
+            for q in QUANTILES:
+                row[f"p{round(q * 100)}"] = recent[max(0, math.ceil(q * len(recent)) - 1)] if recent else 0.0
+            rows.append(row)
+        return rows
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            for key, series in sorted(self.series.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets, series.counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(float(bound))})} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {series.count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series.sum)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series.count}")
+        return lines
+
+
+class Gauge(Metric):
+    """出力時に collect() を呼び出して現在値を取得する計測値（キャッシュ件数など）"""
+
+    kind = "gauge"
+
+    def __init__(self, registry, name, help_text, labels=(), collect=None):
+        super().__init__(registry, name, help_text, labels)
+        self.collect = collect  # [(ラベルのdict, 値), ...] を返す関数
+
+    def samples(self):
+        try:
+            return list(self.collect()) if self.collect else []
+        except Exception:  # 計測値の取得失敗でページや出力を止めない
+            return []
+
+    def render(self):
+        lines = self.header()
+        for labels, value in self.samples():
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """名前ごとに1つの計測値を保持する（同じ名前で再登録した場合は既存のものを返す）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.started_at = time.time()
+
+    def _register(self, cls, name, *args, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(self, name, *args, **kwargs)
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labels, buckets=buckets)
+
+    def gauge(self, name, help_text, labels=(), collect=None):
+        gauge = self._register(Gauge, name, help_text, labels)
+        if collect is not None:
+            gauge.collect = collect
+        return gauge
+
+    def render_prometheus(self):
+        """Prometheus のテキスト形式（version 0.0.4）"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# --- 共通の計測値 ---
+BACKEND_REQUEST_SECONDS = REGISTRY.histogram(
+    "kenq_backend_request_seconds",
+    "Backend call duration as seen from the frontend (streams: until the last event)",
+    ["endpoint", "mode"],
+)
+BACKEND_REQUESTS = REGISTRY.counter(
+    "kenq_backend_requests_total", "Backend calls by outcome", ["endpoint", "outcome"]
+)
+JSON_DECODE_SECONDS = REGISTRY.histogram(
+    "kenq_json_decode_seconds", "Time spent decoding backend JSON responses", ["endpoint"]
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "kenq_stage_seconds", "Frontend processing stages (filtering, rendering, ...)", ["page", "stage"]
+)
+RERUNS = REGISTRY.counter("kenq_page_reruns_total", "Streamlit script runs per page", ["page"])
+CHAT_REQUESTS = REGISTRY.counter("kenq_chat_requests_total", "Chat requests by final status", ["status"])
+CHAT_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "kenq_chat_first_token_seconds", "Time from sending a chat message to the first reply token"
+)
+CHAT_REPLY_SECONDS = REGISTRY.histogram(
+    "kenq_chat_reply_seconds", "Time from sending a chat message to the complete reply"
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "kenq_admission_wait_seconds", "Time spent waiting in the admission queue", ["queue"]
+)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(port=METRICS_PORT, host="127.0.0.1"):
+    """/metrics をローカルで公開するスレッドを起動（port が0なら何もしない、起動はプロセスで1回のみ）"""
+    global _server
+    if not port or _server is not None:
+        return _server
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as e:  # 同じポートを使う別プロセスがある場合など（アプリ本体は止めない）
+        logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+    threading.Thread(target=server.serve_forever, name="kenq-metrics", daemon=True).start()
+    _server = server
+    return server
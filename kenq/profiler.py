@@ -0,0 +1,187 @@
+"""再実行ごとのプロファイル（開発・本番データでの調査用、既定は無効）
+
+KENQ_PROFILE=1 または URL に ?profile=1 を付けると、ページのスクリプト1回分の実行を
+cProfile で計測し、サイドバーのデバッグ情報に次の内容を表示する。
+  - 累積時間の長い関数
+  - この実行で送信した Streamlit の要素数（差分メッセージの数）
+  - セッション状態のキーごとの概算サイズ
+  - ページから渡されたキャッシュなどの統計（利用者向けの画面には表示しない）
+フラグメントのみの再実行（ページ送り・ポーリングなど）は対象外。
+"""
+import cProfile
+import os
+import sys
+import time
+import types
+from collections import deque
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from kenq.i18n import get_translator
+
+PROFILE_ENABLED = os.environ.get("KENQ_PROFILE", "0") == "1"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_TOP_FUNCTIONS = 25
+SESSION_STATE_TOP_KEYS = 15
+SIZE_MAX_DEPTH = 8  # セッション状態のサイズ計算でたどる参照の深さ
+PROFILER_STATE_KEY = "_rerun_profiler"
+
+# サイズ計算でたどらない型（共有されている・巨大な参照先を持つもの）
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType)
+
+
+def profiling_requested():
+    """この実行でプロファイルを取るか（環境変数または ?profile=1）"""
+    return PROFILE_ENABLED or st.query_params.get(PROFILE_QUERY_PARAM) in ("1", "true")
+
+
+class RerunProfiler:
+    """スクリプト1回分の実行時間・関数ごとの時間・送信した要素数を計測する"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.elements = 0
+        self.elapsed = None
+        self.error = None
+        self._ctx = None
+        self._enqueue = None
+        self._started = None
+
+    def start(self):
+        ctx = get_script_run_ctx()
+        if ctx is not None:
+            # 送信するメッセージのうち、要素の追加・更新（delta）を数える
+            original = ctx._enqueue
+
+            def counting_enqueue(msg):
+                if msg.HasField("delta"):
+                    self.elements += 1
+                original(msg)
+
+            ctx._enqueue = counting_enqueue
+            self._ctx, self._enqueue = ctx, original
+        try:
+            self.profile.enable()
+        except ValueError as e:  # 他のセッションがプロファイル中（Python 3.12 以降）
+            self.error = str(e)
+            self.profile = None
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self.elapsed is not None:
+            return
+        self.elapsed = time.perf_counter() - self._started
+        if self.profile is not None:
+            self.profile.disable()
+        if self._ctx is not None:
+            self._ctx._enqueue = self._enqueue
+
+    def top_functions(self, limit=PROFILE_TOP_FUNCTIONS):
+        """累積時間の長い関数（ミリ秒）"""
+        if self.profile is None:
+            return []
+        self.profile.create_stats()
+        rows = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in self.profile.stats.items():
+            if filename == "~":
+                location = name  # 組み込み関数
+            else:
+                location = f"{os.path.basename(filename)}:{line}({name})"
+            rows.append({"function": location, "calls": calls, "tottime_ms": total * 1000, "cumtime_ms": cumulative * 1000})
+        rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+        return rows[:limit]
+
+
+def start_rerun_profiler():
+    """プロファイルが有効ならこの実行の計測を開始する（無効なら None）
+
+    st.rerun() や例外で前回の実行が途中で終わった場合は、その計測をここで終了する。
+    """
+    previous = st.session_state.pop(PROFILER_STATE_KEY, None)
+    if previous is not None:
+        previous.stop()
+    if not profiling_requested():
+        return None
+    profiler = RerunProfiler()
+    profiler.start()
+    st.session_state[PROFILER_STATE_KEY] = profiler
+    return profiler
+
+
+def estimate_size(obj, seen=None, depth=0):
+    """参照先を含めた概算のバイト数（同じオブジェクトは1回だけ数える）"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or depth > SIZE_MAX_DEPTH or isinstance(obj, _OPAQUE_TYPES):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):  # numpy配列
+        return size + int(obj.nbytes)
+    if isinstance(obj, dict):
+        children = [item for pair in obj.items() for item in pair]
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        children = obj
+    else:
+        children = list(getattr(obj, "__dict__", {}).values())
+        for slot in getattr(type(obj), "__slots__", ()):
+            if hasattr(obj, slot):
+                children.append(getattr(obj, slot))
+    return size + sum(estimate_size(child, seen, depth + 1) for child in children)
+
+
+def session_state_sizes(limit=SESSION_STATE_TOP_KEYS):
+    """セッション状態のキーごとの概算サイズ（大きい順）と合計"""
+    seen = set()
+    rows = []
+    for key in list(st.session_state.keys()):
+        if key == PROFILER_STATE_KEY:
+            continue
+        try:
+            value = st.session_state[key]
+        except KeyError:
+            continue
+        rows.append({"key": str(key), "type": type(value).__name__, "kb": estimate_size(value, seen) / 1024})
+    rows.sort(key=lambda row: row["kb"], reverse=True)
+    return rows[:limit], sum(row["kb"] for row in rows)
+
+
+def render_profile_panel(profiler, title, stats=()):
+    """計測を終了し、サイドバーのデバッグ情報にプロファイル結果を表示する（ページの最後で呼ぶ）
+
+    stats: 併せて表示する統計（Markdown の行のリスト）
+    """
+    profiler.stop()
+    st.session_state.pop(PROFILER_STATE_KEY, None)
+    get_text = get_translator("debug", st.session_state.get("language", "ja"))
+    state_rows, state_kb = session_state_sizes()
+    with st.sidebar.expander(title, expanded=True):
+        st.markdown(get_text.format(
+            "profile_summary",
+            ms=profiler.elapsed * 1000,
+            elements=profiler.elements,
+            keys=len(st.session_state.keys()),
+            kb=state_kb
+        ))
+        if stats:
+            st.markdown("\n".join(stats))
+        if profiler.error:
+            st.warning(get_text.format("profile_unavailable", error=profiler.error))
+        else:
+            st.markdown(get_text("profile_functions"))
+            st.dataframe(
+                pd.DataFrame(profiler.top_functions()).round(2),
+                use_container_width=True,
+                hide_index=True
+            )
+        st.markdown(get_text("profile_session_state"))
+        st.dataframe(pd.DataFrame(state_rows).round(1), use_container_width=True, hide_index=True)
+        st.caption(get_text("profile_note"))
@@ -0,0 +1,159 @@
+"""セッション内の研究者データの共有ストア
+
+同じ研究者（ORCIDまたは氏名と所属によるID）はセッション内で1件だけ保持し、
+検索結果や会話履歴のメッセージはIDのみを持つ。おすすめ理由は検索クエリや対話の
+応答ごとに内容が異なるため、(研究者ID, 文脈) ごとに保持する。
+参照されなくなった研究者（新しい検索・古いメッセージの退避）は削除する。
+"""
+import sys
+from dataclasses import dataclass, fields
+
+import streamlit as st
+
+from kenq.researchers import CARD_KEYS, REASON_KEYS, card_fields, researcher_id
+
+REASON_INDEX = {key: index for index, key in enumerate(REASON_KEYS)}
+CARD_KEY_SET = frozenset(CARD_KEYS)
+# 多くの研究者で同じ値になる項目（文字列を共有する）
+SHARED_STRING_KEYS = {"institution", "classified_field"}
+
+
+@dataclass(slots=True)
+class ResearcherRecord:
+    """研究者1名分のカード項目（おすすめ理由を除く）"""
+
+    id: str
+    name: str | None = None
+    institution: str | None = None
+    classified_field: str | None = None
+    works_count: int | None = None
+    cited_by_count: int | None = None
+    h_index: int | None = None
+    orcid: str | None = None
+    paper_data_count: int | None = None
+
+    def update(self, values):
+        for key, value in values.items():
+            if key in SHARED_STRING_KEYS and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(self, key, value)
+
+
+class ResearcherView:
+    """ストア内の研究者を研究者dictと同じ get / [] / in で参照する軽量なビュー
+
+    カード・CSV・フィルターなど、研究者dictを受け取る処理にそのまま渡せる。
+    """
+
+    __slots__ = ("store", "id", "context")
+
+    def __init__(self, store, rid, context):
+        self.store = store
+        self.id = rid
+        self.context = context
+
+    def get(self, key, default=None):
+        index = REASON_INDEX.get(key)
+        if index is not None:
+            reasons = self.store.reasons.get((self.id, self.context))
+            value = reasons[index] if reasons else None
+        elif key in CARD_KEY_SET:
+            value = getattr(self.store.records[self.id], key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def update(self, reasons):
+        """おすすめ理由を後から追加（遅延取得時）"""
+        self.store.set_reasons(self.id, self.context, reasons)
+
+
+class ResearcherStore:
+    """セッション内の研究者データ（IDごとに1件、参照数で管理）"""
+
+    def __init__(self):
+        self.records = {}  # 研究者ID -> ResearcherRecord
+        self.reasons = {}  # (研究者ID, 文脈) -> おすすめ理由（REASON_KEYS 順のタプル）
+        self.refs = {}  # 研究者ID -> 参照数
+        self.added = 0  # 追加された研究者の累計（重複を含む）
+
+    def add(self, items, context):
+        """研究者dictのリストを取り込み、IDのリストを返す
+
+        context: おすすめ理由の文脈（検索結果のキー・対話応答のIDなど）
+        """
+        ids = []
+        for item in items:
+            rid = researcher_id(item)
+            values = card_fields(item)
+            if "works_count" not in values and item.get("paper_count") is not None:
+                values["works_count"] = item["paper_count"]
+            record = self.records.get(rid)
+            if record is None:
+                record = self.records[rid] = ResearcherRecord(rid)
+            record.update(values)
+            if any(item.get(key) for key in REASON_KEYS):
+                self.set_reasons(rid, context, item)
+            self.refs[rid] = self.refs.get(rid, 0) + 1
+            ids.append(rid)
+        self.added += len(ids)
+        return ids
+
+    def views(self, ids, context):
+        return [ResearcherView(self, rid, context) for rid in ids]
+
+    def set_reasons(self, rid, context, reasons):
+        current = self.reasons.get((rid, context)) or (None,) * len(REASON_KEYS)
+        self.reasons[(rid, context)] = tuple(
+            reasons.get(key, current[index]) for index, key in enumerate(REASON_KEYS)
+        )
+
+    def release(self, ids, context):
+        """参照を解除し、どこからも参照されなくなった研究者を削除"""
+        for rid in ids:
+            self.reasons.pop((rid, context), None)
+            count = self.refs.get(rid, 0) - 1
+            if count > 0:
+                self.refs[rid] = count
+            else:
+                self.refs.pop(rid, None)
+                self.records.pop(rid, None)
+
+    def memory_report(self):
+        """保持件数と概算のメモリ使用量（共有している文字列は1回だけ数える）"""
+        seen = set()
+
+        def size(obj):
+            if obj is None or id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        total = 0
+        for record in self.records.values():
+            total += size(record) + sum(size(getattr(record, field.name)) for field in fields(record))
+        for reasons in self.reasons.values():
+            total += size(reasons) + sum(size(text) for text in reasons)
+        return {
+            "researchers": len(self.records),
+            "references": sum(self.refs.values()),
+            "reason_sets": len(self.reasons),
+            "added": self.added,
+            "bytes": total,
+        }
+
+
+def get_researcher_store():
+    """このセッションの研究者ストア（両ページで共有）"""
+    if "researcher_store" not in st.session_state:
+        st.session_state.researcher_store = ResearcherStore()
+    return st.session_state.researcher_store
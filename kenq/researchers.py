@@ -0,0 +1,39 @@
+"""研究者レコードの共通ヘルパー"""
+
+REASON_KEYS = [f"reason_{part}_{i}" for i in range(1, 4) for part in ("title", "body")]
+
+# カード表示に使う項目（おすすめ理由以外）
+CARD_KEYS = [
+    "name",
+    "institution",
+    "classified_field",
+    "works_count",
+    "cited_by_count",
+    "h_index",
+    "orcid",
+    "paper_data_count",
+]
+
+
+def researcher_id(item):
+    """研究者の安定したID（ORCIDがあればORCID、なければ氏名と所属）"""
+    orcid = (item.get("orcid") or "").strip()
+    if orcid and orcid != "N/A":
+        # URL形式・ID形式のどちらでも同じIDになるよう末尾部分のみを使う
+        return orcid.rstrip("/").rsplit("/", 1)[-1]
+    return f"{item.get('name', '')}|{item.get('institution', '')}"
+
+
+def is_profile_ref(item):
+    """プロフィール項目を省いたIDのみの参照か（"profile_ref": true と "id" のみを持つ）"""
+    return bool(item.get("profile_ref"))
+
+
+def has_reasons(item):
+    """おすすめ理由が1つでも入っているか"""
+    return any((item.get(key) or "").strip() for key in REASON_KEYS)
+
+
+def card_fields(item):
+    """おすすめ理由を除いたカード項目のみを取り出す"""
+    return {key: item[key] for key in CARD_KEYS if key in item}
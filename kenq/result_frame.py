@@ -0,0 +1,68 @@
+"""検索結果の列指向（pandas/NumPy）表現とベクトル化したフィルター・統計処理"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# 数値指標の列（フィルター・統計の対象）
+METRIC_COLUMNS = ["works_count", "cited_by_count", "h_index"]
+NUMERIC_COLUMNS = METRIC_COLUMNS + ["paper_data_count"]
+
+# 統計で表示するパーセンタイル
+STAT_PERCENTILES = {"p25": 25, "median": 50, "p75": 75, "p90": 90}
+
+
+def build_result_frame(results):
+    """研究者（dict または ResearcherView）のリストを型付きのDataFrameへ変換
+
+    フィルター・統計に使う列のみを取り出す。行番号は元リストの位置と一致。
+    """
+    frame = pd.DataFrame({
+        col: pd.to_numeric(pd.Series([item.get(col) for item in results], dtype="object"), errors="coerce")
+        .fillna(0)
+        .astype("int64")
+        for col in NUMERIC_COLUMNS
+    })
+    frame["classified_field"] = pd.Categorical([item.get("classified_field") or "" for item in results])
+    return frame
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def get_result_frame(result_set_key, _results):
+    """検索結果ごとに一度だけ変換する（result_set_key は結果内容を識別するキー）"""
+    return build_result_frame(_results)
+
+
+def filter_mask(frame, min_works=0, min_citations=0, min_h_index=0, research_fields=None):
+    """フィルター条件をブール配列で返す"""
+    mask = np.ones(len(frame), dtype=bool)
+    if min_works > 0:
+        mask &= frame["works_count"].to_numpy() >= min_works
+    if min_citations > 0:
+        mask &= frame["cited_by_count"].to_numpy() >= min_citations
+    if min_h_index > 0:
+        mask &= frame["h_index"].to_numpy() >= min_h_index
+    if research_fields:
+        mask &= frame["classified_field"].isin(research_fields).to_numpy()
+    return mask
+
+
+def summarize_metrics(frame, mask=None):
+    """論文数・被引用数・h指数の平均とパーセンタイルを列ごとに計算
+
+    戻り値: {列名: {"mean": ..., "p25": ..., "median": ..., "p75": ..., "p90": ...}}
+    対象が0件の場合は None
+    """
+    values = frame[METRIC_COLUMNS].to_numpy(dtype="float64")
+    if mask is not None:
+        values = values[mask]
+    if len(values) == 0:
+        return None
+
+    means = values.mean(axis=0)
+    percentiles = np.percentile(values, list(STAT_PERCENTILES.values()), axis=0)
+    summary = {}
+    for i, col in enumerate(METRIC_COLUMNS):
+        summary[col] = {"mean": float(means[i])}
+        for j, name in enumerate(STAT_PERCENTILES):
+            summary[col][name] = float(percentiles[j, i])
+    return summary
@@ -0,0 +1,106 @@
+"""同一リクエストの同時実行の集約（シングルフライト、スレッドセーフ）
+
+同じキーの処理が実行中であれば、後から来た呼び出しは新たに実行せずにその完了を待ち、
+同じ結果（または同じ例外）を受け取る。実行側が途中終了した場合は None を受け取り、
+呼び出し側で改めて実行する。完了した処理の結果は保持しない（キャッシュは別）。
+"""
+import threading
+
+
+class Flight:
+    """実行中の処理1件（完了すると result / error が設定される）"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+def _copy_error(error):
+    """待機中の呼び出しごとに別の例外オブジェクトを作る（型・args・属性は同じ）
+
+    同じ例外オブジェクトを複数のスレッドで送出すると __traceback__ などが上書きし合うため。
+    独自の __init__ を持つ例外もあるので、__init__ は呼ばずに複製する。
+    """
+    copy = type(error).__new__(type(error), *error.args)
+    copy.args = error.args
+    copy.__dict__.update(error.__dict__)
+    return copy
+
+
+class SingleFlight:
+    """キーごとに実行中の処理を1つに集約する"""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.executed = 0  # 実際に実行した回数
+        self.shared = 0  # 実行中の処理の結果を共有した（呼び出しを省いた）回数
+
+    def begin(self, key):
+        """(Flight, 自分が実行する側か) を返す。実行する側は必ず finish を呼ぶこと"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.waiters += 1
+                self.shared += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.executed += 1
+            return flight, True
+
+    def finish(self, key, flight, result=None, error=None):
+        """結果を待機中の呼び出しに渡す（result・error とも None は途中終了）"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.result = result
+        flight.error = error
+        flight.done.set()
+
+    def wait(self, flight, timeout=None):
+        """実行する側の完了を待って結果を返す（途中終了した場合は None）
+
+        timeout までに完了しなければ TimeoutError、実行側が失敗した場合は同じ型の例外
+        （実行側の例外を __cause__ に持つ複製）を送出する。
+        """
+        if not flight.done.wait(timeout):
+            raise TimeoutError("Timed out waiting for an in-flight request")
+        if flight.error is not None:
+            raise _copy_error(flight.error) from flight.error
+        return flight.result
+
+    def do(self, key, func, timeout=None):
+        """同じキーの処理が実行中ならその結果を待ち、なければ func() を実行して結果を共有する
+
+        func() が Exception 以外（再実行・停止など）で中断された場合、待機中の呼び出しは None を受け取る。
+        """
+        flight, leader = self.begin(key)
+        if not leader:
+            return self.wait(flight, timeout)
+        try:
+            result = func()
+        except Exception as error:
+            self.finish(key, flight, error=error)
+            raise
+        except BaseException:
+            # 🔧 Streamlit の再実行・停止などの制御用例外は実行した側だけのもの
+            # 待機中の呼び出しには途中終了（None）として渡し、各自で実行し直してもらう
+            self.finish(key, flight)
+            raise
+        self.finish(key, flight, result=result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._flights)
+        calls = self.executed + self.shared
+        return {
+            "executed": self.executed,
+            "shared": self.shared,
+            "in_flight": in_flight,
+            "saved_rate": self.shared / calls if calls else 0.0,
+        }
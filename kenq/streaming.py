@@ -0,0 +1,63 @@
+"""バックエンドのストリーミング応答（NDJSON / Server-Sent Events）の読み取り
+
+各イベントは {"type": "...", ...} 形式のJSONオブジェクト。
+"""
+import json
+
+import requests
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+SSE_CONTENT_TYPE = "text/event-stream"
+
+# ストリーミング対応のバックエンドにはNDJSON/SSEを、未対応の場合は従来のJSONを返してもらう
+STREAM_ACCEPT = f"{NDJSON_CONTENT_TYPE}, {SSE_CONTENT_TYPE};q=0.9, application/json;q=0.8"
+
+
+class StreamError(requests.exceptions.RequestException):
+    """ストリームの途中でバックエンドがエラーイベントを返した場合"""
+
+
+def stream_format(response):
+    """応答の形式（"ndjson" / "sse" / "json"）を判定"""
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type == NDJSON_CONTENT_TYPE:
+        return "ndjson"
+    if content_type == SSE_CONTENT_TYPE:
+        return "sse"
+    return "json"
+
+
+# chunk_size=None: チャンク転送のデータを届いた単位でそのまま読み進める
+def _iter_ndjson(response):
+    for line in response.iter_lines(chunk_size=None):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_sse(response):
+    data_lines = []
+    for line in response.iter_lines(chunk_size=None):
+        line = line.decode("utf-8") if isinstance(line, bytes) else line
+        if not line:
+            # 空行でイベントが確定する
+            if data_lines:
+                yield json.loads("\n".join(data_lines))
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # コメント（keep-alive）
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield json.loads("\n".join(data_lines))
+
+
+def iter_stream_events(response):
+    """NDJSON/SSE応答をイベントdictとして順に返す。エラーイベントは StreamError を送出"""
+    fmt = stream_format(response)
+    events = _iter_ndjson(response) if fmt == "ndjson" else _iter_sse(response)
+    for event in events:
+        if event.get("type") == "error":
+            raise StreamError(event.get("message", "stream error"))
+        yield event
@@ -1,12 +1,35 @@
 import streamlit as st
 import pandas as pd
 import requests
-import io
 import os
+import time
+import numpy as np
 from datetime import datetime
 
+from kenq.backend_client import LAZY_REASONS, SEARCH_STREAMING, get_backend_client
+from kenq.bulk_export import (
+    BULK_EXPORT_DEFAULT_RESULTS,
+    BULK_EXPORT_MAX_RESULTS,
+    EXPORT_FORMATS,
+    ExportTooLarge,
+    available_formats,
+    export_search_results,
+)
+from kenq.cache import make_key
+from kenq.card_renderer import render_cards_html
+from kenq.csv_export import search_results_csv
+from kenq.health import BackendUnavailable
+from kenq.i18n import get_translator
+from kenq.metrics import RERUNS, STAGE_SECONDS
+from kenq.profiler import render_profile_panel, start_rerun_profiler
+from kenq.researcher_store import get_researcher_store
+from kenq.researchers import has_reasons, researcher_id
+from kenq.result_frame import METRIC_COLUMNS, filter_mask, get_result_frame, summarize_metrics
+
 # ページ設定
 st.set_page_config(page_title="研Q - 海外研究者マッチング", layout="wide")
+RERUNS.inc(page="search")
+profiler = start_rerun_profiler()  # KENQ_PROFILE=1 または ?profile=1 のときのみ計測
 
 # ✅ セッション状態で言語管理
 if 'language' not in st.session_state:
@@ -17,140 +40,20 @@ if 'search_results' not in st.session_state:
     st.session_state.search_results = []
 if 'last_search_query' not in st.session_state:
     st.session_state.last_search_query = ""
-
-# ✅ 言語設定関数
-def get_text(key):
-    texts = {
-        'ja': {
-            'title': '海外研究者マッチング - Harvard Edition',
-            'select_country': 'Select Country / 国を選んでください',
-            'select_institution': 'Select Institution / 所属を選んでください',
-            'research_topic': 'Research Topic / 研究トピックを入力',
-            'detailed_filter': '🔍 詳細フィルター（オプション）',
-            'min_papers': 'Number of publications / 最小論文数',
-            'min_citations': 'Number of citations / 最小被引用数',
-            'min_h_index': 'h-index / 最小h指数',
-            'research_fields': '研究分野',
-            'num_results': 'Number of results / 表示件数',
-            'search_button': 'Search',
-            'enter_topic': '研究トピックを入力してください。',
-            'searching': '検索中...',
-            'search_results': '🔎検索結果（{count}件 / 全{total}件中）を表示します。',
-            'search_stats': '📊 検索結果統計',
-            'avg_papers': '平均論文数',
-            'avg_citations': '平均被引用数',
-            'avg_h_index': '平均h指数',
-            'papers_unit': '件',
-            'citations_unit': '回',
-            'researcher_name': '👨‍🔬 {name}',
-            'institution': 'Institution',
-            'research_field': 'Research Field',
-            'orcid': 'ORCID',
-            'research_metrics': '📈 Research Metrics',
-            'num_publications': 'Number of publications / 論文数',
-            'num_citations': 'Number of citations / 被引用数',
-            'h_index': 'h-index / h指数',
-            'db_records': 'DBデータ',
-            'view_reasons': '💡 おすすめする理由を見る',
-            'no_reasons': '理由は見つかりませんでした。',
-            'no_filter_results': 'フィルター条件に一致する研究者は見つかりませんでした。条件を緩めて再検索してください。',
-            'filter_before': 'フィルター適用前は{count}件の結果がありました。',
-            'no_results': '該当する研究者は見つかりませんでした。',
-            'timeout_error': '⏰ 検索がタイムアウトしました。しばらく待ってから再度お試しください。',
-            'api_error': '❌ APIリクエストに失敗しました: {error}',
-            'localhost_info': '💡 ローカルサーバーが起動しているか確認してください。',
-            'unexpected_error': '❌ 予期しないエラーが発生しました: {error}',
-            'system_info': '## 📊 システム情報',
-            'database': '**データベース**: Harvardデータ',
-            'index': '**インデックス**: harvard-index-v6',
-            'search_engine': '**検索エンジン**: Azure AI Search',
-            'ai': '**AI**: Azure OpenAI',
-            'search_tips': '## 🔍 検索のコツ',
-            'search_tip1': '- 英語・日本語どちらでも検索可能',
-            'search_tip2': '- 具体的なキーワードを使用',
-            'search_tip3': '- 詳細フィルターで絞り込み可能',
-            'metrics_info': '## 📈 表示される指標',
-            'metrics_info1': '- **論文数**: 研究者の総論文数',
-            'metrics_info2': '- **被引用数**: 論文の被引用回数',
-            'metrics_info3': '- **h指数**: 研究影響力の指標',
-            'performance': '## ⚡ パフォーマンス改善',
-            'performance1': '- 多層キャッシュシステム導入',
-            'performance2': '- バッチ処理で高速化',
-            'performance3': '- タイムアウト時間最適化',
-            'performance4': '- AI理由生成の簡潔化',
-            'download_csv': '📥 CSVダウンロード',
-            'download_button': 'Download CSV',
-            'download_filename': 'harvard_researchers_{timestamp}.csv',
-            'download_success': '✅ CSVファイルをダウンロードしました',
-            'download_error': '❌ CSVダウンロードに失敗しました: {error}',
-            'no_data_download': '⚠️ ダウンロードするデータがありません。まず検索を実行してください。'
-        },
-        'en': {
-            'title': 'International Researcher Matching - Harvard Edition',
-            'select_country': 'Select Country',
-            'select_institution': 'Select Institution',
-            'research_topic': 'Research Topic',
-            'detailed_filter': '🔍 Advanced Filters (Optional)',
-            'min_papers': 'Minimum publications',
-            'min_citations': 'Minimum citations',
-            'min_h_index': 'Minimum h-index',
-            'research_fields': 'Research Fields',
-            'num_results': 'Number of results',
-            'search_button': 'Search',
-            'enter_topic': 'Please enter a research topic.',
-            'searching': 'Searching...',
-            'search_results': '🔎Search Results ({count} of {total} total)',
-            'search_stats': '📊 Search Statistics',
-            'avg_papers': 'Avg Publications',
-            'avg_citations': 'Avg Citations',
-            'avg_h_index': 'Avg h-index',
-            'papers_unit': 'papers',
-            'citations_unit': 'times',
-            'researcher_name': '👨‍🔬 {name}',
-            'institution': 'Institution',
-            'research_field': 'Research Field',
-            'orcid': 'ORCID',
-            'research_metrics': '📈 Research Metrics',
-            'num_publications': 'Publications',
-            'num_citations': 'Citations',
-            'h_index': 'h-index',
-            'db_records': 'DB Records',
-            'view_reasons': '💡 Why We Recommend This Researcher',
-            'no_reasons': 'No reasons found.',
-            'no_filter_results': 'No researchers match the filter criteria. Please relax the conditions and search again.',
-            'filter_before': 'There were {count} results before applying filters.',
-            'no_results': 'No matching researchers found.',
-            'timeout_error': '⏰ Search timed out. Please wait and try again.',
-            'api_error': '❌ API request failed: {error}',
-            'localhost_info': '💡 Please check if the local server is running.',
-            'unexpected_error': '❌ An unexpected error occurred: {error}',
-            'system_info': '## 📊 System Information',
-            'database': '**Database**: Harvard Data',
-            'index': '**Index**: harvard-index-v6',
-            'search_engine': '**Search Engine**: Azure AI Search',
-            'ai': '**AI**: Azure OpenAI',
-            'search_tips': '## 🔍 Search Tips',
-            'search_tip1': '- Search in English or Japanese',
-            'search_tip2': '- Use specific keywords',
-            'search_tip3': '- Use advanced filters to narrow results',
-            'metrics_info': '## 📈 Displayed Metrics',
-            'metrics_info1': '- **Publications**: Total number of papers',
-            'metrics_info2': '- **Citations**: Citation count',
-            'metrics_info3': '- **h-index**: Research impact indicator',
-            'performance': '## ⚡ Performance Improvements',
-            'performance1': '- Multi-layer caching system',
-            'performance2': '- Batch processing optimization',
-            'performance3': '- Optimized timeout settings',
-            'performance4': '- Streamlined AI reasoning',
-            'download_csv': '📥 CSV Download',
-            'download_button': 'Download CSV',
-            'download_filename': 'harvard_researchers_{timestamp}.csv',
-            'download_success': '✅ CSV file downloaded successfully',
-            'download_error': '❌ CSV download failed: {error}',
-            'no_data_download': '⚠️ No data to download. Please run a search first.'
-        }
-    }
-    return texts.get(st.session_state.language, texts['ja']).get(key, key)
+if 'search_results_key' not in st.session_state:
+    st.session_state.search_results_key = ""
+if 'last_search_payload' not in st.session_state:
+    st.session_state.last_search_payload = {}
+# サーバー側のページ送り（limit / offset）: 次に取得する位置と、続きがあるか
+if 'search_offset' not in st.session_state:
+    st.session_state.search_offset = 0
+if 'search_has_more' not in st.session_state:
+    st.session_state.search_has_more = False
+if 'bulk_export' not in st.session_state:
+    st.session_state.bulk_export = None
+
+# ✅ 表示文言（全ページ共通のカタログ kenq.i18n を現在の言語で参照）
+get_text = get_translator("search", st.session_state.language)
 
 # 安全なページ遷移関数を追加
 def safe_navigate_to_page(page_name, possible_paths):
@@ -163,80 +66,75 @@ def safe_navigate_to_page(page_name, possible_paths):
                 continue
     st.error(f"❌ {page_name}ページが見つかりません")
 
-# ✅ CSVデータ準備関数
-def prepare_csv_data(results, query, language='ja'):
-    """検索結果をCSV用のDataFrameに変換"""
-    if not results:
-        return None
-    
-    csv_data = []
-    for item in results:
-        # 基本情報
-        row = {
-            'Researcher Name / 研究者名': item.get('name', 'N/A'),
-            'Institution / 所属': item.get('institution', 'N/A'),
-            'Research Field / 研究分野': item.get('classified_field', 'N/A'),
-            'ORCID': item.get('orcid', 'N/A'),
-            'Publications / 論文数': item.get('works_count', 0),
-            'Citations / 被引用数': item.get('cited_by_count', 0),
-            'h-index / h指数': item.get('h_index', 0),
-            'DB Records / DBデータ': item.get('paper_data_count', 0),
-        }
-        
-        # おすすめ理由を追加
-        for i in range(1, 4):
-            title_key = f'reason_title_{i}'
-            body_key = f'reason_body_{i}'
-            
-            if language == 'en':
-                row[f'Recommendation Reason {i} Title'] = item.get(title_key, '')
-                row[f'Recommendation Reason {i} Details'] = item.get(body_key, '')
-            else:
-                row[f'おすすめ理由{i}タイトル'] = item.get(title_key, '')
-                row[f'おすすめ理由{i}詳細'] = item.get(body_key, '')
-        
-        csv_data.append(row)
-    
-    df = pd.DataFrame(csv_data)
-    
-    # メタデータを追加
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    if language == 'en':
-        metadata_row = {
-            'Researcher Name / 研究者名': f'Search Query: {query}',
-            'Institution / 所属': f'Generated: {timestamp}',
-            'Research Field / 研究分野': f'Total Results: {len(results)}',
-            'ORCID': 'Language: English',
-            'Publications / 論文数': '',
-            'Citations / 被引用数': '',
-            'h-index / h指数': '',
-            'DB Records / DBデータ': '',
-        }
-    else:
-        metadata_row = {
-            'Researcher Name / 研究者名': f'検索クエリ: {query}',
-            'Institution / 所属': f'生成日時: {timestamp}',
-            'Research Field / 研究分野': f'総結果数: {len(results)}件',
-            'ORCID': '言語: 日本語',
-            'Publications / 論文数': '',
-            'Citations / 被引用数': '',
-            'h-index / h指数': '',
-            'DB Records / DBデータ': '',
-        }
-    
-    # 理由の列も空で埋める
-    for i in range(1, 4):
-        if language == 'en':
-            metadata_row[f'Recommendation Reason {i} Title'] = ''
-            metadata_row[f'Recommendation Reason {i} Details'] = ''
-        else:
-            metadata_row[f'おすすめ理由{i}タイトル'] = ''
-            metadata_row[f'おすすめ理由{i}詳細'] = ''
-    
-    # メタデータを先頭に挿入
-    df = pd.concat([pd.DataFrame([metadata_row]), df], ignore_index=True)
-    
-    return df
+# ✅ おすすめ理由の遅延取得（未取得の研究者分のみ取得し、セッションの検索結果に書き込む）
+def load_reasons(items):
+    missing = [item for item in items if not has_reasons(item)]
+    if not missing:
+        return
+    with st.spinner(get_text('loading_reasons')):
+        reasons_by_id = get_backend_client().fetch_reasons(
+            st.session_state.last_search_query, st.session_state.language, missing
+        )
+    for item in missing:
+        item.update(reasons_by_id.get(researcher_id(item), {}))
+
+# ✅ 検索結果の保存（研究者データはセッション共通のストアに1件ずつ保持し、結果リストはその参照のみを持つ）
+def store_search_results(results, results_key):
+    store = get_researcher_store()
+    previous = st.session_state.search_results
+    if previous:
+        store.release([item.id for item in previous], st.session_state.search_results_key)
+    st.session_state.search_results = store.views(store.add(results, results_key), results_key)
+    st.session_state.search_results_key = results_key
+    st.session_state.search_offset = len(results)
+
+# ✅ 続きの取得（「さらに読み込む」: 次の page_size 件をバックエンドから取得し、検索結果の末尾に追加する）
+def fetch_more_results(page_size):
+    payload = {
+        **st.session_state.last_search_payload,
+        "limit": page_size,
+        "offset": st.session_state.search_offset,
+    }
+    queue_status = st.empty()
+    with st.spinner(get_text('loading_more')):
+        batch = get_backend_client().search(
+            payload,
+            on_queue=lambda position: queue_status.caption(
+                get_text.format('queue_position', position=position) if position else ""
+            )
+        )
+    queue_status.empty()
+
+    # 取得済みの研究者（offset 未対応のバックエンドで同じページが返った場合など）は追加しない
+    store = get_researcher_store()
+    results_key = st.session_state.search_results_key
+    loaded = {item.id for item in st.session_state.search_results}
+    new_items = [item for item in batch if researcher_id(item) not in loaded]
+    st.session_state.search_results = (
+        st.session_state.search_results + store.views(store.add(new_items, results_key), results_key)
+    )
+    st.session_state.search_offset += len(batch)
+    st.session_state.search_has_more = bool(new_items) and len(batch) >= page_size
+
+def render_load_more(page_size, advance_page):
+    """読み込み済みの結果の最後で「さらに読み込む」を表示する（advance_page: 追加後に次のページへ進む）"""
+    if not st.session_state.search_has_more:
+        return
+    if st.button(get_text.format('load_more', count=page_size), key="load_more", use_container_width=True):
+        try:
+            fetch_more_results(page_size)
+        except BackendUnavailable as e:
+            st.error(get_text.format('backend_unavailable', seconds=e.retry_after))
+            return
+        except requests.exceptions.Timeout:
+            st.error(get_text('timeout_error'))
+            return
+        except requests.exceptions.RequestException as e:
+            st.error(get_text.format('api_error', error=str(e)))
+            return
+        # ページ番号の入力欄は作成済みのため、移動は次の実行の最初に反映する
+        st.session_state.result_page_advance = advance_page
+        st.rerun()
 
 # ✅ カスタムCSSでResearch Metricsのデザイン改善
 st.markdown("""
@@ -312,6 +210,44 @@ st.markdown("""
     box-shadow: 0 2px 4px rgba(0,0,0,0.08);
 }
 
+/* カード内の2カラム（基本情報 / Research Metrics） */
+.card-body {
+    display: flex;
+    gap: 16px;
+}
+
+.card-main {
+    flex: 3;
+    min-width: 0;
+}
+
+.card-metrics {
+    flex: 1;
+    margin-top: 10px;
+}
+
+/* おすすめ理由（折りたたみ） */
+.reasons {
+    margin-top: 12px;
+    border: 1px solid #e9ecef;
+    border-radius: 8px;
+    padding: 8px 12px;
+}
+
+.reasons summary {
+    cursor: pointer;
+    font-weight: 600;
+}
+
+.reason-title {
+    font-weight: 700;
+    margin: 10px 0 4px 0;
+}
+
+.reason-body {
+    line-height: 1.6;
+}
+
 /* フィルター部分のスタイリング */
 .filter-section {
     background-color: #f8f9fa;
@@ -363,6 +299,9 @@ st.markdown("""
 
 /* レスポンシブデザイン対応 */
 @media (max-width: 768px) {
+    .card-body {
+        flex-direction: column;
+    }
     .researcher-name {
         font-size: 18px !important;
     }
@@ -425,226 +364,347 @@ selected_university = "" if university == "All" else university.strip()
 query = st.text_input(get_text('research_topic'), key="research_query")
 
 # ✅ Step 4: 詳細フィルター（多言語対応）
+# フォームで入力をまとめ、「適用」を押した時だけ再実行する（再検索は不要）
 with st.expander(get_text('detailed_filter')):
-    st.markdown('<div class="filter-section">', unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        min_works = st.number_input(get_text('min_papers'), min_value=0, value=0, step=10)
-        min_citations = st.number_input(get_text('min_citations'), min_value=0, value=0, step=100)
-    
-    with col2:
-        min_h_index = st.number_input(get_text('min_h_index'), min_value=0, value=0, step=5)
-        research_fields = st.multiselect(
-            get_text('research_fields'),
-            ["Arts_Sciences", "Medical", "Engineering", "Business", "Law", "Education"],
-            default=[]
-        )
-    st.markdown('</div>', unsafe_allow_html=True)
-
-# Step 5: 表示件数の選択
-display_limit = st.selectbox(get_text('num_results'), [5, 10, 20, 50], index=1)
+    with st.form("filter_form", border=False):
+        st.markdown('<div class="filter-section">', unsafe_allow_html=True)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            min_works = st.number_input(get_text('min_papers'), min_value=0, value=0, step=10)
+            min_citations = st.number_input(get_text('min_citations'), min_value=0, value=0, step=100)
+        
+        with col2:
+            min_h_index = st.number_input(get_text('min_h_index'), min_value=0, value=0, step=5)
+            research_fields = st.multiselect(
+                get_text('research_fields'),
+                ["Arts_Sciences", "Medical", "Engineering", "Business", "Law", "Education"],
+                default=[]
+            )
+        st.markdown('</div>', unsafe_allow_html=True)
+        st.form_submit_button(get_text('apply_filters'))
+
+# Step 5: 1ページあたりの表示件数の選択
+page_size = st.selectbox(get_text('num_results'), [5, 10, 20, 50], index=1)
 
 # ✅ CSVダウンロードセクション（検索結果がある場合のみ表示）
+# CSVは結果セットごとに一度だけ生成・キャッシュされるため、通常の再実行ではコストがかからない
 if st.session_state.search_results:
     st.markdown('<div class="download-section">', unsafe_allow_html=True)
     st.markdown(f"### {get_text('download_csv')}")
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.button(get_text('download_button'), type="secondary", use_container_width=True):
+        search_results = st.session_state.search_results
+        # 遅延取得モードで未取得のおすすめ理由がある場合は、取得してからCSVを生成する
+        reasons_ready = not LAZY_REASONS or all(has_reasons(item) for item in search_results)
+        if reasons_ready or st.button(get_text('download_button'), type="secondary", use_container_width=True):
             try:
-                # CSVデータの準備
-                csv_df = prepare_csv_data(
-                    st.session_state.search_results, 
+                if not reasons_ready:
+                    load_reasons(search_results)
+                
+                # 内容キー: 結果セット + 取得済みのおすすめ理由の件数
+                reasons_loaded = sum(has_reasons(item) for item in search_results) if LAZY_REASONS else 0
+                csv_data = search_results_csv(
+                    search_results,
                     st.session_state.last_search_query,
-                    st.session_state.language
+                    st.session_state.language,
+                    content_key=f"{st.session_state.search_results_key}:{len(search_results)}:{reasons_loaded}"
                 )
                 
-                if csv_df is not None:
-                    # CSVとしてエンコード
-                    csv_buffer = io.StringIO()
-                    csv_df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
-                    csv_data = csv_buffer.getvalue()
-                    
-                    # ファイル名の生成
-                    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                    filename = get_text('download_filename').format(timestamp=timestamp)
-                    
-                    # ダウンロードボタン
-                    st.download_button(
-                        label=f"📥 {filename}",
-                        data=csv_data,
-                        file_name=filename,
-                        mime="text/csv",
-                        use_container_width=True
-                    )
-                    st.success(get_text('download_success'))
-                else:
-                    st.error(get_text('no_data_download'))
+                # ファイル名の生成
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = get_text.format('download_filename', timestamp=timestamp)
+                
+                # ダウンロードボタン
+                st.download_button(
+                    label=f"📥 {filename}",
+                    data=csv_data,
+                    file_name=filename,
+                    mime="text/csv",
+                    use_container_width=True
+                )
                     
             except Exception as e:
-                st.error(get_text('download_error').format(error=str(e)))
+                st.error(get_text.format('download_error', error=str(e)))
+    
+    # ✅ 一括エクスポート（バックエンドからページ単位で取得しながら書き出す）
+    def clear_bulk_export():
+        """ダウンロード後はファイルをセッションに残さない"""
+        st.session_state.bulk_export = None
+
+    with st.expander(get_text('bulk_export')):
+        col1, col2 = st.columns(2)
+        with col1:
+            export_format = st.selectbox(
+                get_text('bulk_export_format'), available_formats(), format_func=str.upper
+            )
+        with col2:
+            export_max = st.number_input(
+                get_text('bulk_export_max'), min_value=10, max_value=BULK_EXPORT_MAX_RESULTS,
+                value=BULK_EXPORT_DEFAULT_RESULTS, step=100
+            )
+        
+        if st.button(get_text('bulk_export_button'), use_container_width=True):
+            progress = st.empty()
+            try:
+                data, count = export_search_results(
+                    get_backend_client(),
+                    st.session_state.last_search_payload,
+                    export_format,
+                    st.session_state.language,
+                    max_results=int(export_max),
+                    on_progress=lambda n: progress.caption(get_text.format('bulk_export_progress', count=n))
+                )
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                st.session_state.bulk_export = {
+                    "data": data,
+                    "count": count,
+                    "mime": EXPORT_FORMATS[export_format]["mime"],
+                    "filename": get_text.format(
+                        'bulk_export_filename',
+                        timestamp=timestamp,
+                        extension=EXPORT_FORMATS[export_format]["extension"]
+                    ),
+                }
+            except ExportTooLarge as e:
+                st.warning(get_text.format('bulk_export_too_large', mb=e.max_bytes / 1024 / 1024))
+            except Exception as e:
+                st.error(get_text.format('download_error', error=str(e)))
+            finally:
+                progress.empty()
+        
+        bulk_export = st.session_state.bulk_export
+        if bulk_export:
+            st.caption(get_text.format('bulk_export_done', count=bulk_export["count"]))
+            st.download_button(
+                label=f"📥 {bulk_export['filename']}",
+                data=bulk_export["data"],
+                file_name=bulk_export["filename"],
+                mime=bulk_export["mime"],
+                on_click=clear_bulk_export,
+                use_container_width=True
+            )
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-# Step 6: 検索処理
+# ✅ ストリーミング検索（届いた研究者から順にカードを表示し、おすすめ理由は届き次第埋める）
+STREAM_RENDER_INTERVAL = 0.25  # 秒（途中経過の再描画間隔）
+
+def stream_search_results(backend, payload, preview_limit):
+    status = st.empty()
+    preview = st.empty()
+    received = []
+    results = []
+    last_render = 0.0
+    status.caption(get_text('searching'))
+    try:
+        for event in backend.search_stream(payload):
+            if event["type"] == "done":
+                results = event["results"]
+                break
+            if event["type"] == "queued":
+                # 同時実行数の上限に達している間は順番を表示する
+                status.caption(get_text.format('queue_position', position=event["position"]))
+                continue
+            if event["type"] == "researcher":
+                received.append(event["researcher"])
+            # 1ページ目に表示されない研究者の理由は再描画不要
+            elif event["index"] >= preview_limit:
+                continue
+            now = time.monotonic()
+            if now - last_render >= STREAM_RENDER_INTERVAL:
+                status.caption(get_text.format('streaming_progress', count=len(received)))
+                preview.markdown(
+                    render_cards_html(received[:preview_limit], get_text, reasons_note='reasons_loading'),
+                    unsafe_allow_html=True
+                )
+                last_render = now
+    finally:
+        # 完了後は通常のページ表示（Step 7）に切り替える
+        status.empty()
+        preview.empty()
+    return results
+
+# Step 6: 検索処理（バックエンドへの問い合わせは検索ボタン押下時のみ）
 if st.button(get_text('search_button'), type="primary"):
     if not query.strip():
         st.warning(get_text('enter_topic'))
     else:
         st.write(f"🔍 Searching researchers from **{university}** related to '**{query}**'...")
 
-        # ✅ バックエンドAPIのURL
-        api_url = "https://app-kenq-4-hweychffaqhaf8a3.canadacentral-01.azurewebsites.net/api/search"
+        # ✅ バックエンドAPI（共通の接続プールを利用）
+        backend = get_backend_client()
         payload = {
             "country": country,
             "university": selected_university,
             "query": query,
             "language": st.session_state.language  # ✅ 言語パラメータ追加
         }
+        if LAZY_REASONS:
+            # おすすめ理由は後から必要な分だけ取得する
+            payload["include_reasons"] = False
+        # 最初の1ページ分のみ取得し、続きは「さらに読み込む」で取得する
+        page_payload = {**payload, "limit": page_size, "offset": 0}
 
         try:
-            with st.spinner(get_text('searching')):
-                response = requests.post(api_url, json=payload, timeout=60)
-                response.raise_for_status()
-                results = response.json()
+            if SEARCH_STREAMING:
+                with STAGE_SECONDS.time(page="search", stage="search_stream"):
+                    results = stream_search_results(backend, page_payload, page_size)
+            else:
+                queue_status = st.empty()
+                with st.spinner(get_text('searching')):
+                    results = backend.search(
+                        page_payload,
+                        on_queue=lambda position: queue_status.caption(
+                            get_text.format('queue_position', position=position) if position else ""
+                        )
+                    )
+                queue_status.empty()
 
-            # 結果表示
             if results:
-                # ✅ 検索結果をセッション状態に保存
-                st.session_state.search_results = results
+                # ✅ 検索結果をセッション状態に保存（表示は下のStep 7で行う）
+                store_search_results(results, make_key(results))
                 st.session_state.last_search_query = query
-                
-                # ✅ フィルタリング（フロントエンド側）
-                filtered_results = []
-                for item in results:
-                    # 論文数フィルター
-                    if min_works > 0 and item.get('works_count', 0) < min_works:
-                        continue
-                    # 被引用数フィルター
-                    if min_citations > 0 and item.get('cited_by_count', 0) < min_citations:
-                        continue
-                    # h指数フィルター
-                    if min_h_index > 0 and item.get('h_index', 0) < min_h_index:
-                        continue
-                    # 研究分野フィルター
-                    if research_fields and item.get('classified_field', '') not in research_fields:
-                        continue
-                    
-                    filtered_results.append(item)
-
-                # 表示件数制限
-                display_results = filtered_results[:display_limit]
-                
-                if display_results:
-                    st.success(get_text('search_results').format(count=len(display_results), total=len(results)))
-                    
-                    # ✅ 統計情報の表示（多言語対応）
-                    if len(results) > 1:
-                        avg_works = sum(item.get('works_count', 0) for item in results) / len(results)
-                        avg_citations = sum(item.get('cited_by_count', 0) for item in results) / len(results)
-                        avg_h_index = sum(item.get('h_index', 0) for item in results) / len(results)
-                        
-                        with st.expander(get_text('search_stats')):
-                            st.markdown('<div class="stats-container">', unsafe_allow_html=True)
-                            col1, col2, col3 = st.columns(3)
-                            col1.metric(get_text('avg_papers'), f"{avg_works:.0f}{get_text('papers_unit')}")
-                            col2.metric(get_text('avg_citations'), f"{avg_citations:.0f}{get_text('citations_unit')}")
-                            col3.metric(get_text('avg_h_index'), f"{avg_h_index:.1f}")
-                            st.markdown('</div>', unsafe_allow_html=True)
-
-                    # ✅ 研究者情報の表示（多言語対応）
-                    for i, item in enumerate(display_results, 1):
-                        # カード全体をHTML+CSSでスタイリング
-                        st.markdown('<div class="search-result-card">', unsafe_allow_html=True)
-                        
-                        # 研究者基本情報
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            # ✅ 研究者名をメインコンテンツとして大きく表示
-                            st.markdown(f'<h3 class="researcher-name">{get_text("researcher_name").format(name=item.get("name", "No Name"))}</h3>', unsafe_allow_html=True)
-                            
-                            # ✅ 所属・分野情報を適切なサイズで表示
-                            st.markdown(f'<p class="researcher-info"><strong>{get_text("institution")}:</strong> {item.get("institution", "N/A")}</p>', unsafe_allow_html=True)
-                            st.markdown(f'<p class="researcher-info"><strong>{get_text("research_field")}:</strong> {item.get("classified_field", "N/A")}</p>', unsafe_allow_html=True)
-
-                            orcid_url = item.get("orcid", "").strip()
-                            if orcid_url and orcid_url != "N/A":
-                                if not orcid_url.startswith("http"):
-                                    orcid_url = f"https://orcid.org/{orcid_url}"
-                                st.markdown(f'<p class="researcher-info"><strong>{get_text("orcid")}:</strong> <a href="{orcid_url}" target="_blank">{orcid_url}</a></p>', unsafe_allow_html=True)
-                            else:
-                                st.markdown(f'<p class="researcher-info"><strong>{get_text("orcid")}:</strong> N/A</p>', unsafe_allow_html=True)
-                        
-                        with col2:
-                            # ✅ Research Metricsをサブ情報として小さく整理して表示
-                            st.markdown('<div style="margin-top: 10px;">', unsafe_allow_html=True)
-                            st.markdown(f'<p class="metrics-header">{get_text("research_metrics")}</p>', unsafe_allow_html=True)
-                            
-                            works_count = item.get('works_count', item.get('paper_count', 0))
-                            
-                            # カスタムメトリック表示
-                            papers_unit = get_text('papers_unit')
-                            citations_unit = get_text('citations_unit')
-                            db_records = get_text('db_records')
-                            
-                            st.markdown(f'''
-                            <div class="metric-container">
-                                <div class="metric-title">{get_text('num_publications')}</div>
-                                <div class="metric-value">{works_count:,}{papers_unit}</div>
-                            </div>
-                            <div class="metric-container">
-                                <div class="metric-title">{get_text('num_citations')}</div>
-                                <div class="metric-value">{item.get("cited_by_count", 0):,}{citations_unit}</div>
-                            </div>
-                            <div class="metric-container">
-                                <div class="metric-title">{get_text('h_index')}</div>
-                                <div class="metric-value">{item.get("h_index", 0)}</div>
-                                {f'<div class="metric-sub">{db_records}: {item.get("paper_data_count", 0)}{papers_unit}</div>' if item.get("paper_data_count") else ""}
-                            </div>
-                            ''', unsafe_allow_html=True)
-                            st.markdown('</div>', unsafe_allow_html=True)
-
-                        # ✅ おすすめ理由の表示（多言語対応）
-                        with st.expander(get_text('view_reasons'), expanded=False):
-                            reasons_displayed = False
-                            for j in range(1, 4):
-                                title = item.get(f"reason_title_{j}", "").strip()
-                                body = item.get(f"reason_body_{j}", "").strip()
-                                if title or body:
-                                    if title:
-                                        st.markdown(f"**🎯 {title}**")
-                                    if body:
-                                        st.write(body)
-                                    if j < 3 and (item.get(f"reason_title_{j+1}", "").strip() or item.get(f"reason_body_{j+1}", "").strip()):
-                                        st.markdown("---")
-                                    reasons_displayed = True
-                            if not reasons_displayed:
-                                st.write(get_text('no_reasons'))
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        st.markdown("---")
-                
-                else:
-                    st.warning(get_text('no_filter_results'))
-                    if len(results) > 0:
-                        st.info(get_text('filter_before').format(count=len(results)))
-                        
+                st.session_state.last_search_payload = payload
+                st.session_state.bulk_export = None
+                # limit 未対応のバックエンドは全件を返すため、ちょうど1ページ分の場合のみ続きがあるとみなす
+                st.session_state.search_has_more = len(results) == page_size
+                # CSV・一括エクスポート（このボタンより上）を新しい結果で作り直すため、再実行する
+                st.rerun()
             else:
                 st.warning(get_text('no_results'))
                 # 結果がない場合はセッション状態をクリア
-                st.session_state.search_results = []
+                store_search_results([], "")
+                st.session_state.search_has_more = False
 
+        except BackendUnavailable as e:
+            st.error(get_text.format('backend_unavailable', seconds=e.retry_after))
         except requests.exceptions.Timeout:
             st.error(get_text('timeout_error'))
         except requests.exceptions.RequestException as e:
-            st.error(get_text('api_error').format(error=str(e)))
-            if "localhost" in api_url:
+            st.error(get_text.format('api_error', error=str(e)))
+            if "localhost" in backend.base_url:
                 st.info(get_text('localhost_info'))
         except Exception as e:
-            st.error(get_text('unexpected_error').format(error=str(e)))
+            st.error(get_text.format('unexpected_error', error=str(e)))
+
+# ✅ 検索結果のページ表示（フラグメント化し、ページ移動時はこの部分だけを再実行する）
+@st.experimental_fragment
+def render_results_page(results, filtered_positions, page_size):
+    total_pages = max(1, -(-len(filtered_positions) // page_size))
+    # 「さらに読み込む」で追加した研究者のページへ進む
+    if st.session_state.pop('result_page_advance', False):
+        st.session_state.result_page = st.session_state.get('result_page', 1) + 1
+    # 絞り込み条件などで総ページ数が減った場合は範囲内に収める
+    if st.session_state.get('result_page', 1) > total_pages:
+        st.session_state.result_page = total_pages
+
+    def move_page(step):
+        st.session_state.result_page = min(max(1, st.session_state.result_page + step), total_pages)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button(get_text('page_prev'), key="page_prev", on_click=move_page, args=(-1,),
+                  disabled=st.session_state.get('result_page', 1) <= 1, use_container_width=True)
+    with col2:
+        page = st.number_input(get_text('page_number'), min_value=1, max_value=total_pages,
+                               step=1, key="result_page")
+    with col3:
+        st.button(get_text('page_next'), key="page_next", on_click=move_page, args=(1,),
+                  disabled=page >= total_pages, use_container_width=True)
+
+    page_start = (page - 1) * page_size
+    page_positions = filtered_positions[page_start:page_start + page_size]
+    st.caption(get_text.format(
+        'page_info',
+        start=page_start + 1,
+        end=page_start + len(page_positions),
+        page=page,
+        pages=total_pages
+    ))
+
+    page_items = [results[position] for position in page_positions]
+    reasons_note = 'no_reasons'
+    if LAZY_REASONS and not all(has_reasons(item) for item in page_items):
+        reasons_note = 'reasons_not_loaded'
+        if st.button(get_text('load_reasons'), key="load_reasons"):
+            try:
+                load_reasons(page_items)
+                reasons_note = 'no_reasons'
+            except requests.exceptions.RequestException as e:
+                st.error(get_text.format('api_error', error=str(e)))
+
+    # 現在のページのカードのみ、1つのHTML要素として送信する
+    with STAGE_SECONDS.time(page="search", stage="render_cards"):
+        cards_html = render_cards_html(page_items, get_text, reasons_note)
+    st.markdown(cards_html, unsafe_allow_html=True)
+
+    # 最後のページでのみ続きを取得する（最後のページが埋まっていれば追加分のページへ進む）
+    if page >= total_pages:
+        render_load_more(page_size, advance_page=len(page_positions) == page_size)
+
+# ✅ Step 7: フィルタリングと表示（保存済みの検索結果から毎回実行し、再検索はしない）
+results = st.session_state.search_results
+if results:
+    # ✅ フィルタリング（フロントエンド側）: 列指向データに対するブールマスクで一括判定
+    with STAGE_SECONDS.time(page="search", stage="filter"):
+        # 「さらに読み込む」で結果が増えるため、件数もキーに含める
+        results_frame = get_result_frame(f"{st.session_state.search_results_key}:{len(results)}", results)
+        mask = filter_mask(results_frame, min_works, min_citations, min_h_index, research_fields)
+        filtered_positions = np.flatnonzero(mask)
+
+    # 検索・絞り込み条件・表示件数が変わったら1ページ目に戻す（続きの追加では戻さない）
+    page_signature = (
+        st.session_state.search_results_key,
+        (min_works, min_citations, min_h_index, tuple(research_fields or ())),
+        page_size
+    )
+    if st.session_state.get('result_page_signature') != page_signature:
+        st.session_state.result_page_signature = page_signature
+        st.session_state.result_page = 1
+
+    if len(filtered_positions) > 0:
+        st.success(get_text.format('search_results', count=len(filtered_positions), total=len(results)))
+        if st.session_state.search_has_more:
+            st.caption(get_text('more_available'))
+
+        # ✅ 統計情報の表示（多言語対応）: 全件と絞り込み後の両方を集計
+        if len(results) > 1:
+            stats_all = summarize_metrics(results_frame)
+            stats_filtered = summarize_metrics(results_frame, mask)
+
+            with st.expander(get_text('search_stats')):
+                st.markdown('<div class="stats-container">', unsafe_allow_html=True)
+                col1, col2, col3 = st.columns(3)
+                col1.metric(get_text('avg_papers'), f"{stats_filtered['works_count']['mean']:.0f}{get_text('papers_unit')}")
+                col2.metric(get_text('avg_citations'), f"{stats_filtered['cited_by_count']['mean']:.0f}{get_text('citations_unit')}")
+                col3.metric(get_text('avg_h_index'), f"{stats_filtered['h_index']['mean']:.1f}")
+
+                metric_labels = {
+                    'works_count': get_text('num_publications'),
+                    'cited_by_count': get_text('num_citations'),
+                    'h_index': get_text('h_index'),
+                }
+                stats_rows = []
+                for scope, stats in [('stats_scope_all', stats_all), ('stats_scope_filtered', stats_filtered)]:
+                    for col in METRIC_COLUMNS:
+                        row = {get_text('stats_metric'): f"{metric_labels[col]} ({get_text(scope)})"}
+                        for stat_name, value in stats[col].items():
+                            row[get_text(f'stat_{stat_name}')] = round(value, 1)
+                        stats_rows.append(row)
+                st.dataframe(pd.DataFrame(stats_rows), hide_index=True, use_container_width=True)
+                st.markdown('</div>', unsafe_allow_html=True)
+
+        # ✅ 研究者情報の表示（現在のページ分のみ）
+        render_results_page(results, filtered_positions, page_size)
+
+    else:
+        st.warning(get_text('no_filter_results'))
+        if len(results) > 0:
+            st.info(get_text.format('filter_before', count=len(results)))
+        # 読み込み済みの結果に一致する研究者がいない場合も、続きから探せるようにする
+        render_load_more(page_size, advance_page=False)
 
 # サイドバー（ナビゲーション付き）
 with st.sidebar:
@@ -706,3 +766,15 @@ with st.sidebar:
             st.markdown("- 全研究者データを含む")
             st.markdown("- おすすめ理由も含まれます")
             st.markdown("- 多言語対応")# Updated 08/20/2025 14:10:29
+
+# ✅ 再実行ごとのプロファイル（有効時のみ、ページの最後で計測を終了して表示）
+if profiler is not None:
+    # ✅ キャッシュなどの統計は利用者向けのサイドバーではなく、デバッグ情報にのみ表示する
+    backend = get_backend_client()
+    store_report = get_researcher_store().memory_report()
+    render_profile_panel(profiler, get_text('debug_info'), [
+        get_text.format('cache_stats', **backend.search_cache.stats()),
+        get_text.format('flight_stats', **backend.search_flight.stats()),
+        get_text.format('store_stats', kb=store_report["bytes"] / 1024, **store_report),
+        get_text.format('profile_cache_stats', **backend.profile_cache.stats()),
+    ])
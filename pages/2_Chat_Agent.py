@@ -3,12 +3,25 @@ import requests
 import json
 from datetime import datetime
 import re
-import pandas as pd
 import os
-import io
+import uuid
+
+from kenq.backend_client import CHAT_STREAMING, get_backend_client
+from kenq.cache import make_key
+from kenq.chat_history import CHAT_WINDOW_MESSAGES, get_chat_archive, spill_history, visible_messages
+from kenq.chat_worker import DONE, FAILED, get_chat_worker
+from kenq.csv_export import chat_researchers_csv
+from kenq.health import BackendUnavailable
+from kenq.i18n import get_translator
+from kenq.intent import classify_intent
+from kenq.metrics import CHAT_REQUESTS, RERUNS, STAGE_SECONDS
+from kenq.profiler import render_profile_panel, start_rerun_profiler
+from kenq.researcher_store import get_researcher_store
 
 # ページ設定
 st.set_page_config(page_title="研Q - 対話型エージェント", layout="wide")
+RERUNS.inc(page="chat")
+profiler = start_rerun_profiler()  # KENQ_PROFILE=1 または ?profile=1 のときのみ計測
 
 # 🔧 改修機能1: 言語設定の初期化
 if 'language' not in st.session_state:
@@ -27,121 +40,18 @@ with col_lang2:
     )
     st.session_state.language = language_option
 
-# 言語に基づくテキスト定義
-def get_text(key):
-    texts = {
-        "日本語": {
-            "title": "🤖 研Q対話型エージェント",
-            "description": "**企業の研究ニーズに最適な海外研究者を見つけるAIエージェントです。**  \nチャット形式で質問にお答えしながら、候補研究者をご提案いたします。",
-            "chat_history": "💬 会話履歴",
-            "recommended_researchers": "🎯 おすすめ研究者",
-            "input_placeholder": "メッセージを入力してください:",
-            "send_button": "送信",
-            "test_connection": "接続テスト",
-            "connection_success": "✅ APIサーバーとの接続に成功しました！",
-            "connection_failed": "❌ 接続テストに失敗しました:",
-            "researcher_count": "表示する研究者数:",
-            "current_setting": "現在の設定:",
-            "researchers_display": "名の研究者を表示",
-            "csv_download": "📥 CSVダウンロード",
-            "download_csv": "Download CSV",
-            "system_info": "🔧 システム情報",
-            "display_settings": "⚙️ 表示設定",
-            "context_info": "📋 現在の会話コンテキスト",
-            "reset_chat": "🔄 会話をリセット",
-            "placeholder_function": "💡 プレースホルダー機能",
-            "usage_tips": "💡 使い方のヒント",
-            "debug_info": "🐛 デバッグ情報",
-            "institution": "所属:",
-            "research_field": "研究分野:",
-            "orcid": "ORCID:",
-            "papers": "論文数",
-            "citations": "被引用数",
-            "h_index": "h指数",
-            "reason_title": "🎯 おすすめする理由",
-            "reason_generating": "おすすめ理由は現在生成中です。しばらくお待ちください。"
-        },
-        "English": {
-            "title": "🤖 KenQ Chat Agent",
-            "description": "**AI agent to find the best overseas researchers for your corporate research needs.**  \nWe will suggest candidate researchers while answering your questions in a chat format.",
-            "chat_history": "💬 Chat History",
-            "recommended_researchers": "🎯 Recommended Researchers",
-            "input_placeholder": "Enter your message:",
-            "send_button": "Send",
-            "test_connection": "Test Connection",
-            "connection_success": "✅ Successfully connected to API server!",
-            "connection_failed": "❌ Connection test failed:",
-            "researcher_count": "Number of researchers to display:",
-            "current_setting": "Current setting:",
-            "researchers_display": " researchers to display",
-            "csv_download": "📥 CSV Download",
-            "download_csv": "Download CSV",
-            "system_info": "🔧 System Information",
-            "display_settings": "⚙️ Display Settings",
-            "context_info": "📋 Current Context",
-            "reset_chat": "🔄 Reset Chat",
-            "placeholder_function": "💡 Placeholder Function",
-            "usage_tips": "💡 Usage Tips",
-            "debug_info": "🐛 Debug Information",
-            "institution": "Institution:",
-            "research_field": "Research Field:",
-            "orcid": "ORCID:",
-            "papers": "Papers",
-            "citations": "Citations",
-            "h_index": "h-index",
-            "reason_title": "🎯 Reasons for Recommendation",
-            "reason_generating": "Recommendation reasons are currently being generated. Please wait."
-        }
-    }
-    return texts[st.session_state.language].get(key, key)
+# 言語に基づくテキスト定義（全ページ共通のカタログ kenq.i18n を参照）
+get_text = get_translator("chat", st.session_state.language)
 
 # ロゴの表示
 st.markdown("### 🎓 研Q")
 st.title(get_text("title"))
 st.markdown(get_text("description"))
 
-# API設定
-API_BASE_URL = "https://app-kenq-4-hweychffaqhaf8a3.canadacentral-01.azurewebsites.net"
-# 本番環境用: API_BASE_URL = "https://app-kenq-4-hweychffaqhaf8a3.canadacentral-01.azurewebsites.net"
-# テスト環境用："http://localhost:3000"
+# API設定（接続先URLと接続プールは kenq.backend_client で一元管理）
+backend = get_backend_client()
 
 
-# 🔧 改修機能2: CSVダウンロード機能
-def create_csv_from_researchers(researchers):
-    """研究者データからCSVを生成"""
-    if not researchers:
-        return None
-    
-    # CSVデータ用のリストを作成
-    csv_data = []
-    
-    for i, researcher in enumerate(researchers, 1):
-        csv_data.append({
-            "No.": i,
-            "Name / 研究者名": researcher.get('name', 'N/A'),
-            "Institution / 所属": researcher.get('institution', 'N/A'),
-            "Research Field / 研究分野": researcher.get('classified_field', 'N/A'),
-            "Papers / 論文数": researcher.get('works_count', 0),
-            "Citations / 被引用数": researcher.get('cited_by_count', 0),
-            "h-index / h指数": researcher.get('h_index', 0),
-            "ORCID": researcher.get('orcid', 'N/A'),
-            "Reason 1 Title / 理由1 タイトル": researcher.get('reason_title_1', ''),
-            "Reason 1 Body / 理由1 詳細": researcher.get('reason_body_1', ''),
-            "Reason 2 Title / 理由2 タイトル": researcher.get('reason_title_2', ''),
-            "Reason 2 Body / 理由2 詳細": researcher.get('reason_body_2', ''),
-            "Reason 3 Title / 理由3 タイトル": researcher.get('reason_title_3', ''),
-            "Reason 3 Body / 理由3 詳細": researcher.get('reason_body_3', '')
-        })
-    
-    # DataFrameを作成
-    df = pd.DataFrame(csv_data)
-    
-    # CSVファイルとして出力
-    csv_buffer = io.StringIO()
-    df.to_csv(csv_buffer, index=False, encoding='utf-8-sig')
-    
-    return csv_buffer.getvalue()
-
 # 安全なページ遷移関数を追加
 def safe_navigate_to_page(page_name, possible_paths):
     for path in possible_paths:
@@ -160,130 +70,31 @@ def get_dynamic_placeholder():
     
     # 初回または履歴が少ない場合
     if len(st.session_state.chat_history) <= 1:
-        if st.session_state.language == "日本語":
-            return "例：機械学習を使った医療診断の研究者を探しています"
-        else:
-            return "Example: Looking for researchers in machine learning for medical diagnosis"
+        return get_text("placeholder_first")
     
     # 最新のエージェント応答を分析
-    last_assistant_message = None
-    for msg in reversed(st.session_state.chat_history):
-        if msg["role"] == "assistant":
-            last_assistant_message = msg["content"]
-            break
-    
-    if not last_assistant_message:
+    last_assistant = next(
+        (msg for msg in reversed(st.session_state.chat_history) if msg["role"] == "assistant"), None
+    )
+    if not last_assistant or not last_assistant["content"]:
         return get_text("input_placeholder")
     
-    # エージェントの応答内容に基づいてプレースホルダーを決定
-    content_lower = last_assistant_message.lower()
-    
-    # 日本語プレースホルダー
-    if st.session_state.language == "日本語":
-        # 研究分野に関する質問の場合
-        if any(keyword in content_lower for keyword in ["研究分野", "分野", "どのような研究", "research field"]):
-            return "例：人工知能、バイオテクノロジー、材料科学など"
-        
-        # 技術課題に関する質問の場合
-        if any(keyword in content_lower for keyword in ["技術課題", "課題", "問題", "challenge"]):
-            return "例：画像認識の精度向上、新材料の開発、診断アルゴリズムの改善など"
-        
-        # 予算に関する質問の場合
-        if any(keyword in content_lower for keyword in ["予算", "費用", "コスト", "budget", "cost"]):
-            return "例：年間500万円、プロジェクト全体で2000万円など"
-        
-        # 期間に関する質問の場合
-        if any(keyword in content_lower for keyword in ["期間", "時間", "いつまで", "timeline", "期限"]):
-            return "例：2年間、2025年まで、来年度中にはなど"
-        
-        # 協業タイプに関する質問の場合
-        if any(keyword in content_lower for keyword in ["協業", "共同研究", "連携", "collaboration"]):
-            return "例：共同研究、技術移転、コンサルティング、ライセンス契約など"
-        
-        # 応用分野に関する質問の場合
-        if any(keyword in content_lower for keyword in ["応用", "活用", "使用", "適用", "application"]):
-            return "例：医療診断、自動運転、創薬、製造業での品質管理など"
-        
-        # 具体的な技術について聞かれた場合
-        if any(keyword in content_lower for keyword in ["機械学習", "ai", "人工知能"]):
-            return "例：深層学習を用いた画像解析、自然言語処理による文書分析など"
-        
-        if any(keyword in content_lower for keyword in ["医療", "診断", "医学"]):
-            return "例：CT画像診断、病理画像解析、遺伝子解析など"
-        
-        # 詳細情報を求められた場合
-        if any(keyword in content_lower for keyword in ["詳しく", "具体的", "詳細", "more detail"]):
-            return "例：具体的な技術要件、想定する精度、対象となるデータサイズなど"
-        
-        # 検索を提案された場合
-        if any(keyword in content_lower for keyword in ["検索", "探し", "お探し", "search"]):
-            return "例：はい、お願いします / もう少し条件を絞りたいです"
-        
-        # 研究者が提示された後
-        if any(keyword in content_lower for keyword in ["研究者", "候補", "おすすめ"]):
-            return "例：詳細を教えてください / 他の候補も見たいです / 連絡方法を教えてください"
-        
-        return "続きをお聞かせください"
+    # エージェントの応答内容から意図を判定（応答・言語ごとに一度だけ判定し、再実行時は再利用）
+    cache_key = (last_assistant.get("id") or last_assistant["timestamp"], get_text.language)
+    if st.session_state.placeholder_intent[0] != cache_key:
+        st.session_state.placeholder_intent = (cache_key, classify_intent(last_assistant["content"], get_text.language))
+    intent = st.session_state.placeholder_intent[1]
     
-    else:  # English プレースホルダー
-        # Research field questions
-        if any(keyword in content_lower for keyword in ["research field", "field", "what kind of research"]):
-            return "Example: artificial intelligence, biotechnology, materials science, etc."
-        
-        # Technical challenge questions
-        if any(keyword in content_lower for keyword in ["technical challenge", "challenge", "problem"]):
-            return "Example: improving image recognition accuracy, developing new materials, etc."
-        
-        # Budget questions
-        if any(keyword in content_lower for keyword in ["budget", "cost", "funding"]):
-            return "Example: $500K annually, $2M for the entire project, etc."
-        
-        # Timeline questions
-        if any(keyword in content_lower for keyword in ["timeline", "period", "deadline", "when"]):
-            return "Example: 2 years, by 2025, within this fiscal year, etc."
-        
-        # Collaboration type questions
-        if any(keyword in content_lower for keyword in ["collaboration", "partnership", "cooperation"]):
-            return "Example: joint research, technology transfer, consulting, licensing, etc."
-        
-        # Application field questions
-        if any(keyword in content_lower for keyword in ["application", "use", "implementation"]):
-            return "Example: medical diagnosis, autonomous driving, drug discovery, etc."
-        
-        # Specific technology questions
-        if any(keyword in content_lower for keyword in ["machine learning", "ai", "artificial intelligence"]):
-            return "Example: deep learning for image analysis, NLP for document analysis, etc."
-        
-        if any(keyword in content_lower for keyword in ["medical", "diagnosis", "healthcare"]):
-            return "Example: CT image diagnosis, pathology image analysis, genetic analysis, etc."
-        
-        # Detail requests
-        if any(keyword in content_lower for keyword in ["details", "specific", "more information"]):
-            return "Example: specific technical requirements, expected accuracy, data size, etc."
-        
-        # Search suggestions
-        if any(keyword in content_lower for keyword in ["search", "find", "look for"]):
-            return "Example: Yes, please proceed / I'd like to narrow down the criteria"
-        
-        # After researchers presented
-        if any(keyword in content_lower for keyword in ["researcher", "candidate", "recommendation"]):
-            return "Example: Please tell me more details / I'd like to see other candidates"
-        
-        return "Please continue..."
+    return get_text(f"placeholder_{intent}" if intent else "placeholder_default")
 
 # セッション状態の初期化
 if 'chat_history' not in st.session_state:
-    if st.session_state.language == "日本語":
-        initial_content = "こんにちは！研Q対話型エージェントです。🎓\n\n企業様の研究ニーズに最適な海外研究者をお探しいたします。以下についてお聞かせください：\n\n• どのような研究分野に興味がありますか？\n• 具体的な技術課題はありますか？\n• 協業の目的（共同研究、技術移転、コンサルティングなど）\n• 予算規模や期間のご希望\n\n何でもお気軽にご質問ください！"
-    else:
-        initial_content = "Hello! Welcome to KenQ Chat Agent. 🎓\n\nWe help you find the best overseas researchers for your corporate research needs. Please tell us about:\n\n• What research fields are you interested in?\n• What specific technical challenges do you have?\n• Collaboration objectives (joint research, technology transfer, consulting, etc.)\n• Budget and timeline preferences\n\nFeel free to ask any questions!"
-        
     st.session_state.chat_history = [
         {
             "role": "assistant",
-            "content": initial_content,
+            "content": get_text("initial_message"),
             "timestamp": datetime.now().isoformat(),
-            "researchers": []
+            "researcher_ids": []
         }
     ]
 
@@ -305,10 +116,29 @@ if 'max_researchers' not in st.session_state:
 if 'message_counter' not in st.session_state:
     st.session_state.message_counter = 0
 
+# バックグラウンドで実行中の対話リクエスト（ChatRequest）と、直近のエラー表示
+if 'chat_request' not in st.session_state:
+    st.session_state.chat_request = None
+if 'chat_error' not in st.session_state:
+    st.session_state.chat_error = None
+
+# セッションから退避した古いメッセージの参照用ID・退避件数と、追加で表示する古いメッセージ数
+if 'chat_archive_id' not in st.session_state:
+    st.session_state.chat_archive_id = uuid.uuid4().hex
+if 'chat_spilled' not in st.session_state:
+    st.session_state.chat_spilled = 0
+if 'chat_earlier_shown' not in st.session_state:
+    st.session_state.chat_earlier_shown = 0
+
+# 動的プレースホルダー用の意図判定結果 ((応答ID, 言語), 意図)
+if 'placeholder_intent' not in st.session_state:
+    st.session_state.placeholder_intent = (None, None)
+
 def call_backend_api(query, context=None, max_researchers=3):
-    """バックエンドAPIを呼び出して研究者検索と対話応答を取得"""
-    api_url = f"{API_BASE_URL}/api/chat"
-    
+    """バックエンドAPIへの対話リクエストをバックグラウンドで開始
+
+    スクリプトは応答を待たずに戻る。戻り値の ChatRequest をポーリングして進捗・結果を取得する。
+    """
     # JSONシリアライズ可能な形式に変換
     serializable_history = []
     for item in st.session_state.chat_history[-5:]:
@@ -325,57 +155,153 @@ def call_backend_api(query, context=None, max_researchers=3):
         "max_researchers": max_researchers  # 🔧 改修①: 研究者数を送信
     }
     
+    # 応答までの時間・結果は ChatWorker 側で記録する
+    CHAT_REQUESTS.inc(status="submitted")
+    return get_chat_worker().submit(backend, payload, streaming=CHAT_STREAMING)
+
+def describe_chat_error(error):
+    """バックグラウンド実行中の例外を（エラーメッセージ, 代替応答）に変換"""
     try:
-        with st.spinner('APIに接続中...'):
-            response = requests.post(
-                api_url, 
-                json=payload, 
-                timeout=45,
-                headers={'Content-Type': 'application/json'}
-            )
-            response.raise_for_status()
-            return response.json()
+        raise error
+    except BackendUnavailable as e:
+        return f"🔌 APIサーバーが応答していないため、送信を一時停止しています（約{e.retry_after:.0f}秒後に再試行します）。", {
+            "response": "申し訳ございません。現在システムに接続できません。しばらく経ってからお試しください。",
+            "researchers": [],
+            "context_update": {}
+        }
     except requests.exceptions.Timeout:
-        st.error("⏰ APIの応答がタイムアウトしました。しばらく待ってから再度お試しください。")
-        return {
+        return "⏰ APIの応答がタイムアウトしました。しばらく待ってから再度お試しください。", {
             "response": "申し訳ございません。現在システムの応答が遅くなっております。しばらく経ってからお試しください。",
             "researchers": [],
             "context_update": {}
         }
     except requests.exceptions.ConnectionError:
-        st.error("🔌 APIサーバーに接続できません。ネットワーク接続を確認してください。")
-        return {
+        return "🔌 APIサーバーに接続できません。ネットワーク接続を確認してください。", {
             "response": "申し訳ございません。現在システムに接続できません。しばらく経ってからお試しください。",
             "researchers": [],
             "context_update": {}
         }
     except requests.exceptions.HTTPError as e:
-        st.error(f"🚨 APIエラーが発生しました (HTTP {e.response.status_code})")
-        return {
+        return f"🚨 APIエラーが発生しました (HTTP {e.response.status_code})", {
             "response": f"システムエラーが発生しました。エラーコード: {e.response.status_code}",
             "researchers": [],
             "context_update": {}
         }
     except requests.exceptions.RequestException as e:
-        st.error(f"❌ APIリクエストエラー: {str(e)}")
-        return {
+        return f"❌ APIリクエストエラー: {str(e)}", {
             "response": "申し訳ございません。現在システムに問題が発生しております。しばらく経ってからお試しください。",
             "researchers": [],
             "context_update": {}
         }
     except json.JSONDecodeError:
-        st.error("📄 APIからの応答が正しくありません。")
-        return {
+        return "📄 APIからの応答が正しくありません。", {
             "response": "システムからの応答に問題がありました。管理者にお問い合わせください。",
             "researchers": [],
             "context_update": {}
         }
+    except Exception as e:
+        return f"❌ 予期しないエラーが発生しました: {str(e)}", {
+            "response": "申し訳ございません。現在システムに問題が発生しております。しばらく経ってからお試しください。",
+            "researchers": [],
+            "context_update": {}
+        }
+
+def finish_chat_request(request):
+    """完了したリクエストの応答を会話履歴とコンテキストに反映"""
+    if request.cancelled:
+        return  # 完了前後にキャンセル・置き換えされたリクエストの応答は反映しない
+    if request.status == DONE:
+        api_response = request.result or {}
+    elif request.status == FAILED:
+        st.session_state.chat_error, api_response = describe_chat_error(request.error)
+    else:
+        return  # キャンセル済み
+    
+    # エージェントの応答を追加（研究者データはセッション共通のストアに保持し、メッセージはIDのみを持つ）
+    researchers = api_response.get("researchers", [])
+    st.session_state.chat_history.append({
+        "id": request.id,
+        "role": "assistant",
+        "content": api_response.get("response", "申し訳ございません。応答の生成に失敗しました。"),
+        "timestamp": datetime.now().isoformat(),
+        "researcher_ids": get_researcher_store().add(researchers, request.id),
+        "export_key": make_key(researchers) if researchers else None
+    })
+    trim_chat_history()
+    
+    # ユーザーコンテキストを更新
+    if api_response.get("context_update"):
+        st.session_state.user_context.update(api_response["context_update"])
+
+def cancel_chat_request():
+    """実行中のリクエストをキャンセル（接続を閉じてバックエンドの処理も打ち切る）"""
+    request = st.session_state.chat_request
+    if request is not None:
+        request.cancel()
+        st.session_state.chat_request = None
+        st.toast(get_text('request_cancelled'))
+
+# 実行中リクエストの進捗表示（このフラグメントだけを定期的に再実行してポーリングする）
+CHAT_POLL_INTERVAL = 0.5  # 秒
+
+@st.experimental_fragment(run_every=CHAT_POLL_INTERVAL)
+def render_pending_reply():
+    RERUNS.inc(page="chat_poll")
+    request = st.session_state.chat_request
+    if request is None:
+        return
+    if request.finished:
+        st.session_state.chat_request = None
+        finish_chat_request(request)
+        st.rerun()
+    
+    with st.chat_message("assistant"):
+        if request.text:
+            st.markdown(request.text + "▌")
+        elif request.queue_position:
+            st.caption(get_text.format('queue_position', position=request.queue_position))
+        else:
+            st.caption(get_text.format('waiting_response', seconds=request.elapsed))
+        st.button(get_text('cancel_request'), key="cancel_request", on_click=cancel_chat_request)
+
+def trim_chat_history():
+    """上限を超えた古いメッセージをセッション状態から退避（研究者データの参照も解除）"""
+    store = get_researcher_store()
+    st.session_state.chat_spilled = spill_history(
+        st.session_state.chat_history,
+        get_chat_archive(),
+        st.session_state.chat_archive_id,
+        st.session_state.chat_spilled,
+        on_spill=lambda message: store.release(message.get("researcher_ids", []), message.get("id"))
+    )
+
+def show_earlier_messages():
+    st.session_state.chat_earlier_shown += CHAT_WINDOW_MESSAGES
 
 def display_chat_history():
-    """チャット履歴を表示（多言語対応）"""
+    """チャット履歴を表示（多言語対応）
+
+    直近 CHAT_WINDOW_MESSAGES 件のみを表示し、それより前はボタンで順に読み込む
+    """
     st.markdown(f"### {get_text('chat_history')}")
     
-    for message in st.session_state.chat_history:
+    messages, hidden, expired = visible_messages(
+        st.session_state.chat_history,
+        get_chat_archive(),
+        st.session_state.chat_archive_id,
+        st.session_state.chat_spilled,
+        st.session_state.chat_earlier_shown
+    )
+    if hidden:
+        st.button(
+            get_text.format('show_earlier', count=hidden),
+            key="show_earlier_messages",
+            on_click=show_earlier_messages
+        )
+    if expired:
+        st.caption(get_text.format('earlier_expired', count=expired))
+    
+    for message in messages:
         if message["role"] == "user":
             with st.chat_message("user"):
                 st.write(message["content"])
@@ -383,16 +309,19 @@ def display_chat_history():
             with st.chat_message("assistant"):
                 st.write(message["content"])
 
-def display_researchers(researchers):
-    """🔧 改修②: 理由表示方法を改善した研究者リスト表示（多言語対応）"""
+def display_researchers(researchers, export_key=None):
+    """🔧 改修②: 理由表示方法を改善した研究者リスト表示（多言語対応）
+
+    export_key: 研究者リストの内容キー（CSVキャッシュ用。省略時は内容から計算）
+    """
     if not researchers:
         return
     
     st.markdown(f"### {get_text('recommended_researchers')}")
     
-    # 🔧 改修機能2: CSVダウンロードボタンを追加
+    # 🔧 改修機能2: CSVダウンロードボタンを追加（CSVはキャッシュ済みのものを利用）
     if researchers:
-        csv_data = create_csv_from_researchers(researchers)
+        csv_data = chat_researchers_csv(researchers, export_key)
         if csv_data:
             current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"researchers_{current_time}.csv"
@@ -450,11 +379,25 @@ def display_researchers(researchers):
                 st.info(get_text('reason_generating'))
 
 # メインのチャットインターフェース
-display_chat_history()
+with STAGE_SECONDS.time(page="chat", stage="render_history"):
+    display_chat_history()
+
+# 実行中のリクエストがあれば応答の途中経過を表示
+if st.session_state.chat_request is not None:
+    render_pending_reply()
+
+# 直前のリクエストで発生したエラーを1度だけ表示
+if st.session_state.chat_error:
+    st.error(st.session_state.chat_error)
+    st.session_state.chat_error = None
 
 # 最新の研究者提案を表示
-if st.session_state.chat_history and st.session_state.chat_history[-1].get("researchers"):
-    display_researchers(st.session_state.chat_history[-1]["researchers"])
+if st.session_state.chat_history and st.session_state.chat_history[-1].get("researcher_ids"):
+    latest_message = st.session_state.chat_history[-1]
+    display_researchers(
+        get_researcher_store().views(latest_message["researcher_ids"], latest_message["id"]),
+        latest_message.get("export_key")
+    )
 
 # 🔧 動的プレースホルダー対応の入力フィールド
 st.markdown("---")
@@ -489,49 +432,49 @@ with col1:
 with col2:
     test_connection = st.button(get_text('test_connection'), type="secondary")
 
-# 接続テスト機能
+# 接続テスト機能（バックグラウンドの死活監視の結果を表示し、新たなリクエストは送らない）
 if test_connection:
-    try:
-        test_url = f"{API_BASE_URL}/api/health"
-        response = requests.get(test_url, timeout=10)
-        if response.status_code == 200:
-            st.success(get_text('connection_success'))
-            health_data = response.json()
-            st.json(health_data)
-        else:
-            st.error(f"❌ APIサーバーが正常に応答していません (Status: {response.status_code})")
-    except Exception as e:
-        st.error(f"{get_text('connection_failed')} {str(e)}")
+    health = backend.monitor.snapshot()
+    if health["status"] == "unknown":
+        st.info(get_text('connection_checking'))
+    elif health["error"] is None:
+        st.success(get_text('connection_success'))
+        st.json(health["details"])
+    elif health["error"].startswith("HTTP"):
+        st.error(f"❌ APIサーバーが正常に応答していません ({health['error']})")
+    else:
+        st.error(f"{get_text('connection_failed')} {health['error']}")
+    if health["checked_at"] is not None:
+        st.caption(get_text.format(
+            'connection_checked',
+            seconds=health["age_seconds"],
+            latency=health["latency_ms"] or 0,
+            breaker=health["breaker"]["state"]
+        ))
 
 # メッセージ送信処理
 if send_button and user_input.strip():
+    # 応答待ちのリクエストがあれば、新しいメッセージで置き換える（古いリクエストは中断）
+    previous_request = st.session_state.chat_request
+    if previous_request is not None and not previous_request.finished:
+        previous_request.cancel()
+    
     # ユーザーメッセージを追加
     st.session_state.chat_history.append({
         "role": "user", 
         "content": user_input,
         "timestamp": datetime.now().isoformat(),
-        "researchers": []
+        "researcher_ids": []
     })
+    trim_chat_history()
     
-    # 🔧 改修①: 研究者数を含めてAPIを呼び出し
-    api_response = call_backend_api(
+    # 🔧 改修①: 研究者数を含めてAPIを呼び出し（応答はバックグラウンドで受信）
+    st.session_state.chat_request = call_backend_api(
         user_input, 
         st.session_state.user_context,
         max_researchers=st.session_state.max_researchers
     )
     
-    # エージェントの応答を追加
-    st.session_state.chat_history.append({
-        "role": "assistant",
-        "content": api_response.get("response", "申し訳ございません。応答の生成に失敗しました。"),
-        "timestamp": datetime.now().isoformat(),
-        "researchers": api_response.get("researchers", [])
-    })
-    
-    # ユーザーコンテキストを更新
-    if api_response.get("context_update"):
-        st.session_state.user_context.update(api_response["context_update"])
-    
     # メッセージカウンターを増加（新しい入力フィールドを生成）
     st.session_state.message_counter += 1
     
@@ -601,4 +544,13 @@ with st.sidebar:
     st.markdown("- **データベース**: Harvard研究者データ")
     st.markdown("- **インデックス**: harvard-index-v6")
     st.markdown("- **検索エンジン**: Azure AI Search")
-    st.markdown("- **AI**: Azure OpenAI")
\ No newline at end of file
+    st.markdown("- **AI**: Azure OpenAI")
+
+# ✅ 再実行ごとのプロファイル（有効時のみ、ページの最後で計測を終了して表示）
+if profiler is not None:
+    # ✅ キャッシュなどの統計は利用者向けのサイドバーではなく、デバッグ情報にのみ表示する
+    store_report = get_researcher_store().memory_report()
+    render_profile_panel(profiler, get_text('debug_info'), [
+        get_text.format('store_stats', kb=store_report["bytes"] / 1024, **store_report),
+        get_text.format('profile_cache_stats', **get_backend_client().profile_cache.stats()),
+    ])
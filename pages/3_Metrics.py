@@ -0,0 +1,94 @@
+import streamlit as st
+import pandas as pd
+import time
+
+from kenq.backend_client import get_backend_client
+from kenq.i18n import get_translator
+from kenq.metrics import METRICS_PAGE_ENABLED, METRICS_PORT, QUANTILE_WINDOW, REGISTRY, Counter, Gauge, Histogram
+
+# 表示文言（各ページで選択された言語に合わせる。未選択なら日本語）
+get_text = get_translator("metrics", st.session_state.get("language", "ja"))
+
+# ページ設定
+st.set_page_config(page_title=get_text("page_title"), layout="wide")
+
+# ✅ 管理用ページのため、サーバー側で KENQ_METRICS_PAGE=1 を設定した場合のみ表示する
+# （URL などで利用者が有効にすることはできない）
+if not METRICS_PAGE_ENABLED:
+    st.info(get_text("unavailable"))
+    st.stop()
+
+# キャッシュ・順番待ちなどの現在値を登録するため、共通クライアントを用意しておく
+get_backend_client()
+
+
+def describe_labels(metric, labels):
+    """計測値名とラベルを1つの表示名にまとめる"""
+    label_text = ", ".join(f"{key}={labels[key]}" for key in metric.labels if key in labels)
+    return f"{metric.name}{{{label_text}}}" if label_text else metric.name
+
+
+st.title(get_text("title"))
+st.markdown(get_text.format("description", window=QUANTILE_WINDOW))
+st.caption(get_text.format("uptime", minutes=(time.time() - REGISTRY.started_at) / 60))
+st.button(get_text("refresh"))
+
+metrics = list(REGISTRY.metrics.values())
+
+# ✅ 処理時間: 系列ごとの p50 / p95 / p99（ミリ秒）
+st.markdown(get_text("latency_title"))
+latency_rows = []
+for metric in metrics:
+    if isinstance(metric, Histogram):
+        for row in metric.summary():
+            latency_rows.append({
+                get_text("column_metric"): describe_labels(metric, row),
+                get_text("column_count"): row["count"],
+                "mean": row["mean"] * 1000,
+                "p50": row["p50"] * 1000,
+                "p95": row["p95"] * 1000,
+                "p99": row["p99"] * 1000,
+            })
+if latency_rows:
+    st.dataframe(pd.DataFrame(latency_rows).round(1), use_container_width=True, hide_index=True)
+else:
+    st.info(get_text("no_data"))
+
+# ✅ 件数（カウンター）と現在値（ゲージ）
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown(get_text("counters_title"))
+    counter_rows = [
+        {get_text("column_metric"): describe_labels(metric, labels), get_text("column_value"): value}
+        for metric in metrics if isinstance(metric, Counter)
+        for labels, value in metric.samples()
+    ]
+    if counter_rows:
+        st.dataframe(pd.DataFrame(counter_rows), use_container_width=True, hide_index=True)
+    else:
+        st.info(get_text("no_data"))
+with col2:
+    st.markdown(get_text("gauges_title"))
+    gauge_rows = [
+        {get_text("column_metric"): describe_labels(metric, labels), get_text("column_value"): value}
+        for metric in metrics if isinstance(metric, Gauge)
+        for labels, value in metric.samples()
+    ]
+    if gauge_rows:
+        st.dataframe(pd.DataFrame(gauge_rows), use_container_width=True, hide_index=True)
+    else:
+        st.info(get_text("no_data"))
+
+# ✅ Prometheus 形式（収集ツールへの取り込み・手元での確認用）
+st.markdown(get_text("prometheus_title"))
+prometheus_text = REGISTRY.render_prometheus()
+if METRICS_PORT:
+    st.markdown(get_text.format("prometheus_endpoint", port=METRICS_PORT))
+st.download_button(
+    label=get_text("prometheus_download"),
+    data=prometheus_text,
+    file_name="kenq_metrics.prom",
+    mime="text/plain",
+)
+with st.expander("metrics.prom"):
+    st.code(prometheus_text, language="text")
@@ -0,0 +1,345 @@
+"""研Q バックエンドのローカル代替サーバー（開発・動作確認用）
+
+実行例:
+    python tools/mock_backend.py --port 3000 --search-format ndjson
+
+検索リクエストに "stream": true が含まれる場合は --search-format の形式
+（ndjson / sse / json）で返し、含まれない場合は従来どおり単一のJSON配列を返す。
+"include_reasons": false の場合はおすすめ理由を含めず、/api/reasons で後から返す。
+"limit" / "offset" が含まれる場合は --total-results 件の結果全体から該当範囲を返す（一括エクスポート用）。
+/api/chat も "stream": true の場合は応答本文をトークン単位で返し、
+研究者リストとコンテキスト更新を末尾のイベントとして送る。
+"profile_refs": true の場合、"known_profiles" に含まれる研究者はカード項目を省いた
+IDのみの参照（{"id": ..., "profile_ref": true}）で返す。/api/profiles はIDからプロフィールを返す。
+
+負荷試験・障害時の動作確認用に、すべての /api/* に次の内容を指定した割合で加えられる
+（フロントエンドは KENQ_API_BASE_URL=http://127.0.0.1:<port> で接続先を切り替える）。
+  - 応答開始までの遅延: --latency-ms と分布（--latency-dist fixed / uniform / exponential / lognormal）
+  - エラー応答: --error-rate（--error-status の中から選んだステータスで返す）
+  - 応答の停止: --stall-rate（--stall-seconds 待ってから応答、クライアントのタイムアウト確認用）
+  - ストリームの切断: --drop-rate（stream の途中で接続を閉じ、done を送らない）
+例:
+    python tools/mock_backend.py --latency-dist lognormal --latency-ms 800 --error-rate 0.05 --seed 1
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIELDS = ["Arts_Sciences", "Medical", "Engineering", "Business", "Law", "Education"]
+INSTITUTIONS = [
+    "Harvard University",
+    "Harvard Medical School",
+    "Harvard T.H. Chan School of Public Health",
+    "Harvard School of Engineering and Applied Sciences",
+]
+
+
+def make_researcher(rng, index, query):
+    """カード表示に必要な項目（理由は含まない）"""
+    works_count = rng.randint(5, 600)
+    return {
+        "name": f"Researcher {index + 1}",
+        "institution": rng.choice(INSTITUTIONS),
+        "classified_field": rng.choice(FIELDS),
+        "works_count": works_count,
+        "cited_by_count": works_count * rng.randint(2, 80),
+        "h_index": rng.randint(1, 120),
+        "orcid": f"0000-000{rng.randint(1, 3)}-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+        "paper_data_count": rng.randint(0, 50),
+    }
+
+
+def make_reasons(query, rid, words):
+    """研究者IDと検索クエリから決まるおすすめ理由（検索時と /api/reasons で同じ内容になる）"""
+    rng = random.Random(f"{query}|{rid}")
+    reasons = {}
+    for i in range(1, 4):
+        reasons[f"reason_title_{i}"] = f"Expertise related to {query} ({i})"
+        reasons[f"reason_body_{i}"] = " ".join(
+            rng.choice(["research", "method", "clinical", "data", "model", "analysis", query])
+            for _ in range(words)
+        )
+    return reasons
+
+
+def sample_latency(config, rng):
+    """応答開始までの遅延（秒）を指定の分布から選ぶ（--latency-ms は平均、lognormal のみ中央値）"""
+    mean = config.latency_ms / 1000
+    if mean <= 0:
+        return 0.0
+    if config.latency_dist == "uniform":
+        spread = config.latency_spread_ms / 1000
+        return rng.uniform(max(0.0, mean - spread), mean + spread)
+    if config.latency_dist == "exponential":
+        return rng.expovariate(1 / mean)
+    if config.latency_dist == "lognormal":
+        return rng.lognormvariate(math.log(mean), config.latency_sigma)
+    return mean
+
+
+class StreamDropped(Exception):
+    """--drop-rate によりストリームを途中で切断する"""
+
+
+def compact_profiles(researchers, payload):
+    """既知の研究者をIDのみの参照に置き換える（おすすめ理由は残す）"""
+    if not payload.get("profile_refs"):
+        return researchers
+    known = set(payload.get("known_profiles") or [])
+    return [
+        {"id": r["orcid"], "profile_ref": True, **{k: v for k, v in r.items() if k.startswith("reason_")}}
+        if r["orcid"] in known else r
+        for r in researchers
+    ]
+
+
+class MockBackendHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None  # argparse.Namespace（起動時に設定）
+    profiles = {}  # これまでに返した研究者のカード項目（ORCID -> dict、/api/profiles 用）
+    rng = random.Random()  # 遅延・障害の発生に使う乱数（--seed で固定、検索結果の内容とは別）
+    rng_lock = threading.Lock()
+    drop_after = None  # このリクエストでストリームを切断するまでのイベント数（遅くとも done の前で切断）
+
+    def log_message(self, format, *args):
+        if self.config.verbose:
+            super().log_message(format, *args)
+
+    # --- 送信ヘルパー ---
+    def send_json(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def write_event(self, fmt, event):
+        if self.drop_after is not None:
+            if self.drop_after <= 0 or event["type"] == "done":
+                raise StreamDropped()
+            self.drop_after -= 1
+        data = json.dumps(event, ensure_ascii=False)
+        if fmt == "sse":
+            self.write_chunk(f"event: {event['type']}\ndata: {data}\n\n".encode("utf-8"))
+        else:
+            self.write_chunk(f"{data}\n".encode("utf-8"))
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    # --- 遅延・障害の注入 ---
+    def inject_faults(self, path):
+        """指定の割合で遅延・エラー・停止を加える（エラー応答を返した場合は True）"""
+        cfg = self.config
+        with self.rng_lock:
+            latency = sample_latency(cfg, self.rng)
+            error = self.rng.random() < cfg.error_rate
+            status = self.rng.choice(cfg.error_status)
+            stall = self.rng.random() < cfg.stall_rate
+            drop = self.rng.random() < cfg.drop_rate
+            drop_after = self.rng.randint(0, max(cfg.results, 1))
+        self.drop_after = drop_after if drop else None
+        time.sleep(latency + (cfg.stall_seconds if stall else 0))
+        if not error:
+            return False
+        if cfg.verbose:
+            self.log_message("injected HTTP %s for %s", status, path)
+        try:
+            self.send_json({"detail": f"Injected error ({status})"}, status=status)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        return True
+
+    # --- エンドポイント ---
+    def handle_api(self, path, handler, payload):
+        if self.inject_faults(path):
+            return
+        try:
+            handler(payload)
+        except StreamDropped:
+            # 終端チャンクを送らずに接続を閉じる（クライアントからは途中で切れたストリームに見える）
+            if self.config.verbose:
+                self.log_message("injected stream drop for %s", path)
+            self.close_connection = True
+        except (BrokenPipeError, ConnectionResetError):
+            # 応答の停止中などにクライアントがタイムアウトして切断した
+            self.close_connection = True
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/api/health":
+            self.handle_api(path, self.handle_health, None)
+        else:
+            self.send_json({"detail": "Not Found"}, status=404)
+
+    def do_POST(self):
+        payload = self.read_json()
+        path = self.path.split("?")[0]
+        handlers = {
+            "/api/search": self.handle_search,
+            "/api/reasons": self.handle_reasons,
+            "/api/profiles": self.handle_profiles,
+            "/api/chat": self.handle_chat,
+        }
+        if path in handlers:
+            self.handle_api(path, handlers[path], payload)
+        else:
+            self.send_json({"detail": "Not Found"}, status=404)
+
+    def handle_health(self, payload):
+        self.send_json({"status": "healthy", "service": "kenq-mock-backend"})
+
+    def handle_search(self, payload):
+        cfg = self.config
+        query = payload.get("query", "")
+        if "limit" in payload:
+            offset = int(payload.get("offset", 0))
+            indexes = range(offset, min(offset + int(payload["limit"]), cfg.total_results))
+        else:
+            indexes = range(cfg.results)
+        # ページ送りしても同じ研究者になるよう、研究者ごとに乱数を初期化する
+        researchers = [
+            make_researcher(random.Random(f"{query}|{payload.get('university', '')}|{i}"), i, query)
+            for i in indexes
+        ]
+        self.profiles.update((r["orcid"], r) for r in researchers)
+        if payload.get("include_reasons", True):
+            reasons = [make_reasons(query, r["orcid"], cfg.reason_words) for r in researchers]
+        else:
+            reasons = []
+
+        fmt = cfg.search_format if payload.get("stream") else "json"
+        if fmt == "json":
+            time.sleep(cfg.researcher_delay * len(researchers) + cfg.reason_delay * len(reasons))
+            results = [{**r, **(reasons[i] if reasons else {})} for i, r in enumerate(researchers)]
+            self.send_json(compact_profiles(results, payload))
+            return
+
+        self.start_chunked("text/event-stream" if fmt == "sse" else "application/x-ndjson")
+        for i, researcher in enumerate(compact_profiles(researchers, payload)):
+            time.sleep(cfg.researcher_delay)
+            self.write_event(fmt, {"type": "researcher", "index": i, "researcher": researcher})
+        for i, reason in enumerate(reasons):
+            time.sleep(cfg.reason_delay)
+            self.write_event(fmt, {"type": "reasons", "index": i, "reasons": reason})
+        self.write_event(fmt, {"type": "done"})
+        self.end_chunked()
+
+    def handle_reasons(self, payload):
+        cfg = self.config
+        query = payload.get("query", "")
+        researchers = payload.get("researchers", [])
+        time.sleep(cfg.reason_delay * len(researchers))
+        self.send_json({
+            "reasons": {r["id"]: make_reasons(query, r["id"], cfg.reason_words) for r in researchers}
+        })
+
+    def handle_profiles(self, payload):
+        self.send_json({
+            "profiles": {rid: self.profiles[rid] for rid in payload.get("ids", []) if rid in self.profiles}
+        })
+
+    def handle_chat(self, payload):
+        cfg = self.config
+        message = payload.get("message", "")
+        rng = random.Random(message)
+        count = int(payload.get("max_researchers", 3))
+        researchers = [
+            {**make_researcher(rng, i, message), **make_reasons(message, i, cfg.reason_words)}
+            for i in range(count)
+        ]
+        for r in researchers:
+            self.profiles[r["orcid"]] = {k: v for k, v in r.items() if not k.startswith("reason_")}
+        researchers = compact_profiles(researchers, payload)
+        follow_up = " 研究分野や協業の形態について、さらに詳しく教えていただければ候補を絞り込めます。"
+        reply = f"「{message}」について承知しました。ご要望に近い研究者を{count}名ご提案します。" + follow_up
+        if cfg.reply_chars > len(reply):
+            reply += follow_up * ((cfg.reply_chars - len(reply)) // len(follow_up) + 1)
+            reply = reply[:cfg.reply_chars]
+        tokens = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        context_update = {"research_field": message[:50]}
+
+        fmt = cfg.search_format if payload.get("stream") else "json"
+        if fmt == "json":
+            time.sleep(cfg.token_delay * len(tokens))
+            self.send_json({"response": reply, "researchers": researchers, "context_update": context_update})
+            return
+
+        self.start_chunked("text/event-stream" if fmt == "sse" else "application/x-ndjson")
+        for token in tokens:
+            time.sleep(cfg.token_delay)
+            self.write_event(fmt, {"type": "token", "text": token})
+        self.write_event(fmt, {"type": "researchers", "researchers": researchers})
+        self.write_event(fmt, {"type": "context_update", "context_update": context_update})
+        self.write_event(fmt, {"type": "done"})
+        self.end_chunked()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="研Q バックエンドのローカル代替サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--results", type=int, default=20, help="検索結果の件数")
+    parser.add_argument("--total-results", type=int, default=1000,
+                        help="limit / offset 指定時の結果全体の件数")
+    parser.add_argument("--search-format", choices=["ndjson", "sse", "json"], default="ndjson",
+                        help="stream=true のリクエストに対する応答形式")
+    parser.add_argument("--researcher-delay", type=float, default=0.05, help="研究者1名あたりの遅延（秒）")
+    parser.add_argument("--reason-delay", type=float, default=0.3, help="理由生成1名あたりの遅延（秒）")
+    parser.add_argument("--reason-words", type=int, default=400, help="理由本文の単語数")
+    parser.add_argument("--token-delay", type=float, default=0.03, help="対話応答1トークンあたりの遅延（秒）")
+    parser.add_argument("--reply-chars", type=int, default=0, help="対話応答の文字数（0は既定の短い応答）")
+    # 遅延・障害の注入（すべての /api/* が対象）
+    parser.add_argument("--latency-ms", type=float, default=0, help="応答開始までの遅延の平均（ミリ秒）")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"],
+                        default="fixed", help="応答開始までの遅延の分布")
+    parser.add_argument("--latency-spread-ms", type=float, default=0, help="uniform の場合の平均からの幅（ミリ秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal の場合のσ（裾の重さ）")
+    parser.add_argument("--error-rate", type=float, default=0, help="エラー応答を返す割合（0〜1）")
+    parser.add_argument("--error-status", type=int, nargs="+", default=[500, 502, 503],
+                        help="エラー応答のステータス（複数指定時は無作為に選ぶ）")
+    parser.add_argument("--stall-rate", type=float, default=0, help="応答を止める割合（0〜1）")
+    parser.add_argument("--stall-seconds", type=float, default=90, help="応答を止める時間（秒）")
+    parser.add_argument("--drop-rate", type=float, default=0, help="ストリームを途中で切断する割合（0〜1）")
+    parser.add_argument("--seed", type=int, default=None, help="遅延・障害の乱数の初期値（再現用）")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    config = parse_args(argv)
+    MockBackendHandler.config = config
+    MockBackendHandler.rng = random.Random(config.seed)
+    server = ThreadingHTTPServer((config.host, config.port), MockBackendHandler)
+    print(f"Mock backend listening on http://{config.host}:{config.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()